@@ -1,23 +1,31 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import update, bindparam
+from sqlalchemy.dialects.postgresql import insert
 from database import get_db, User
 from pydantic import BaseModel
-import bcrypt
-import jwt
-import os
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
-import traceback
 from fastapi.responses import JSONResponse
+from utils.password_hasher import password_hasher, PasswordHasherBusy, RETRY_AFTER_SECONDS
+from utils.jwt_auth import create_token, get_current_user, AuthenticatedUser
+from utils.log import get_logger
 
-# Load .env variables
-load_dotenv()
-SECRET_KEY = os.getenv("JWT_SECRET", "your_secret_key")
-ALGORITHM = "HS256"
+logger = get_logger(__name__)
 
 auth_router = APIRouter()
 
+# Statements are built once so SQLAlchemy's compiled cache and asyncpg's prepared statement
+# cache are hit on every request, with values bound per call.
+# Registration: one round trip that inserts unless the email exists and reports which happened
+REGISTER_USER = (
+    insert(User)
+    .on_conflict_do_nothing(index_elements=[User.email])
+    .returning(User.id)
+)
+# Login: only the columns needed to verify the password and greet the user
+LOGIN_USER = select(User.name, User.password).where(User.email == bindparam("email"))
+UPDATE_PASSWORD = update(User).where(User.email == bindparam("user_email")).values(password=bindparam("new_password"))
+
 class UserRegister(BaseModel):
     name: str
     email: str
@@ -27,35 +35,40 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
+def busy_response(e):
+    """Response for a password operation shed by the saturated hashing pool."""
+    return JSONResponse(
+        status_code=e.status_code,
+        content={"error": str(e)},
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
 @auth_router.post("/register")
 async def register(user: UserRegister, db: AsyncSession = Depends(get_db)):
     try:
-        print(f"Registering user: {user.name}, {user.email}")
-
-        # 🔹 Check if user already exists
-        result = await db.execute(select(User).filter(User.email == user.email))
-        existing_user = result.scalars().first()
-
-        if existing_user:
-            print("❌ User already exists!")
-            raise HTTPException(status_code=400, detail="User already exists")
-
-        # 🔹 Hash password securely
-        hashed_pw = bcrypt.hashpw(user.password.encode(), bcrypt.gensalt()).decode()
+        logger.debug("Registering user", extra={"email": user.email})
 
-        # 🔹 Create new user instance
-        new_user = User(name=user.name, email=user.email, password=hashed_pw)
-        db.add(new_user)
+        # 🔹 Hash password securely (on the hashing pool, off the event loop)
+        hashed_pw = await password_hasher.hash(user.password)
 
+        # 🔹 Insert unless the email is taken, in a single statement
+        result = await db.execute(REGISTER_USER, {"name": user.name, "email": user.email, "password": hashed_pw})
+        created = result.first() is not None
         await db.commit()  # 🔹 Commit the transaction
-        await db.refresh(new_user)  # 🔹 Refresh to get latest DB state
 
-        print("✅ User registered successfully")
+        if not created:
+            logger.info("❌ User already exists!")
+            raise HTTPException(status_code=400, detail="User already exists")
+
+        logger.info("✅ User registered successfully")
         return {"message": "User registered successfully"}
 
+    except PasswordHasherBusy as e:
+        logger.warning("⚠️ Registration shed: %s", e)
+        return busy_response(e)
+
     except Exception as e:
-        print("🔥 ERROR DURING REGISTRATION 🔥")
-        traceback.print_exc()  # Print full error traceback
+        logger.exception("🔥 ERROR DURING REGISTRATION 🔥")  # Logs the full traceback
 
         return JSONResponse(
             status_code=500,
@@ -65,24 +78,34 @@ async def register(user: UserRegister, db: AsyncSession = Depends(get_db)):
 @auth_router.post("/login")
 async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
     try:
-        # 🔹 Fetch user without opening a transaction (read-only)
-        result = await db.execute(select(User).where(User.email == user.email))
-        db_user = result.scalars().first()
+        # 🔹 Fetch the name and password hash only (read-only)
+        result = await db.execute(LOGIN_USER, {"email": user.email})
+        db_user = result.first()
     # except Exception as e:
     # print(f"🔥 Database Error: {e}")
     # raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
-        if not db_user or not bcrypt.checkpw(user.password.encode(), db_user.password.encode()):
+        if not db_user or not await password_hasher.verify(user.password, db_user.password):
             raise HTTPException(status_code=400, detail="Invalid email or password")
 
+        # 🔹 Upgrade the stored hash when the configured work factor has changed
+        if password_hasher.needs_rehash(db_user.password):
+            new_hash = await password_hasher.hash(user.password)
+            await db.execute(UPDATE_PASSWORD, {"user_email": user.email, "new_password": new_hash})
+            await db.commit()
+            logger.info("ℹ️ Rehashed password for %s at %d rounds", user.email, password_hasher.rounds)
+
         # 🔹 Generate JWT token
-        token = jwt.encode({"sub": db_user.email, "exp": datetime.utcnow() + timedelta(hours=1)}, SECRET_KEY, algorithm=ALGORITHM)
+        token = create_token(user.email)
 
         return {"token": token, "name": db_user.name, "message": "Login successful"}
 
+    except PasswordHasherBusy as e:
+        logger.warning("⚠️ Login shed: %s", e)
+        return busy_response(e)
+
     except Exception as e:
-        print("🔥 ERROR DURING LOGIN 🔥")
-        traceback.print_exc()
+        logger.exception("🔥 ERROR DURING LOGIN 🔥")
 
         return JSONResponse(
             status_code=500,
@@ -90,5 +113,5 @@ async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
         )
 
 @auth_router.get("/protected")
-async def protected_route():
-    return {"message": "You have access to this protected route!"}
+async def protected_route(current_user: AuthenticatedUser = Depends(get_current_user)):
+    return {"message": "You have access to this protected route!", "email": current_user.email}
@@ -0,0 +1,346 @@
+"""
+End-to-end load test of the FastAPI app, run offline on a laptop.
+
+Usage:
+    python benchmarks/load_test.py [--concurrency 8] [--duration 30 | --requests N]
+                                   [--mix login=3,simulate=4,risk=3,suggestions=1]
+                                   [--users 10] [--seed 0] [--market bundled|synthetic]
+                                   [--json results.json]
+
+The app is booted in-process (startup and shutdown included) and driven through
+httpx's ASGI transport, so no server or port is involved. The database is a fresh
+SQLite file in a temporary directory instead of Postgres, and market data comes from the
+bundled CSV files instead of yfinance: individual tickers and the market index (its SPY
+history) from data/stock_data_5y.csv, and each asset class as an equal-weight index of
+the tickers in its own file, date-indexed like the stocks so the portfolio optimizer can
+align them. --market synthetic serves benchmarks.synthetic_market instead.
+
+Users are registered and logged in before the clock starts. Then --concurrency workers
+send requests back to back, each picking an endpoint by the --mix weights with
+randomized inputs, for --duration seconds or until --requests have been sent. For each
+endpoint the report gives throughput, errors and p50/p95/p99 latency, and the event-loop
+lag seen while its requests were in flight: a monitor sleeps LAG_INTERVAL_SECONDS at a
+time and the overshoot is charged to every endpoint with a request open at that moment.
+High lag points at work blocking the event loop rather than running in the threadpool.
+Client and server share the process, so latencies include the (small) client overhead.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from collections import Counter
+import numpy as np
+import pandas as pd
+import httpx
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_market import MARKET_INDEX_ALIASES, SyntheticMarket, patched_market_data
+from utils.data_loader import DATA_DIR, load_data as load_bundled_data
+from utils.log import configure_logging
+
+LAG_INTERVAL_SECONDS = 0.01  # How often the event-loop lag monitor wakes up
+MARKET_INDEX_TICKER = "SPY"  # Bundled stand-in for ^GSPC
+BUNDLED_ASSET_CLASSES = ("bonds", "real_estate", "commodities")
+DEFAULT_MIX = "login=3,simulate=4,risk=3,suggestions=1"
+PASSWORD = "load-test-password"
+
+
+def _dated(data):
+    """The frame indexed by trading day (midnight, New York time) from its Date column."""
+    data = data.copy()
+    data.index = pd.to_datetime(data.pop("Date"), utc=True).dt.tz_convert("America/New_York").dt.normalize()
+    return data
+
+
+def equal_weight_index(data, name):
+    """
+    Date-indexed history of an asset class file holding several tickers: the average of
+    their closes, each rebased to 100. Yield series (^TNX, ...) are not prices and are left out.
+    """
+    data = _dated(data)
+    closes = data[~data["Ticker"].str.startswith("^")].pivot(columns="Ticker", values="Close")
+    close = (closes / closes.bfill().iloc[0] * 100).mean(axis=1)
+    return pd.DataFrame({"Close": close, "Ticker": name})
+
+
+class BundledMarket:
+    """Drop-in for utils.data_loader.load_data serving every asset from the bundled CSV files."""
+
+    def __init__(self, path=os.path.join(DATA_DIR, "stock_data_5y.csv")):
+        data = _dated(pd.read_csv(path))
+        self.frames = {ticker: frame for ticker, frame in data.groupby("Ticker")}
+        self.tickers = [ticker for ticker in self.frames if ticker != MARKET_INDEX_TICKER]
+        for asset in BUNDLED_ASSET_CLASSES:
+            self.frames[asset] = equal_weight_index(load_bundled_data(asset), asset)
+
+    def load_data(self, asset_type):
+        if MARKET_INDEX_ALIASES.get(asset_type, asset_type) == "stocks":
+            asset_type = MARKET_INDEX_TICKER
+        if asset_type not in self.frames:
+            raise ValueError(f"❌ No data found for stock ticker: {asset_type}. It might be delisted or an invalid ticker.")
+        return self.frames[asset_type].copy()  # Callers add columns to what they get
+
+    def patched(self):
+        return patched_market_data(self.load_data, self.tickers)
+
+
+def parse_mix(mix):
+    """'login=3,simulate=1' -> {"login": 3.0, "simulate": 1.0}, dropping zero weights."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"❌ Unknown endpoint '{name}', expected one of: {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+        if weights[name] < 0:
+            raise ValueError(f"❌ Weight for '{name}' must not be negative.")
+    weights = {name: weight for name, weight in weights.items() if weight > 0}
+    if not weights:
+        raise ValueError("❌ The mix needs at least one endpoint with a positive weight.")
+    return weights
+
+
+def random_allocation(rng):
+    """Whole-percent stocks/bonds/real_estate/commodities split summing to 100."""
+    weights = [rng.randint(1, 10) for _ in range(4)]
+    shares = [round(100 * weight / sum(weights)) for weight in weights[:3]]
+    return dict(zip(("stocks", "bonds", "real_estate", "commodities"), shares + [100 - sum(shares)]))
+
+
+def login_payload(rng, users):
+    return {"email": rng.choice(users), "password": PASSWORD}
+
+
+def simulate_payload(rng, users):
+    return {"investment_amount": rng.uniform(1_000, 1_000_000), "duration": rng.randint(1, 30),
+            "risk_appetite": rng.uniform(0.1, 1.0), "market_condition": rng.choice(("bull", "bear", "neutral")),
+            **random_allocation(rng)}
+
+
+def risk_payload(rng, users):
+    return {"investment_amount": rng.uniform(1_000, 1_000_000), "duration": rng.randint(1, 30),
+            "risk_appetite": rng.uniform(0.1, 1.0), **random_allocation(rng)}
+
+
+def suggestions_payload(rng, users):
+    return {"investment": rng.uniform(1_000, 1_000_000), "duration": rng.randint(1, 30),
+            "risk_tolerance": rng.uniform(0.1, 1.0), **random_allocation(rng)}
+
+
+# Endpoint: (path, payload builder)
+ENDPOINTS = {
+    "login": ("/auth/login", login_payload),
+    "simulate": ("/simulate/", simulate_payload),
+    "risk": ("/risk-assessment/risk-assessment", risk_payload),
+    "suggestions": ("/suggestions/portfolio_suggestions", suggestions_payload),
+}
+
+
+class LoadStats:
+    """Latencies, statuses and event-loop lag samples per endpoint."""
+
+    def __init__(self, endpoints):
+        self.latencies = {name: [] for name in endpoints}
+        self.statuses = {name: Counter() for name in endpoints}
+        self.lags = {name: [] for name in endpoints}
+        self.loop_lags = []
+        self.in_flight = Counter()
+
+    def record(self, name, seconds, status):
+        self.latencies[name].append(seconds)
+        self.statuses[name][status] += 1
+
+    def record_lag(self, lag):
+        self.loop_lags.append(lag)
+        for name, count in self.in_flight.items():
+            if count:
+                self.lags[name].append(lag)
+
+    def summary(self, elapsed):
+        """Per-endpoint report, with latencies and lags in milliseconds."""
+        def percentiles(values, prefix, quantiles):
+            if not values:
+                return {f"{prefix}{label}": None for label in quantiles}
+            points = np.percentile(np.array(values) * 1000, list(quantiles.values()))
+            return {f"{prefix}{label}": float(point) for label, point in zip(quantiles, points)}
+
+        latency_quantiles = {"p50_ms": 50, "p95_ms": 95, "p99_ms": 99}
+        lag_quantiles = {"p99_ms": 99, "max_ms": 100}
+        endpoints = {}
+        for name, latencies in self.latencies.items():
+            statuses = self.statuses[name]
+            endpoints[name] = {
+                "requests": len(latencies),
+                "errors": sum(count for status, count in statuses.items() if status == "error" or status >= 400),
+                "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+                "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+                **percentiles(latencies, "", latency_quantiles),
+                **percentiles(self.lags[name], "loop_lag_", lag_quantiles),
+            }
+        return {
+            "elapsed_seconds": elapsed,
+            "requests": sum(len(latencies) for latencies in self.latencies.values()),
+            **percentiles(self.loop_lags, "loop_lag_", {"p50_ms": 50, **lag_quantiles}),
+            "endpoints": endpoints,
+        }
+
+
+async def monitor_loop_lag(stats, stop, interval=LAG_INTERVAL_SECONDS):
+    """Samples how late the event loop wakes from a sleep until stop is set."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(interval)
+        stats.record_lag(max(loop.time() - started - interval, 0.0))
+
+
+async def register_users(client, count):
+    """Registers and logs in count users, returning (emails, bearer tokens)."""
+    emails = [f"load-test-{i}@example.com" for i in range(count)]
+
+    async def sign_up(email):
+        response = await client.post("/auth/register", json={"name": "Load Test", "email": email, "password": PASSWORD})
+        if response.status_code != 200:
+            raise RuntimeError(f"❌ Registering {email} failed with {response.status_code}: {response.text}")
+        response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+        if response.status_code != 200:
+            raise RuntimeError(f"❌ Logging in {email} failed with {response.status_code}: {response.text}")
+        return response.json()["token"]
+
+    return emails, await asyncio.gather(*(sign_up(email) for email in emails))
+
+
+async def run_load_test(app, mix, concurrency=8, duration=None, requests=None, users=10, seed=0,
+                        endpoints=ENDPOINTS):
+    """
+    Drives the ASGI app with the weighted mix from `concurrency` workers for `duration`
+    seconds or `requests` requests, whichever is given, and returns the summary.
+    """
+    if (duration is None) == (requests is None):
+        raise ValueError("❌ Give exactly one of duration or requests.")
+    names, weights = list(mix), list(mix.values())
+    stats = LoadStats(names)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+        emails, tokens = await register_users(client, users)
+        remaining = [requests]
+        deadline = None
+
+        def take():
+            if deadline is not None:
+                return time.perf_counter() < deadline
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+        async def worker(index):
+            rng = random.Random(seed * 1_000_003 + index)
+            headers = {"Authorization": f"Bearer {tokens[index % len(tokens)]}"} if tokens else {}
+            while take():
+                name = rng.choices(names, weights)[0]
+                path, payload = endpoints[name]
+                body = payload(rng, emails)
+                stats.in_flight[name] += 1
+                started = time.perf_counter()
+                try:
+                    status = (await client.post(path, json=body, headers=headers)).status_code
+                except Exception:
+                    status = "error"
+                finally:
+                    stats.in_flight[name] -= 1
+                stats.record(name, time.perf_counter() - started, status)
+
+        stop = asyncio.Event()
+        monitor = asyncio.ensure_future(monitor_loop_lag(stats, stop))
+        started = time.perf_counter()
+        if duration is not None:
+            deadline = started + duration
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await monitor
+    return stats.summary(elapsed)
+
+
+def use_local_stand_ins(directory):
+    """
+    Points the app at a fresh SQLite database, whatever DATABASE_URL is set, and keeps
+    per-request logging out of the way unless LOG_LEVEL asks for it. Must run before the
+    app is imported.
+    """
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(directory, 'load_test.db')}"
+    configure_logging(level=os.getenv("LOG_LEVEL", "WARNING"))
+
+
+MARKETS = {"bundled": BundledMarket, "synthetic": SyntheticMarket}
+
+
+async def load_test_app(args, mix):
+    from database import init_db
+    from main import app, lifespan
+
+    with MARKETS[args.market]().patched():
+        await init_db()
+        async with lifespan(app):
+            return await run_load_test(app, mix, args.concurrency, args.duration, args.requests, args.users, args.seed)
+
+
+def print_report(summary, concurrency):
+    print(f"📊 {summary['requests']} requests in {summary['elapsed_seconds']:.1f}s from {concurrency} workers, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'endpoint':<12} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'lag p99':>9} {'lag max':>9}")
+
+    def ms(value):
+        return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+    for name, result in summary["endpoints"].items():
+        print(f"{name:<12} {result['requests']:>8} {result['errors']:>6} {result['throughput_rps']:>8.2f} "
+              f"{ms(result['p50_ms'])} {ms(result['p95_ms'])} {ms(result['p99_ms'])} "
+              f"{ms(result['loop_lag_p99_ms'])} {ms(result['loop_lag_max_ms'])}")
+        if result["errors"]:
+            print(f"  ⚠️ statuses: {result['statuses']}")
+    print(f"🔹 Event-loop lag: p50 {ms(summary['loop_lag_p50_ms']).strip()} ms, "
+          f"p99 {ms(summary['loop_lag_p99_ms']).strip()} ms, max {ms(summary['loop_lag_max_ms']).strip()} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8, help="Workers sending requests back to back")
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument("--duration", type=float, help="Seconds to run for (default 30)")
+    limit.add_argument("--requests", type=int, help="Total requests to send instead of running for a duration")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. login=3,simulate=4,risk=3,suggestions=1")
+    parser.add_argument("--users", type=int, default=10, help="Users registered before the run")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the request inputs")
+    parser.add_argument("--market", choices=sorted(MARKETS), default="bundled", help="Where market data comes from")
+    parser.add_argument("--json", help="Write the summary to this JSON file")
+    args = parser.parse_args()
+    if args.duration is None and args.requests is None:
+        args.duration = 30.0
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with tempfile.TemporaryDirectory() as directory:
+        use_local_stand_ins(directory)
+        summary = asyncio.run(load_test_app(args, mix))
+    print_report(summary, args.concurrency)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"concurrency": args.concurrency, "mix": mix, **summary}, f, indent=2)
+        print(f"✅ Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
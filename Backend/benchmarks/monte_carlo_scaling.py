@@ -0,0 +1,66 @@
+"""
+Scaling of the sharded Monte Carlo engine from 1 to N worker processes.
+
+Usage:
+    python benchmarks/monte_carlo_scaling.py [--paths 40000] [--years 10] [--max-workers N]
+
+Runs a daily-resolution simulation (the kernel used when drawdown is requested) with an
+increasing number of workers and prints the wall time, speed-up and scaling efficiency
+(speed-up divided by workers) relative to the in-process run.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.monte_carlo import monte_carlo_summary
+from models.process_pool import get_process_pool, shutdown_process_pool
+
+
+def time_run(workers, paths, years, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        monte_carlo_summary(10000, 0.08, 0.25, years, iterations=paths, resolution="daily", drawdown=True,
+                            workers=workers)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", type=int, default=40000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"📊 {args.paths} paths x {args.years} years, daily steps, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>9} {'speed-up':>9} {'efficiency':>11}")
+    baseline = None
+    for workers in worker_counts(args.max_workers):
+        if workers > 1:
+            get_process_pool(workers).submit(sum, []).result()  # Spawn the pool before timing
+        time_run(workers, args.paths, args.years, 1)  # Warm-up: worker imports, shock bank, buffers
+        seconds = time_run(workers, args.paths, args.years, args.repeats)
+        baseline = baseline or seconds
+        speedup = baseline / seconds
+        print(f"{workers:>8} {seconds:>9.3f} {speedup:>9.2f} {speedup / workers:>10.0%}")
+    shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    main()
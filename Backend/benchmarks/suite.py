@@ -0,0 +1,191 @@
+"""
+Benchmark suite for the simulation models and services, run offline on a synthetic market.
+
+Usage:
+    python benchmarks/suite.py [--profile quick|full] [-k FILTER] [--repeats 5]
+                               [--save results.json] [--compare baseline.json] [--threshold 0.10]
+
+Every case is timed over --repeats runs after a warm-up run (median and best are
+reported) and its peak traced memory is measured in one extra run under tracemalloc,
+kept separate so tracing does not skew the timings. Services read their market data
+from benchmarks.synthetic_market instead of the CSV files and yfinance.
+
+--save writes the results as a baseline; --compare reports the change against one and
+exits with status 1 when a case's median time or peak memory grew by more than
+--threshold, so it can gate performance changes:
+
+    python benchmarks/suite.py --save baseline.json     # on the base commit
+    python benchmarks/suite.py --compare baseline.json  # on the change
+
+Grid ("full" profile; "quick" runs the smaller half of each axis): Monte Carlo at 1k-100k
+paths x 1-30 years, GBM over 1-30 years, stock allocation over 4-2,000 assets, the
+high-level optimizer over 4-16 asset classes (its 5% floor per asset caps it at 20) and
+the three services over 1-30 years and 50-200 stock universes. Memory allocated in
+Monte Carlo worker processes is not traced; run with MONTE_CARLO_WORKERS=1 to include it.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tracemalloc
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_market import SyntheticMarket
+from models.monte_carlo import monte_carlo_simulation
+from models.gbm_model import geometric_brownian_motion
+from models.portfolio_optimizer import optimize_stock_allocation, optimize_portfolio
+from services.simulation_ import run_simulation
+from services.risk_assessment import run_risk_assessment
+from services.suggestions_services import get_optimized_portfolio
+
+PROFILES = {
+    "quick": {"paths": (1000, 10000), "years": (1, 10), "stocks": (4, 50), "classes": (4,), "universes": (50,)},
+    "full": {"paths": (1000, 10000, 100000), "years": (1, 10, 30), "stocks": (4, 50, 200, 2000), "classes": (4, 16),
+             "universes": (50, 200)},
+}
+
+
+class Case:
+    def __init__(self, name, fn, params):
+        self.name = name
+        self.fn = fn
+        self.params = params
+
+
+def build_cases(profile):
+    grid = PROFILES[profile]
+    market = SyntheticMarket(tickers=max(grid["stocks"] + grid["universes"]), days=5 * 252, seed=7)
+    cases = []
+    for paths in grid["paths"]:
+        for years in grid["years"]:
+            cases.append(Case(f"monte_carlo[paths={paths},years={years}]",
+                              lambda paths=paths, years=years: monte_carlo_simulation(10000, 0.08, 0.2, years, iterations=paths),
+                              {"paths": paths, "years": years}))
+    for years in grid["years"]:
+        cases.append(Case(f"gbm[years={years}]",
+                          lambda years=years: geometric_brownian_motion(10000, 0.08, 0.2, years),
+                          {"years": years}))
+    for count in grid["stocks"]:
+        stock_data = market.stock_data(count)
+        cases.append(Case(f"optimize_stock_allocation[assets={count}]",
+                          lambda stock_data=stock_data: optimize_stock_allocation(stock_data, 0.5, 10),
+                          {"assets": count}))
+    for count in grid["classes"]:
+        prices = market.closes[market.tickers[:count]]
+        allocation = [1 / count] * count
+        cases.append(Case(f"optimize_portfolio[assets={count}]",
+                          lambda prices=prices, allocation=allocation: optimize_portfolio(prices, allocation, 0.5),
+                          {"assets": count}))
+
+    def in_market(fn, universe=None):
+        # Services load their data through the synthetic market
+        def run():
+            with market.patched(universe):
+                return fn()
+        return run
+
+    for years in grid["years"]:
+        cases.append(Case(f"run_simulation[years={years}]",
+                          in_market(lambda years=years: run_simulation(100000, years, 0.5, "neutral", 40, 30, 20, 10)),
+                          {"years": years}))
+        cases.append(Case(f"run_risk_assessment[years={years}]",
+                          in_market(lambda years=years: run_risk_assessment(100000, years, 0.5, 40, 30, 20, 10)),
+                          {"years": years}))
+    for universe in grid["universes"]:
+        cases.append(Case(f"get_optimized_portfolio[universe={universe}]",
+                          in_market(lambda: get_optimized_portfolio(100000, 10, [0.4, 0.3, 0.2, 0.1], 0.5), universe),
+                          {"universe": universe}))
+    return cases
+
+
+def measure(case, repeats):
+    case.fn()  # Warm-up: imports, kernel compilation, shock bank files, buffers
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        case.fn()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        case.fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"params": case.params, "median_seconds": statistics.median(timings), "min_seconds": min(timings),
+            "repeats": repeats, "peak_bytes": peak}
+
+
+def compare(results, baseline, threshold):
+    """
+    Relative change of each case's median time and peak memory against the baseline.
+    Returns (rows, regressions): rows are (name, time_change, memory_change), with None
+    for cases missing from the baseline; regressions name the cases over threshold.
+    """
+    rows, regressions = [], []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            rows.append((name, None, None))
+            continue
+        time_change = result["median_seconds"] / reference["median_seconds"] - 1
+        memory_change = result["peak_bytes"] / reference["peak_bytes"] - 1 if reference["peak_bytes"] else 0.0
+        rows.append((name, time_change, memory_change))
+        if time_change > threshold or memory_change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def machine_info():
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("-k", dest="filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a baseline JSON file written by --save")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown or memory growth")
+    args = parser.parse_args()
+
+    cases = [case for case in build_cases(args.profile) if args.filter in case.name]
+    print(f"📊 {len(cases)} cases, {args.profile} profile, {args.repeats} repeats, {os.cpu_count()} CPUs")
+    print(f"{'case':<48} {'median s':>10} {'best s':>10} {'peak MB':>9}")
+    results = {}
+    for case in cases:
+        result = results[case.name] = measure(case, args.repeats)
+        print(f"{case.name:<48} {result['median_seconds']:>10.4f} {result['min_seconds']:>10.4f} "
+              f"{result['peak_bytes'] / 2 ** 20:>9.1f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"machine": machine_info(), "profile": args.profile, "results": results}, f, indent=2)
+        print(f"✅ Results saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != machine_info():
+            print("⚠️ Baseline was recorded on a different machine or Python, comparisons may be skewed")
+        rows, regressions = compare(results, baseline["results"], args.threshold)
+        print(f"\n{'case':<48} {'time':>9} {'memory':>9}")
+        for name, time_change, memory_change in rows:
+            if time_change is None:
+                print(f"{name:<48} {'new':>9} {'new':>9}")
+            else:
+                flag = " 🔥" if name in regressions else ""
+                print(f"{name:<48} {time_change:>+9.1%} {memory_change:>+9.1%}{flag}")
+        if regressions:
+            print(f"❌ {len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Synthetic market data for offline benchmarks and load tests.
+
+SyntheticMarket draws correlated daily log returns from a one-factor model (every asset
+loads on a common market factor, so pairwise correlations are about `correlation`),
+with per-asset annual drift and volatility drawn from realistic ranges, and turns them
+into yfinance-shaped price frames. market.load_data is a drop-in for
+utils.data_loader.load_data: "stocks", "bonds", "real_estate" and "commodities" map to
+index series, other names to individual tickers.
+
+    market = SyntheticMarket(tickers=500, days=1260)
+    with market.patched():
+        run_simulation(...)  # Served from the synthetic market, no network or CSV files
+"""
+from contextlib import ExitStack, contextmanager
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+ASSET_CLASSES = {
+    # Asset class: (annual drift, annual volatility)
+    "stocks": (0.08, 0.18),
+    "bonds": (0.03, 0.06),
+    "real_estate": (0.06, 0.20),
+    "commodities": (0.04, 0.22),
+}
+MARKET_INDEX_ALIASES = {"^GSPC": "stocks"}  # The market trend is read from the index
+# Modules holding their own reference to load_data, patched by patched_market_data()
+LOAD_DATA_USERS = ("utils.data_loader", "utils.market_trend", "utils.health", "services.simulation_",
+                   "services.risk_assessment", "services.suggestions_services")
+
+
+@contextmanager
+def patched_market_data(load_data, tickers):
+    """Serves load_data and the stock universe from the given stand-ins while the block runs."""
+    with ExitStack() as stack:
+        for module in LOAD_DATA_USERS:
+            stack.enter_context(patch(f"{module}.load_data", load_data))
+        stack.enter_context(patch("services.suggestions_services.get_top_50_stock_tickers", lambda: list(tickers)))
+        yield
+
+
+class SyntheticMarket:
+
+    def __init__(self, tickers=50, days=5 * TRADING_DAYS_PER_YEAR, seed=0, correlation=0.3,
+                 drift_range=(-0.05, 0.20), volatility_range=(0.15, 0.45), start="2020-01-01"):
+        if not 0 <= correlation < 1:
+            raise ValueError("❌ correlation must be in [0, 1).")
+        self.days = days
+        self.tickers = [f"SYN{i:04d}" for i in range(tickers)]
+        rng = np.random.default_rng(seed)
+        names = list(ASSET_CLASSES) + self.tickers
+        drifts = np.concatenate([[drift for drift, _ in ASSET_CLASSES.values()],
+                                 rng.uniform(*drift_range, size=tickers)])
+        volatilities = np.concatenate([[volatility for _, volatility in ASSET_CLASSES.values()],
+                                       rng.uniform(*volatility_range, size=tickers)])
+
+        # One-factor model: shock_i = sqrt(rho) * market + sqrt(1 - rho) * idiosyncratic_i
+        factor = rng.standard_normal((days, 1))
+        shocks = np.sqrt(correlation) * factor + np.sqrt(1 - correlation) * rng.standard_normal((days, len(names)))
+        daily_volatility = volatilities / np.sqrt(TRADING_DAYS_PER_YEAR)
+        log_returns = (drifts / TRADING_DAYS_PER_YEAR - daily_volatility ** 2 / 2) + daily_volatility * shocks
+        start_prices = rng.uniform(20, 500, size=len(names))
+        prices = start_prices * np.exp(np.cumsum(log_returns, axis=0))
+
+        self.index = pd.bdate_range(start, periods=days, tz="America/New_York")
+        self.closes = pd.DataFrame(prices, index=self.index, columns=names)
+
+    def frame(self, name):
+        """A yfinance-shaped history for an asset class or ticker."""
+        if name not in self.closes.columns:
+            raise ValueError(f"❌ No data found for stock ticker: {name}. It might be delisted or an invalid ticker.")
+        close = self.closes[name]
+        spread = close * 0.01
+        return pd.DataFrame({
+            "Open": close.shift(1).fillna(close),
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": 1_000_000,
+            "Ticker": name,
+        }, index=self.index)
+
+    def load_data(self, asset_type):
+        """Drop-in for utils.data_loader.load_data."""
+        return self.frame(MARKET_INDEX_ALIASES.get(asset_type, asset_type))
+
+    def stock_data(self, count=None):
+        """{ticker: frame} for the first count tickers, as passed to optimize_stock_allocation."""
+        return {ticker: self.frame(ticker) for ticker in self.tickers[:count]}
+
+    @contextmanager
+    def patched(self, universe=None):
+        """
+        Serves load_data and the stock universe (the first `universe` tickers, all by
+        default) from this market while the block runs.
+        """
+        with patched_market_data(self.load_data, self.tickers[:universe]):
+            yield self
@@ -1,17 +1,24 @@
 import os
 import ssl
+import time
 import asyncio
-import httpx
+import logging
+import threading
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, text
 from dotenv import load_dotenv
 
+logger = logging.getLogger(f"portfolio_pilot.{__name__}")  # Handlers are configured by utils.log
+
 # ✅ Load environment variables
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
-NEON_API_KEY = os.getenv("NEON_API_KEY")
-NEON_PROJECT_ID = os.getenv("NEON_PROJECT_ID")
+DB_PROFILE = os.getenv("DB_PROFILE", "prod")
+
+# Prepared statements kept per connection by the asyncpg driver, 0 disables the cache
+# (needed behind a transaction-pooling PgBouncer)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
 
 # ✅ Check if database URL is set
 if not DATABASE_URL:
@@ -22,15 +29,48 @@ ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
 ssl_context.verify_mode = ssl.CERT_OPTIONAL
 
+# ✅ Engine profiles: "dev" logs every statement, "prod" keeps SQL logging off the request path
+ENGINE_PROFILES = {
+    "dev": {"echo": True, "pool_size": 2, "max_overflow": 5, "pool_timeout": 60, "pool_recycle": 1800},
+    "prod": {"echo": False, "pool_size": 10, "max_overflow": 5, "pool_timeout": 30, "pool_recycle": 1800},
+}
+
+
+def engine_options(profile=DB_PROFILE):
+    """Engine keyword arguments for a profile, with DB_POOL_* environment overrides."""
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"❌ Unknown DB_PROFILE '{profile}', expected one of {sorted(ENGINE_PROFILES)}.")
+    options = dict(ENGINE_PROFILES[profile])
+    for option, variable in (("pool_size", "DB_POOL_SIZE"), ("max_overflow", "DB_MAX_OVERFLOW"),
+                             ("pool_timeout", "DB_POOL_TIMEOUT"), ("pool_recycle", "DB_POOL_RECYCLE")):
+        if os.getenv(variable):
+            options[option] = int(os.getenv(variable))
+    if os.getenv("DB_ECHO"):
+        options["echo"] = os.getenv("DB_ECHO").lower() in ("1", "true", "yes")
+    # Connections dropped by the server (idle timeouts, suspended compute) are replaced
+    # transparently instead of failing the first request that picks them up
+    options["pool_pre_ping"] = True
+    return options
+
+
+def connect_args(url=DATABASE_URL):
+    """Driver arguments: TLS and statement caching for asyncpg, none for local stand-ins such as SQLite."""
+    if not url.startswith("postgresql"):
+        return {}
+    return {
+        "ssl": ssl_context,
+        # Repeated auth queries skip the parse/plan round trip once prepared on a connection
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+
+
 # ✅ Create async engine
+ENGINE_OPTIONS = engine_options()
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True,
-    connect_args={"ssl": ssl_context},
-    pool_size=10,
-    max_overflow=5,
-    pool_timeout=60,
-    pool_recycle=1800
+    connect_args=connect_args(),
+    **ENGINE_OPTIONS
 )
 
 # ✅ Create async session
@@ -52,39 +92,85 @@ class User(Base):
     email = Column(String(100), unique=True, nullable=False)
     password = Column(String(255), nullable=False)  # Ensure password is hashed in auth.py
 
-# ✅ Wake Up Neon Database
-async def activate_neon():
-    if not NEON_API_KEY:
-        print("❌ NEON_API_KEY is missing. Skipping auto-activation.")
-        return
-    if not NEON_PROJECT_ID:
-        print("❌ NEON_PROJECT_ID is missing. Check your .env file.")
-        return
-
-    url = f"https://console.neon.tech/api/v2/projects/{NEON_PROJECT_ID}/endpoints"
-    headers = {
-        "Authorization": f"Bearer {NEON_API_KEY}",
-        "Content-Type": "application/json"
+# ✅ Connection acquisition statistics
+class PoolWaitStats:
+    """Time requests spend acquiring a pooled connection (waiting, plus connecting when the pool grows)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+def pool_statistics():
+    """Current pool occupancy and connection acquisition times."""
+    pool = engine.sync_engine.pool
+    with pool_wait_stats._lock:
+        count, total, maximum = pool_wait_stats.count, pool_wait_stats.total_seconds, pool_wait_stats.max_seconds
+    return {
+        "profile": DB_PROFILE,
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "acquisitions": count,
+        "acquire_seconds_total": round(total, 6),
+        "acquire_seconds_avg": round(total / count, 6) if count else 0.0,
+        "acquire_seconds_max": round(maximum, 6),
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers)
-        if response.status_code == 200:
-            print("✅ Neon Database Activated Successfully!")
-        else:
-            print(f"❌ Failed to activate Neon DB: {response.json()}")
+
+# ✅ Warm up the connection pool
+async def warm_pool(connections=None):
+    """
+    Opens `connections` pooled connections (default: the pool size) concurrently and runs
+    SELECT 1 on each, so TLS and authentication handshakes (and waking a suspended
+    server) happen at startup rather than on the first requests.
+    """
+    connections = connections or ENGINE_OPTIONS["pool_size"]
+    started = time.perf_counter()
+    opened = []
+    try:
+        async def open_connection():
+            connection = await engine.connect()
+            opened.append(connection)
+            await connection.execute(text("SELECT 1"))
+
+        await asyncio.gather(*(open_connection() for _ in range(connections)))
+        logger.info("✅ Database pool warmed: %d connections in %.2fs", connections, time.perf_counter() - started)
+    finally:
+        for connection in opened:
+            await connection.close()  # Returned to the pool, still open
+
+async def check_database():
+    """Readiness check: a pooled connection answers SELECT 1 (pre-ping replaces a dead one)."""
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
 
 # ✅ Initialize Database
 async def init_db():
-    await activate_neon()  # 🔥 Wake up database before connecting
+    await warm_pool(1)  # 🔥 Wake up database before connecting
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    print("✅ Database Initialized Successfully!")
+    logger.info("✅ Database Initialized Successfully!")
 
 # ✅ Dependency to get a database session
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
+            started = time.perf_counter()
+            await session.connection()  # Acquire up front so the pool wait is measured
+            pool_wait_stats.record(time.perf_counter() - started)
             yield session
         finally:
             await session.close()  # Ensure session closes properly
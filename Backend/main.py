@@ -1,31 +1,66 @@
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from database import get_db
+from database import get_db, engine, warm_pool, pool_statistics, check_database
 from fastapi.middleware.cors import CORSMiddleware
 from auth import auth_router
 from routes.simulate import router as simulate_router
 from routes.suggestions import router as suggestions_router  
 from routes.risk_assessment import router as risk_router  
+from routes.jobs import router as jobs_router
+from routes.health import router as health_router
+from routes.metrics import router as metrics_router
+from routes.profiling import router as profiling_router, admin_guard
+from utils.health import readiness_prober
+from utils.jwt_auth import auth_guard
+from utils.log import get_logger, DebugSamplingMiddleware
+from utils.metrics import MetricsMiddleware, TimedJSONResponse
+from utils.profiling import ProfilingMiddleware, PROFILING_ENABLED
 
-app = FastAPI()
+logger = get_logger(__name__)
 
+@asynccontextmanager
+async def lifespan(app):
+    # Open the pool's connections before serving so the first requests skip the handshakes
+    try:
+        await warm_pool()
+    except Exception as e:
+        logger.warning("⚠️ Database pool warmup failed, connecting on demand: %s", e)
+    # Readiness is probed in the background; /readyz only reads the cached outcome
+    readiness_prober.register("database", check_database)
+    readiness_prober.start()
+    yield
+    await readiness_prober.stop()
+    await engine.dispose()
 
 
+# JSON responses are encoded by TimedJSONResponse so serialization time is recorded
+app = FastAPI(lifespan=lifespan, default_response_class=TimedJSONResponse)
 
+
+
+
+app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(profiling_router, prefix="/admin")
 app.include_router(auth_router, prefix="/auth")
 
 
-print("✅ Simulate Router Loaded Successfully!")
-app.include_router(simulate_router, prefix="/simulate")
+logger.info("✅ Simulate Router Loaded Successfully!")
+app.include_router(simulate_router, prefix="/simulate", dependencies=[Depends(auth_guard)])
+
 
+logger.info("✅ Suggestions Router Loaded Successfully!")
+app.include_router(suggestions_router, prefix="/suggestions", dependencies=[Depends(auth_guard)])  
 
-print("✅ Suggestions Router Loaded Successfully!")
-app.include_router(suggestions_router, prefix="/suggestions")  
 
+logger.info("✅ Risk Assessment Router Loaded Successfully!")
+app.include_router(risk_router, prefix="/risk-assessment", dependencies=[Depends(auth_guard)])
 
-print("✅ Risk Assessment Router Loaded Successfully!")
-app.include_router(risk_router, prefix="/risk-assessment")
+
+logger.info("✅ Jobs Router Loaded Successfully!")
+app.include_router(jobs_router, prefix="/jobs", dependencies=[Depends(auth_guard)])
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,8 +69,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Decides once per request whether its debug log output is kept
+app.add_middleware(DebugSamplingMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Outermost, so a profile covers the whole request; not installed at all unless enabled
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 
 
 @app.get("/")
 async def test_db(db: AsyncSession = Depends(get_db)):
     return {"message": "Database connected successfully!"}
+
+
+@app.get("/admin/db/pool", dependencies=[Depends(admin_guard)])
+async def database_pool():
+    """Connection pool occupancy and acquisition times."""
+    return pool_statistics()
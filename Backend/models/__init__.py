@@ -1,2 +1,3 @@
 from .gbm_model import geometric_brownian_motion
+from .analytic import analytic_simulation
 
@@ -0,0 +1,78 @@
+import numpy as np
+from scipy.special import ndtri
+from .monte_carlo import SimulationResult
+from .quantile_sketch import quantile_grid_levels, distribution_from_quantiles, DEFAULT_PERCENTILES, DEFAULT_VAR_LEVELS
+
+
+def yearly_checkpoint_steps(time_horizon, steps_per_year=252):
+    """
+    Number of daily steps behind each yearly value reported by monte_carlo_simulation.
+
+    The Monte Carlo engine takes rows 0, 252, 504, ... of the cumulative path, which sit
+    after 1, 253, 505, ... daily returns have been applied.
+    """
+    return np.arange(time_horizon) * steps_per_year + 1
+
+
+def lognormal_distribution(initial_value, mean_return, volatility, steps, steps_per_year=252, percentiles=DEFAULT_PERCENTILES):
+    """
+    Exact distribution of the portfolio value after a number of daily steps.
+
+    Daily log-returns are N(mean_return / steps_per_year, volatility**2 / steps_per_year),
+    so the value after n steps is lognormal with log-mean n * mean_return / steps_per_year
+    and log-variance n * volatility**2 / steps_per_year.
+
+    Args:
+        steps (int or np.array): Number of daily steps (vectorized over arrays).
+
+    Returns:
+        dict: mean, variance, std and a {percentile: value} mapping.
+    """
+    steps = np.asarray(steps, dtype=float)
+    log_mean = steps * mean_return / steps_per_year
+    log_var = steps * volatility ** 2 / steps_per_year
+
+    mean = initial_value * np.exp(log_mean + 0.5 * log_var)
+    variance = initial_value ** 2 * np.expm1(log_var) * np.exp(2 * log_mean + log_var)
+    quantiles = {
+        p: initial_value * np.exp(log_mean + np.sqrt(log_var) * ndtri(p / 100))
+        for p in percentiles
+    }
+
+    return {
+        "mean": mean,
+        "variance": variance,
+        "std": np.sqrt(variance),
+        "percentiles": quantiles,
+    }
+
+
+def analytic_simulation(initial_value, mean_return, volatility, time_horizon, steps_per_year=252,
+                        distribution=False, percentiles=DEFAULT_PERCENTILES, var_levels=DEFAULT_VAR_LEVELS):
+    """
+    Closed-form counterpart of monte_carlo_simulation: exact expected values instead of
+    the average over sampled paths, without drawing any random numbers.
+
+    Returns:
+        final_value (float): Expected final portfolio value.
+        yearly_values (np.array): Expected portfolio values at each yearly checkpoint.
+
+    The pair reports a zero standard error in .details, as the expectation is exact. With
+    distribution=True, .details also holds the exact percentile bands, VaR/CVaR and
+    probability of loss in the same layout as monte_carlo_summary.
+    """
+    yearly = lognormal_distribution(initial_value, mean_return, volatility,
+                                    yearly_checkpoint_steps(time_horizon, steps_per_year), steps_per_year, percentiles=())
+    final = lognormal_distribution(initial_value, mean_return, volatility,
+                                   time_horizon * steps_per_year, steps_per_year, percentiles=())
+
+    details = {"standard_error": 0.0, "paths": 0}
+    if distribution:
+        steps = np.append(yearly_checkpoint_steps(time_horizon, steps_per_year), time_horizon * steps_per_year)
+        log_mean = steps * mean_return / steps_per_year
+        log_std = np.sqrt(steps * volatility ** 2 / steps_per_year)
+        quantile_grid = initial_value * np.exp(log_mean[:, None] + log_std[:, None] * ndtri(quantile_grid_levels())[None, :])
+        details["distribution"] = distribution_from_quantiles(quantile_grid, initial_value, percentiles, var_levels)
+        details["distribution"]["quantile_grid"] = quantile_grid
+
+    return SimulationResult(float(final["mean"]), yearly["mean"], details)
@@ -0,0 +1,52 @@
+import threading
+import numpy as np
+
+SIMULATION_DTYPES = ("float64", "float32")
+
+
+def simulation_dtype(dtype):
+    """Validates a simulation precision given as a name or numpy dtype."""
+    dtype = np.dtype(dtype)
+    if dtype.name not in SIMULATION_DTYPES:
+        raise ValueError(f"Unsupported simulation dtype: {dtype.name}")
+    return dtype
+
+
+class BufferPool:
+    """
+    Named scratch arrays reused across simulations.
+
+    Each name owns one flat allocation per dtype, grown when a larger shape is requested,
+    and get() returns a view of it in the requested shape. Contents are not cleared, so
+    callers must overwrite a buffer before reading it, and must not use the same name for
+    two arrays that are alive at the same time.
+    """
+
+    def __init__(self):
+        self._storage = {}
+
+    def get(self, name, shape, dtype=np.float64):
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape))
+        storage = self._storage.get((name, dtype))
+        if storage is None or storage.size < size:
+            storage = np.empty(size, dtype=dtype)
+            self._storage[(name, dtype)] = storage
+        return storage[:size].reshape(shape)
+
+    def nbytes(self):
+        return sum(storage.nbytes for storage in self._storage.values())
+
+    def clear(self):
+        self._storage.clear()
+
+
+_local = threading.local()
+
+
+def get_buffer_pool():
+    """Buffer pool of the calling thread, so concurrent workers never share buffers."""
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = BufferPool()
+    return pool
@@ -0,0 +1,44 @@
+import time
+import threading
+
+
+class SimulationCancelled(Exception):
+    """Raised inside an engine when its cancellation token has been cancelled."""
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation flag shared between a request and the engines serving it.
+
+    The request side calls cancel() (e.g. when the client disconnects) or sets a deadline;
+    the engines call raise_if_cancelled() at safe points (between time blocks of paths,
+    batches, shard rounds or optimizer restarts), so abandoned work stops within one
+    chunk instead of running to completion.
+    """
+
+    def __init__(self, timeout_seconds=None, clock=time.monotonic):
+        self.clock = clock
+        self.deadline = clock() + timeout_seconds if timeout_seconds else None
+        self.reason = None
+        self._event = threading.Event()
+
+    def cancel(self, reason="cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self):
+        if not self._event.is_set() and self.deadline is not None and self.clock() >= self.deadline:
+            self.cancel("deadline exceeded")
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise SimulationCancelled(f"Simulation cancelled: {self.reason}")
+
+
+def raise_if_cancelled(cancel_token):
+    """raise_if_cancelled for an optional token."""
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
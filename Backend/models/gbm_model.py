@@ -1,27 +1,54 @@
-
 import numpy as np
+from .buffer_pool import get_buffer_pool, simulation_dtype
+from .shock_bank import shock_bank
+from .monte_carlo import RESOLUTIONS
 
-def geometric_brownian_motion(initial_value, mean_return, volatility, time_horizon, steps_per_year=252):
+def geometric_brownian_motion(initial_value, mean_return, volatility, time_horizon, steps_per_year=252, dtype="float64", resolution="auto"):
     """
     Simulates asset price using Geometric Brownian Motion and returns yearly values.
 
+    The path is built in a pooled buffer with in-place ufuncs (log increments, cumulative
+    sum, exponential). dtype="float32" computes it in single precision from the same
+    seeded shocks, so both precisions follow the same path. The shocks are read from the
+    shared shock bank when available.
+
+    Only the yearly values and the final value are returned, so by default ("auto" or
+    "yearly") the path is drawn with one aggregated increment per year, which has the same
+    distribution at those points as compounding 252 daily steps. resolution="daily" keeps
+    the daily path.
+
     Returns:
         price_path (np.array): Full simulated price path.
         yearly_values (np.array): Extracted yearly values.
     """
+    dtype = simulation_dtype(dtype)
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution: {resolution}")
     dt = 1 / steps_per_year
     time_steps = int(time_horizon * steps_per_year)
-    np.random.seed(42)
-    shocks = np.random.normal(0, np.sqrt(dt), size=time_steps)
-    price_path = np.zeros(time_steps + 1)
-    price_path[0] = initial_value
+    yearly_rows = np.minimum(np.arange(time_horizon) * steps_per_year, time_steps)
+    if resolution == "daily":
+        grid = np.arange(time_steps + 1)
+    else:
+        grid = np.union1d(yearly_rows, [0, time_steps])  # Start, yearly checkpoints and the end
+    steps = np.diff(grid)  # Days covered by each increment
+
+    price_path = get_buffer_pool().get("gbm_path", len(grid), dtype)
+    log_increments = price_path[1:]
+    banked_shocks = shock_bank.get(42, 1, len(steps))
+    if banked_shocks is not None:
+        log_increments[:] = banked_shocks[:len(steps), 0]  # Same draws as the seeded normal below
+        log_increments *= np.sqrt(steps * dt)
+    else:
+        np.random.seed(42)
+        log_increments[:] = np.random.normal(0, np.sqrt(steps * dt))
+    log_increments *= volatility
+    log_increments += (mean_return - 0.5 * volatility**2) * dt * steps
+    price_path[0] = 0
+    np.cumsum(price_path, out=price_path)
+    np.exp(price_path, out=price_path)
+    price_path *= initial_value
 
-    for t in range(1, time_steps+1 ):
-        price_path[t] = price_path[t - 1] * np.exp((mean_return - 0.5 * volatility**2) * dt + volatility * shocks[t - 1])
-    
     # Extract yearly values
-    yearly_values = np.array([price_path[min(year * steps_per_year, time_steps )] for year in range(time_horizon)])
-  # Ensure correct yearly intervals
-    # print("Shape of Yearly Portfolio Values:", yearly_values.shape)
-    # print("Final Portfolio Value:", price_path[-1] )
-    return price_path[-1], yearly_values  # Return full price path & yearly values
+    yearly_values = price_path[np.searchsorted(grid, yearly_rows)].astype(np.float64)  # Copied out of the reused buffer
+    return float(price_path[-1]), yearly_values  # Return full price path & yearly values
@@ -0,0 +1,65 @@
+import os
+import logging
+import threading
+import numpy as np
+
+logger = logging.getLogger(f"portfolio_pilot.{__name__}")  # Handlers are configured by utils.log
+
+# Compiled kernels are used when Numba is installed, unless disabled per deployment
+SIMULATION_JIT_ENABLED = os.getenv("SIMULATION_JIT", "true").lower() in ("1", "true", "yes")
+
+_kernel = None
+_kernel_loaded = False
+_kernel_lock = threading.Lock()
+
+
+def _advance_paths(shocks, scale, shift, log_growth, running_peak, worst_log_drawdown, track_drawdown):
+    """
+    Fused time steps: applies the drift and volatility of each row to its shocks, adds them
+    to the paths' log values and updates the running peak and worst drawdown, all in one
+    pass over the shocks with no intermediate arrays.
+
+    The arithmetic matches the NumPy kernel operation for operation, so float64 results
+    are identical whichever implementation runs.
+    """
+    steps, num_paths = shocks.shape
+    for step in range(steps):
+        row_scale = scale[step]
+        row_shift = shift[step]
+        for path in range(num_paths):
+            value = log_growth[path] + (shocks[step, path] * row_scale + row_shift)
+            log_growth[path] = value
+            if track_drawdown:
+                if value > running_peak[path]:
+                    running_peak[path] = value
+                elif running_peak[path] - value > worst_log_drawdown[path]:
+                    worst_log_drawdown[path] = running_peak[path] - value
+
+
+def get_advance_paths_kernel():
+    """
+    Returns the compiled _advance_paths, or None when Numba is unavailable or disabled
+    (callers then use their NumPy implementation).
+
+    Numba is imported on first use only. Compiled machine code is cached on disk
+    (cache=True), so later processes, including pool workers, load it instead of
+    recompiling; both supported dtypes are compiled or loaded up front.
+    """
+    global _kernel, _kernel_loaded
+    if not SIMULATION_JIT_ENABLED:
+        return None
+    with _kernel_lock:
+        if not _kernel_loaded:
+            _kernel_loaded = True
+            try:
+                import numba
+                kernel = numba.njit(cache=True, nogil=True)(_advance_paths)
+                for dtype in (np.float64, np.float32):
+                    state = [np.zeros(1, dtype=dtype) for _ in range(3)]
+                    kernel(np.zeros((1, 1), dtype=dtype), np.ones(1), np.zeros(1), *state, True)
+                _kernel = kernel
+            except ImportError:
+                pass
+            except Exception as e:
+                logger.warning("⚠️ Could not compile the simulation kernel, using NumPy: %s", e)
+        return _kernel
@@ -1,22 +1,773 @@
-
+import time
+import logging
+import types
+import itertools
 import numpy as np
+from concurrent.futures import wait
+from concurrent.futures.process import BrokenProcessPool
+from scipy.special import ndtri
+from scipy.stats import qmc
+from .buffer_pool import get_buffer_pool, simulation_dtype
+from .shock_bank import shock_bank
+from .process_pool import get_process_pool, shutdown_process_pool, MONTE_CARLO_WORKERS
+from .jit_kernels import get_advance_paths_kernel
+from .cancellation import raise_if_cancelled
+from .quantile_sketch import (QuantileSketch, quantile_grid_levels, distribution_from_quantiles,
+                              DEFAULT_PERCENTILES, DEFAULT_VAR_LEVELS)
+
+logger = logging.getLogger(f"portfolio_pilot.{__name__}")  # Handlers are configured by utils.log
+
+TRADING_DAYS_PER_YEAR = 252
+TIME_BLOCK_STEPS = 252  # Days simulated per block, bounds memory to TIME_BLOCK_STEPS x paths
+QMC_REPLICATES = 8  # Independent scrambles used to estimate the error of quasi-random runs
+QMC_CHUNK_POINTS = 256  # Quasi-random points generated at once within a replicate
+ADAPTIVE_BATCH_PATHS = 2000  # Paths per batch when sampling until a precision target or deadline
+ADAPTIVE_QMC_POINTS = 1024  # Points per quasi-random replicate in adaptive mode
+MAX_ADAPTIVE_PATHS = 200000  # Upper bound on paths in adaptive mode
+DRAWDOWN_PERCENTILES = (50, 95, 99)  # Tail of the simulated maximum drawdown distribution
+VARIANCE_REDUCTION_METHODS = ("none", "antithetic", "control_variate", "sobol", "halton")
+RESOLUTIONS = ("auto", "daily", "yearly")
+MIN_SHARD_WORK = 1_000_000  # Path-steps below which a run is faster than dispatching it to workers
+CANCEL_POLL_SECONDS = 0.05  # How often a sharded run waiting on workers checks its cancellation token
+
+
+class SimulationResult(tuple):
+    """
+    (final_value, yearly_values) pair, unpackable like a plain tuple, that also carries
+    estimator diagnostics (standard error, paths used, ...) in .details.
+    """
+
+    def __new__(cls, final_value, yearly_values, details=None):
+        result = super().__new__(cls, (final_value, yearly_values))
+        result.details = details or {}
+        return result
+
 
-def monte_carlo_simulation(initial_value, mean_return, volatility, time_horizon, iterations=10000):
+class PathStatistics:
+    """
+    Mergeable running moments of independent estimator samples at each checkpoint.
+
+    A sample is one path, an antithetic pair average, or a quasi-random replicate mean,
+    depending on the variance reduction method. Moments are combined with Chan's parallel
+    update so batches can be added in any order without losing precision. Optional
+    control values (with known expectation) are tracked for a regression control variate.
+    """
+
+    def __init__(self, num_checkpoints):
+        self.count = 0
+        self.mean_y = np.zeros(num_checkpoints)
+        self.m2_y = np.zeros(num_checkpoints)
+        self.mean_c = np.zeros(num_checkpoints)
+        self.m2_c = np.zeros(num_checkpoints)
+        self.c_yc = np.zeros(num_checkpoints)
+
+    def add(self, values, controls=None):
+        """Adds samples shaped (num_checkpoints, num_samples). Moments are kept in float64."""
+        other = PathStatistics(values.shape[0])
+        other.count = values.shape[1]
+        other.mean_y = values.mean(axis=1, dtype=np.float64)
+        dy = values - other.mean_y[:, None]
+        other.m2_y = np.einsum("ij,ij->i", dy, dy)
+        if controls is not None:
+            other.mean_c = controls.mean(axis=1, dtype=np.float64)
+            dc = controls - other.mean_c[:, None]
+            other.m2_c = np.einsum("ij,ij->i", dc, dc)
+            other.c_yc = np.einsum("ij,ij->i", dy, dc)
+        self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count = other.count
+            self.mean_y, self.m2_y = other.mean_y.copy(), other.m2_y.copy()
+            self.mean_c, self.m2_c, self.c_yc = other.mean_c.copy(), other.m2_c.copy(), other.c_yc.copy()
+            return
+        total = self.count + other.count
+        delta_y = other.mean_y - self.mean_y
+        delta_c = other.mean_c - self.mean_c
+        weight = self.count * other.count / total
+        self.mean_y = self.mean_y + delta_y * other.count / total
+        self.mean_c = self.mean_c + delta_c * other.count / total
+        self.m2_y = self.m2_y + other.m2_y + delta_y ** 2 * weight
+        self.m2_c = self.m2_c + other.m2_c + delta_c ** 2 * weight
+        self.c_yc = self.c_yc + other.c_yc + delta_y * delta_c * weight
+        self.count = total
+
+    def estimate(self, control_expectation=None):
+        """
+        Returns (mean, standard_error) per checkpoint. When control_expectation is given,
+        the mean is corrected with the regression control variate y - beta * (c - E[c]).
+        """
+        if self.count < 2:
+            return self.mean_y.copy(), np.full_like(self.mean_y, np.nan)
+        variance_y = self.m2_y / (self.count - 1)
+        if control_expectation is None:
+            return self.mean_y.copy(), np.sqrt(variance_y / self.count)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            beta = np.where(self.m2_c > 0, self.c_yc / self.m2_c, 0.0)
+            rho_squared = np.where(self.m2_c * self.m2_y > 0, self.c_yc ** 2 / (self.m2_c * self.m2_y), 0.0)
+        mean = self.mean_y - beta * (self.mean_c - control_expectation)
+        standard_error = np.sqrt(np.clip(variance_y * (1 - rho_squared), 0, None) / self.count)
+        return mean, standard_error
+
+
+class _Accumulator:
+    """
+    Everything a run keeps from its batches: moments, optional sketches and path counts.
+    Shards return one of these instead of path arrays, and the parent merges them.
+    """
+
+    def __init__(self, num_checkpoints, distribution=False, drawdown=False):
+        self.stats = PathStatistics(num_checkpoints)
+        self.sketch = QuantileSketch(num_checkpoints) if distribution else None
+        self.drawdown_stats = PathStatistics(1) if drawdown else None
+        self.drawdown_sketch = QuantileSketch(1) if drawdown else None
+        self.paths = 0
+        self.batches = 0
+
+    def add(self, batch):
+        self.stats.add(batch["samples"], batch["controls"])
+        if self.sketch is not None:
+            self.sketch.add(batch["values"])
+        if self.drawdown_stats is not None:
+            self.drawdown_stats.add(batch["drawdowns"][None, :])
+            self.drawdown_sketch.add(batch["drawdowns"][None, :])
+        self.paths += batch["paths"]
+        self.batches += 1
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        if self.sketch is not None:
+            self.sketch.merge(other.sketch)
+        if self.drawdown_stats is not None:
+            self.drawdown_stats.merge(other.drawdown_stats)
+            self.drawdown_sketch.merge(other.drawdown_sketch)
+        self.paths += other.paths
+        self.batches += other.batches
+
+
+def _checkpoint_rows(time_horizon):
+    """Rows of the daily path reported as yearly values, followed by the final row."""
+    yearly_rows = np.arange(time_horizon) * TRADING_DAYS_PER_YEAR
+    return np.append(yearly_rows, time_horizon * TRADING_DAYS_PER_YEAR - 1)
+
+
+def _step_sizes(checkpoint_rows):
+    """Daily steps between consecutive checkpoints, the first counted from the start."""
+    return np.diff(checkpoint_rows, prepend=-1)
+
+
+def _simulate_log_checkpoints(shock_blocks, daily_mean, daily_volatility, checkpoint_rows, num_paths,
+                              track_drawdown=False, out=None, dtype=np.float64, step_sizes=None):
+    """
+    Advances cumulative daily log-returns one time block at a time and records them at the
+    checkpoint rows. Only one block of shocks is held in memory at any time.
+
+    With step_sizes, row i of the shocks stands for step_sizes[i] days at once: as daily
+    log-returns are independent, their sum is drawn directly as one normal increment.
+
+    With track_drawdown=True the running peak and worst peak-to-trough fall of every path
+    are carried across blocks as well, using one extra block-sized buffer.
+
+    When Numba is available the steps run in a compiled kernel that fuses these passes
+    into one (see models.jit_kernels), splitting each block at the checkpoint rows.
+
+    Args:
+        shock_blocks (iterable): Standard normal arrays of the given dtype shaped
+            (block_steps, num_paths), which may be updated in place.
+        out (np.array, optional): Array receiving the checkpoints, allocated when omitted.
+        step_sizes (np.array, optional): Days covered by each row, one day when omitted.
+
+    Returns:
+        np.array: Cumulative log-returns shaped (len(checkpoint_rows), num_paths).
+        np.array or None: Maximum drawdown of each path as a fraction of its peak value.
+    """
+    pool = get_buffer_pool()
+    log_growth = pool.get("log_growth", num_paths, dtype)
+    log_growth.fill(0)
+    checkpoints = np.empty((len(checkpoint_rows), num_paths), dtype=dtype) if out is None else out
+    running_peak = np.zeros(num_paths, dtype=dtype)  # The initial value is the first peak
+    worst_log_drawdown = np.zeros(num_paths, dtype=dtype)
+    kernel = get_advance_paths_kernel()
+    row = 0
+    for block in shock_blocks:
+        steps = block.shape[0]
+        if kernel is not None:
+            if step_sizes is None:
+                scale, shift = np.full(steps, daily_volatility), np.full(steps, daily_mean)
+            else:
+                days = step_sizes[row:row + steps]
+                scale, shift = daily_volatility * np.sqrt(days), daily_mean * days
+            start = 0
+            for checkpoint in np.flatnonzero((checkpoint_rows >= row) & (checkpoint_rows < row + steps)):
+                stop = checkpoint_rows[checkpoint] - row + 1
+                kernel(block[start:stop], scale[start:stop], shift[start:stop],
+                       log_growth, running_peak, worst_log_drawdown, track_drawdown)
+                checkpoints[checkpoint] = log_growth
+                start = stop
+            if start < steps:
+                kernel(block[start:], scale[start:], shift[start:], log_growth, running_peak, worst_log_drawdown, track_drawdown)
+            row += steps
+            continue
+
+        if step_sizes is None:
+            block *= daily_volatility
+            block += daily_mean
+        else:
+            days = step_sizes[row:row + steps, None]
+            block *= daily_volatility * np.sqrt(days)
+            block += daily_mean * days
+        block[0] += log_growth  # Carry the path forward from the previous block
+        np.cumsum(block, axis=0, out=block)
+
+        in_block = (checkpoint_rows >= row) & (checkpoint_rows < row + steps)
+        checkpoints[in_block] = block[checkpoint_rows[in_block] - row]
+        log_growth[:] = block[-1]
+        row += steps
+
+        if track_drawdown:
+            peaks = pool.get("drawdown_peaks", block.shape, dtype)
+            np.maximum.accumulate(block, axis=0, out=peaks)
+            np.maximum(peaks, running_peak, out=peaks)
+            running_peak[:] = peaks[-1]
+            peaks -= block  # Log distance below the running peak
+            np.maximum(worst_log_drawdown, peaks.max(axis=0), out=worst_log_drawdown)
+
+    drawdowns = -np.expm1(-worst_log_drawdown, dtype=np.float64) if track_drawdown else None
+    return checkpoints, drawdowns
+
+
+def _standard_normal(random_state, shape, dtype, buffer_name):
+    """
+    Standard normal draws. A legacy RandomState (float64) returns a new array so its stream
+    stays identical to np.random.seed; a Generator fills a pooled buffer in place.
+    """
+    if isinstance(random_state, np.random.RandomState):
+        return random_state.standard_normal(shape)
+    return random_state.standard_normal(out=get_buffer_pool().get(buffer_name, shape, dtype), dtype=dtype)
+
+
+def _pseudo_random_blocks(random_state, time_steps, num_paths, antithetic=False, dtype=np.float64, banked_shocks=None):
+    """
+    Standard normal blocks drawn in time order, optionally mirrored into antithetic pairs.
+    When banked_shocks (the same stream, precomputed) is given, its rows are copied into a
+    pooled buffer instead of drawing from random_state.
+    """
+    pool = get_buffer_pool()
+    for start in range(0, time_steps, TIME_BLOCK_STEPS):
+        steps = min(TIME_BLOCK_STEPS, time_steps - start)
+        drawn_paths = num_paths // 2 if antithetic else num_paths
+        block = pool.get("shocks", (steps, num_paths), dtype)
+        if banked_shocks is not None:
+            block[:, :drawn_paths] = banked_shocks[start:start + steps]
+        elif antithetic:
+            block[:, :drawn_paths] = _standard_normal(random_state, (steps, drawn_paths), dtype, "antithetic_shocks")
+        else:
+            block = _standard_normal(random_state, (steps, num_paths), dtype, "shocks")
+        if antithetic:
+            np.negative(block[:, :drawn_paths], out=block[:, drawn_paths:])
+        yield block
+
+
+def _quasi_random_blocks(sampler, time_steps, num_points, dtype=np.float64):
+    """Standard normal blocks from low-discrepancy points, one dimension per day."""
+    uniforms = sampler.random(num_points)
+    np.clip(uniforms, 1e-12, 1 - 1e-12, out=uniforms)
+    for start in range(0, time_steps, TIME_BLOCK_STEPS):
+        stop = min(start + TIME_BLOCK_STEPS, time_steps)
+        block = get_buffer_pool().get("shocks", (stop - start, num_points), dtype)
+        yield ndtri(uniforms[:, start:stop].T, out=block)
+
+
+def _cancellable(blocks, cancel_token):
+    """Checks the cancellation token before every block of shocks is simulated."""
+    for block in blocks:
+        raise_if_cancelled(cancel_token)
+        yield block
+
+
+def _estimator_batches(initial_value, daily_mean, daily_volatility, time_steps, checkpoint_rows,
+                       variance_reduction, seed, batch_paths, track_drawdown=False, dtype=np.float64,
+                       banked_shocks=None, step_sizes=None, cancel_token=None):
+    """
+    Endless stream of batches of independent estimator samples, simulated over time_steps
+    rows of shocks (days, or coarse steps described by step_sizes).
+
+    Path values are written into pooled buffers that the next batch overwrites, so each
+    batch must be consumed before the following one is requested. banked_shocks replaces
+    the pseudo-random draws of the first batch only, so it suits fixed-size runs.
+    cancel_token is checked before each time block, raising SimulationCancelled.
+
+    Yields:
+        dict: samples and controls shaped (num_checkpoints, num_samples), paths (number of
+        paths simulated), values (every simulated path value, shaped (num_checkpoints,
+        paths)) and drawdowns (maximum drawdown per path, or None when not tracked).
+    """
+    pool = get_buffer_pool()
+    num_checkpoints = len(checkpoint_rows)
+    if variance_reduction in ("sobol", "halton"):
+        rng = np.random.default_rng(seed)
+        while True:
+            # Each batch is one independently scrambled replicate
+            if variance_reduction == "sobol":
+                sampler = qmc.Sobol(d=time_steps, scramble=True, seed=rng)
+            else:
+                sampler = qmc.Halton(d=time_steps, scramble=True, seed=rng)
+            values = pool.get("path_values", (num_checkpoints, batch_paths), dtype)
+            drawdown_chunks = []
+            for start in range(0, batch_paths, QMC_CHUNK_POINTS):
+                num_points = min(QMC_CHUNK_POINTS, batch_paths - start)
+                blocks = _cancellable(_quasi_random_blocks(sampler, time_steps, num_points, dtype), cancel_token)
+                chunk = values[:, start:start + num_points]
+                _, drawdowns = _simulate_log_checkpoints(blocks, daily_mean, daily_volatility, checkpoint_rows,
+                                                         num_points, track_drawdown, out=chunk, dtype=dtype,
+                                                         step_sizes=step_sizes)
+                np.exp(chunk, out=chunk)
+                chunk *= initial_value
+                drawdown_chunks.append(drawdowns)
+            yield {
+                "samples": values.mean(axis=1, dtype=np.float64)[:, None],
+                "controls": None,
+                "paths": batch_paths,
+                "values": values,
+                "drawdowns": np.concatenate(drawdown_chunks) if track_drawdown else None,
+            }
+    else:
+        # float64 keeps the legacy stream so default results match the original engine exactly;
+        # shards are seeded with SeedSequence children, which only a Generator accepts
+        if dtype == np.float64 and not isinstance(seed, np.random.SeedSequence):
+            random_state = np.random.RandomState(seed)
+        else:
+            random_state = np.random.default_rng(seed)
+        antithetic = variance_reduction == "antithetic"
+        while True:
+            blocks = _cancellable(_pseudo_random_blocks(random_state, time_steps, batch_paths, antithetic, dtype,
+                                                        banked_shocks), cancel_token)
+            banked_shocks = None
+            log_growth = pool.get("log_checkpoints", (num_checkpoints, batch_paths), dtype)
+            _, drawdowns = _simulate_log_checkpoints(blocks, daily_mean, daily_volatility, checkpoint_rows,
+                                                     batch_paths, track_drawdown, out=log_growth, dtype=dtype,
+                                                     step_sizes=step_sizes)
+            values = np.exp(log_growth, out=pool.get("path_values", (num_checkpoints, batch_paths), dtype))
+            values *= initial_value
+            batch = {"samples": values, "controls": None, "paths": batch_paths, "values": values, "drawdowns": drawdowns}
+            if antithetic:
+                half = batch_paths // 2
+                batch["samples"] = 0.5 * (values[:, :half] + values[:, half:])
+            elif variance_reduction == "control_variate":
+                batch["controls"] = log_growth
+            yield batch
+
+
+def _adaptive_stop(totals, min_batches, next_paths, precision, deadline_ms, max_iterations,
+                   control_expectation, started):
+    """Returns why adaptive sampling should stop after the batches so far, or None to go on."""
+    if totals.batches < min_batches:
+        return None
+    mean, standard_error = totals.stats.estimate(control_expectation)
+    if precision is not None and standard_error[-1] <= precision * abs(mean[-1]):
+        return "precision"
+    if deadline_ms is not None and (time.perf_counter() - started) * 1000 >= deadline_ms:
+        return "deadline"
+    if totals.paths + next_paths > max_iterations:
+        return "max_iterations"
+    return None
+
+
+def _simulate_shard(kernel, seed_sequence, shard_paths, num_batches, bank_columns=None):
+    """
+    Runs num_batches batches of shard_paths paths in a worker process. Only the merged
+    moments and sketches are returned, so no path arrays cross the process boundary.
+
+    bank_columns (seed, bank paths, start, stop) selects this shard's columns of the shared
+    shock bank, so a sharded fixed run uses the very shocks of the in-process run. Shards
+    fall back to their seed_sequence stream when the bank is unavailable.
+    """
+    banked_shocks = None
+    if bank_columns is not None:
+        seed, bank_paths, start, stop = bank_columns
+        banked_shocks = shock_bank.get(seed, bank_paths, kernel["time_steps"], kernel["dtype"])
+        if banked_shocks is not None:
+            banked_shocks = banked_shocks[:, start:stop]
+    totals = _Accumulator(len(kernel["checkpoint_rows"]), kernel["distribution"], kernel["drawdown"])
+    batches = _estimator_batches(kernel["initial_value"], kernel["daily_mean"], kernel["daily_volatility"],
+                                 kernel["time_steps"], kernel["checkpoint_rows"], kernel["variance_reduction"],
+                                 seed_sequence, shard_paths, kernel["drawdown"], kernel["dtype"],
+                                 banked_shocks, kernel["step_sizes"])
+    for batch in itertools.islice(batches, num_batches):
+        totals.add(batch)
+    return totals
+
+
+def _shard_layout(batch_paths, fixed_batches, workers, variance_reduction):
+    """
+    Splits a fixed-size run into (paths per batch, number of batches) per shard: paths are
+    split across shards (keeping antithetic pairs together), quasi-random replicates are
+    dealt out whole.
+    """
+    if variance_reduction in ("sobol", "halton"):
+        counts = [len(part) for part in np.array_split(np.arange(fixed_batches), workers)]
+        return [(batch_paths, count) for count in counts if count > 0]
+    unit = 2 if variance_reduction == "antithetic" else 1
+    units = [len(part) for part in np.array_split(np.arange(batch_paths // unit), workers)]
+    return [(count * unit, 1) for count in units if count > 0]
+
+
+def _gather(futures, cancel_token):
+    """
+    Waits for shard results. With a cancellation token the wait is polled, so a cancelled
+    run cancels its pending shards and raises (shards already running finish in their
+    worker and are discarded).
+    """
+    if cancel_token is None:
+        return [future.result() for future in futures]
+    while True:
+        _, pending = wait(futures, timeout=CANCEL_POLL_SECONDS)
+        if not pending:
+            return [future.result() for future in futures]
+        if cancel_token.cancelled:
+            for future in pending:
+                future.cancel()
+            cancel_token.raise_if_cancelled()
+
+
+def _run_sharded(kernel, seed, workers, batch_paths, fixed_batches, min_batches, adaptive,
+                 precision, deadline_ms, max_iterations, control_expectation, started, cancel_token=None):
+    """
+    Simulates in rounds of shards on the process pool and merges their partial results.
+    Each shard is seeded with its own SeedSequence child, so results are reproducible for
+    a given seed and number of workers. A fixed run is a single round; adaptive runs add
+    rounds of one batch per worker until a stopping rule is met. Fixed pseudo-random runs
+    split the shock bank's columns between shards instead, which reproduces the
+    in-process result whatever the number of workers.
+
+    Yields (totals, stop_reason) after every round, stop_reason being None until the last.
+    """
+    root_sequence = np.random.SeedSequence(seed)
+    totals = _Accumulator(len(kernel["checkpoint_rows"]), kernel["distribution"], kernel["drawdown"])
+    if adaptive:
+        layout = [(batch_paths, 1)] * workers
+    else:
+        layout = _shard_layout(batch_paths, fixed_batches, workers, kernel["variance_reduction"])
+    round_paths = sum(paths * count for paths, count in layout)
+
+    bank_columns = [None] * len(layout)
+    if not adaptive and kernel["variance_reduction"] not in ("sobol", "halton"):
+        unit = 2 if kernel["variance_reduction"] == "antithetic" else 1
+        if shock_bank.get(seed, batch_paths // unit, kernel["time_steps"], kernel["dtype"]) is not None:
+            stops = np.cumsum([paths // unit for paths, _ in layout])
+            bank_columns = [(seed, batch_paths // unit, int(stop - paths // unit), int(stop))
+                            for stop, (paths, _) in zip(stops, layout)]
+
+    while True:
+        raise_if_cancelled(cancel_token)
+        tasks = [(kernel, child, paths, count, columns)
+                 for child, (paths, count), columns in zip(root_sequence.spawn(len(layout)), layout, bank_columns)]
+        try:
+            pool = get_process_pool(workers)
+            partials = _gather([pool.submit(_simulate_shard, *task) for task in tasks], cancel_token)
+        except BrokenProcessPool as e:
+            logger.warning("⚠️ Monte Carlo worker pool failed, simulating in-process: %s", e)
+            shutdown_process_pool()
+            partials = []
+            for task in tasks:
+                raise_if_cancelled(cancel_token)
+                partials.append(_simulate_shard(*task))
+        for partial in partials:
+            totals.merge(partial)
+
+        if not adaptive:
+            yield totals, "fixed"
+            return
+        stop_reason = _adaptive_stop(totals, min_batches, round_paths, precision, deadline_ms, max_iterations,
+                                     control_expectation, started)
+        yield totals, stop_reason
+        if stop_reason is not None:
+            return
+
+
+def _running_estimate(totals, control_expectation):
+    """Estimate after the batches so far, streamed while a run is still sampling."""
+    means, standard_errors = totals.stats.estimate(control_expectation)
+    return {
+        "final_value": float(means[-1]),
+        "yearly_values": means[:-1],
+        "standard_error": float(standard_errors[-1]),
+        "paths": int(totals.paths),
+        "stop_reason": None,
+    }
+
+
+def monte_carlo_summary(initial_value, mean_return, volatility, time_horizon, iterations=10000,
+                        variance_reduction="none", seed=42, precision=None, deadline_ms=None,
+                        max_iterations=MAX_ADAPTIVE_PATHS, distribution=False,
+                        percentiles=DEFAULT_PERCENTILES, var_levels=DEFAULT_VAR_LEVELS, drawdown=False,
+                        dtype="float64", resolution="auto", workers=None, cancel_token=None):
+    """
+    Monte Carlo simulation of daily log-returns N(mean_return / 252, volatility / sqrt(252))
+    with optional variance reduction.
+
+    variance_reduction:
+        - "none": plain pseudo-random paths; at daily resolution these are the original
+          engine's draws, so pass resolution="daily" to reproduce its results (the
+          default "auto" grid is yearly unless drawdown is requested).
+        - "antithetic": each draw Z is paired with -Z.
+        - "control_variate": regression control on the cumulative log-return, whose
+          expectation is known exactly.
+        - "sobol" / "halton": scrambled quasi-random points, split into independent
+          replicates so the standard error can still be estimated.
+
+    By default exactly `iterations` paths are simulated, except for quasi-random runs, which
+    simulate QMC_REPLICATES equal replicates and so round down to a multiple of them. Sobol
+    replicates are further rounded down to a power of two points (iterations=10000 gives
+    8 x 1024 = 8192 paths). The "paths" entry always reports the number actually used. Setting precision (target standard
+    error of the final value relative to its mean) and/or deadline_ms (wall-clock budget)
+    switches to adaptive mode: paths are simulated in batches until the target is met, the
+    budget is spent or max_iterations paths have been used, whichever comes first.
+
+    With distribution=True every simulated path value is also streamed into a quantile
+    sketch during the same pass, and the result gains a "distribution" entry with yearly
+    percentile bands, VaR/CVaR at var_levels, the probability of loss and the quantile
+    grid it was derived from (see distribution_from_quantiles).
+
+    With drawdown=True each path's running peak and worst drawdown are tracked inside the
+    time-block kernel, and the result gains a "drawdown" entry with the expected maximum
+    drawdown, its standard error and tail percentiles, as fractions of the peak value.
+
+    dtype="float32" runs the path arithmetic in single precision, halving the memory
+    traffic of the kernel. Pseudo-random shocks then come from a PCG64 Generator that fills
+    the pooled buffers in place, so results differ from float64 runs by sampling noise (and
+    a rounding error far below it). Estimator moments are always accumulated in float64.
+
+    resolution picks the time grid. "daily" steps through every trading day, "yearly"
+    draws one aggregated increment per reported checkpoint (T + 1 rows instead of 252 * T),
+    which yields the same distribution at the checkpoints. "auto" uses the yearly grid
+    unless drawdown is requested, as drawdown depends on the whole daily path.
+
+    Fixed-size pseudo-random runs read their shocks from the shared memory-mapped shock
+    bank (see models.shock_bank), which holds exactly the stream they would draw, so
+    results are unchanged while the random number generation is skipped.
+
+    workers > 1 (default MONTE_CARLO_WORKERS) shards the paths across a persistent
+    process pool when the run is large enough to benefit. Each shard reads its columns of
+    the shock bank or, for adaptive and quasi-random runs, gets a SeedSequence child of
+    seed, and returns only its moments and sketches, which are merged here.
+
+    cancel_token (models.cancellation.CancellationToken) is checked between time blocks
+    of paths and between shard rounds; once cancelled the run raises SimulationCancelled.
+
+    Returns:
+        dict: final_value, yearly_values, standard_error (of the final value),
+        yearly_standard_error, paths, variance_reduction, stop_reason
+        ("fixed", "precision", "deadline" or "max_iterations"), resolution and workers
+        (1 when the run stayed in-process).
+    """
+    for summary in iter_monte_carlo_summary(initial_value, mean_return, volatility, time_horizon, iterations,
+                                            variance_reduction, seed, precision, deadline_ms, max_iterations,
+                                            distribution, percentiles, var_levels, drawdown, dtype, resolution,
+                                            workers, cancel_token):
+        pass
+    return summary
+
+
+def iter_monte_carlo_summary(initial_value, mean_return, volatility, time_horizon, iterations=10000,
+                             variance_reduction="none", seed=42, precision=None, deadline_ms=None,
+                             max_iterations=MAX_ADAPTIVE_PATHS, distribution=False,
+                             percentiles=DEFAULT_PERCENTILES, var_levels=DEFAULT_VAR_LEVELS, drawdown=False,
+                             dtype="float64", resolution="auto", workers=None, cancel_token=None):
+    """
+    Incremental form of monte_carlo_summary (same arguments): yields a running estimate
+    (final_value, yearly_values, standard_error, paths and a None stop_reason) each time
+    a batch of paths, quasi-random replicate or round of shards completes without ending
+    the run, then the complete summary, whose stop_reason is set. Runs made of a single
+    batch yield the summary only. Closing the generator stops the simulation between
+    batches.
+    """
+    if variance_reduction not in VARIANCE_REDUCTION_METHODS:
+        raise ValueError(f"Unknown variance reduction method: {variance_reduction}")
+    dtype = simulation_dtype(dtype)
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution: {resolution}")
+    if resolution == "auto":
+        resolution = "daily" if drawdown else "yearly"
+    if resolution == "yearly" and drawdown:
+        raise ValueError("Drawdown needs the daily resolution")
+
+    started = time.perf_counter()
+    adaptive = precision is not None or deadline_ms is not None
+    quasi_random = variance_reduction in ("sobol", "halton")
+    time_steps = time_horizon * TRADING_DAYS_PER_YEAR
+    daily_mean = mean_return / TRADING_DAYS_PER_YEAR
+    daily_volatility = volatility / np.sqrt(TRADING_DAYS_PER_YEAR)
+    checkpoint_rows = _checkpoint_rows(time_horizon)
+    control_expectation = (checkpoint_rows + 1) * daily_mean if variance_reduction == "control_variate" else None
+    if resolution == "yearly":
+        # One coarse step per checkpoint: simulate on the checkpoints themselves
+        step_sizes = _step_sizes(checkpoint_rows)
+        kernel_steps, kernel_rows = len(checkpoint_rows), np.arange(len(checkpoint_rows))
+    else:
+        step_sizes, kernel_steps, kernel_rows = None, time_steps, checkpoint_rows
+
+    if quasi_random:
+        batch_paths = ADAPTIVE_QMC_POINTS if adaptive else max(2, iterations // QMC_REPLICATES)
+        if variance_reduction == "sobol":
+            # Sobol points are balanced in powers of two: round down so the run stays within iterations
+            batch_paths = 2 ** int(np.floor(np.log2(batch_paths)))
+        fixed_batches = QMC_REPLICATES
+    else:
+        batch_paths = ADAPTIVE_BATCH_PATHS if adaptive else iterations
+        if variance_reduction == "antithetic":
+            batch_paths += batch_paths % 2
+        fixed_batches = 1
+    min_batches = 2 if quasi_random else 1  # Replicate means need a spread to estimate the error
+
+    kernel = {
+        "initial_value": initial_value, "daily_mean": daily_mean, "daily_volatility": daily_volatility,
+        "time_steps": kernel_steps, "checkpoint_rows": kernel_rows, "step_sizes": step_sizes,
+        "variance_reduction": variance_reduction, "dtype": dtype, "distribution": distribution, "drawdown": drawdown,
+    }
+    workers = MONTE_CARLO_WORKERS if workers is None else workers
+    round_work = batch_paths * (workers if adaptive else fixed_batches) * kernel_steps
+    if workers > 1 and seed is not None and round_work >= MIN_SHARD_WORK:
+        for totals, stop_reason in _run_sharded(kernel, seed, workers, batch_paths, fixed_batches, min_batches,
+                                                adaptive, precision, deadline_ms, max_iterations,
+                                                control_expectation, started, cancel_token):
+            if stop_reason is None and totals.batches >= min_batches:
+                yield _running_estimate(totals, control_expectation)
+    else:
+        workers = 1
+        totals = _Accumulator(len(checkpoint_rows), distribution, drawdown)
+        banked_shocks = None
+        if not adaptive and not quasi_random:
+            drawn_paths = batch_paths // 2 if variance_reduction == "antithetic" else batch_paths
+            banked_shocks = shock_bank.get(seed, drawn_paths, kernel_steps, dtype)
+
+        batches = _estimator_batches(initial_value, daily_mean, daily_volatility, kernel_steps, kernel_rows,
+                                     variance_reduction, seed, batch_paths, drawdown, dtype, banked_shocks, step_sizes,
+                                     cancel_token)
+        stop_reason = "fixed"
+        for batch in batches:
+            totals.add(batch)
+            if not adaptive:
+                if totals.batches >= fixed_batches:
+                    break
+            else:
+                stop_reason = _adaptive_stop(totals, min_batches, batch_paths, precision, deadline_ms,
+                                             max_iterations, control_expectation, started)
+                if stop_reason is not None:
+                    break
+            if totals.batches >= min_batches:
+                yield _running_estimate(totals, control_expectation)
+
+    means, standard_errors = totals.stats.estimate(control_expectation)
+    summary = {
+        "final_value": float(means[-1]),
+        "yearly_values": means[:-1],
+        "standard_error": float(standard_errors[-1]),
+        "yearly_standard_error": standard_errors[:-1],
+        "paths": int(totals.paths),
+        "variance_reduction": variance_reduction,
+        "stop_reason": stop_reason,
+        "resolution": resolution,
+        "workers": workers,
+    }
+    if distribution:
+        quantile_grid = totals.sketch.quantiles(quantile_grid_levels())
+        summary["distribution"] = distribution_from_quantiles(quantile_grid, initial_value, percentiles, var_levels)
+        summary["distribution"]["quantile_grid"] = quantile_grid
+    if drawdown:
+        expected, standard_error = totals.drawdown_stats.estimate()
+        tail_levels = [p / 100 for p in DRAWDOWN_PERCENTILES]
+        tail_values = totals.drawdown_sketch.quantiles(tail_levels)[0]
+        summary["drawdown"] = {
+            "expected": float(expected[0]),
+            "standard_error": float(standard_error[0]),
+            "percentiles": {p: float(v) for p, v in zip(DRAWDOWN_PERCENTILES, tail_values)},
+        }
+    yield summary
+
+
+def monte_carlo_simulation(initial_value, mean_return, volatility, time_horizon, iterations=10000,
+                           variance_reduction="none", seed=42, precision=None, deadline_ms=None,
+                           max_iterations=MAX_ADAPTIVE_PATHS, distribution=False,
+                           percentiles=DEFAULT_PERCENTILES, var_levels=DEFAULT_VAR_LEVELS, drawdown=False,
+                           dtype="float64", resolution="auto", workers=None, cancel_token=None):
     """
     Monte Carlo simulation to estimate future investment performance with yearly values.
 
     Returns:
-        final_values (np.array): Simulated final portfolio values.
+        final_values (float): Average simulated final portfolio value.
         yearly_values (np.array): Average portfolio values at each year.
+
+    The returned pair also exposes the estimator's standard error, the number of paths
+    actually used and why sampling stopped in .details (see monte_carlo_summary).
+    """
+    summary = monte_carlo_summary(initial_value, mean_return, volatility, time_horizon, iterations,
+                                  variance_reduction, seed, precision, deadline_ms, max_iterations,
+                                  distribution, percentiles, var_levels, drawdown, dtype, resolution, workers,
+                                  cancel_token)
+    return _simulation_result(summary)
+
+
+def iter_monte_carlo_simulation(initial_value, mean_return, volatility, time_horizon, **options):
+    """
+    Incremental form of monte_carlo_simulation: yields the running estimates of
+    iter_monte_carlo_summary (dicts), then the final SimulationResult.
+    """
+    for summary in iter_monte_carlo_summary(initial_value, mean_return, volatility, time_horizon, **options):
+        yield summary if summary["stop_reason"] is None else _simulation_result(summary)
+
+
+def _simulation_result(summary):
+    details = {key: value for key, value in summary.items() if key not in ("final_value", "yearly_values")}
+    return SimulationResult(summary["final_value"], summary["yearly_values"], details)
+
+
+def stream_expected_path(outcome, **labels):
     """
-    np.random.seed(42)
-    daily_returns = np.random.normal(mean_return / 252, volatility / np.sqrt(252), (time_horizon * 252, iterations))
-    growth_factors = np.exp(daily_returns.cumsum(axis=0))
-    portfolio_values = initial_value * growth_factors  # Shape: (days, iterations)
+    Relays a running simulation: for a streaming engine call (iter_monte_carlo_simulation)
+    yields one "estimate" event, tagged with labels, per running estimate and returns the
+    final SimulationResult; engines that return their result directly yield nothing.
+
+    Used as `result = yield from stream_expected_path(engine(...), asset=asset)`.
+    """
+    if not isinstance(outcome, types.GeneratorType):
+        return outcome
+    for item in outcome:
+        if isinstance(item, SimulationResult):
+            return item
+        yield dict(labels, event="estimate", paths=item["paths"], final_value=item["final_value"],
+                   standard_error=item["standard_error"],
+                   yearly_values=[float(value) for value in item["yearly_values"]])
+    raise RuntimeError("Simulation stream ended without a result")
+
+
+def combine_asset_errors(asset_estimates):
+    """
+    Standard error and path count of a portfolio's Monte Carlo estimate from the
+    (standard_error, paths) pairs of its assets. Every asset is driven by the same seeded
+    shocks, so errors add up rather than in quadrature.
+    """
+    standard_error, paths = 0, 0
+    for asset_standard_error, asset_paths in asset_estimates:
+        standard_error += asset_standard_error
+        paths += asset_paths
+    return standard_error, paths
 
-    yearly_values = portfolio_values[::252, :].mean(axis=1)[:time_horizon]
 
-    
+def split_deadline(options, num_assets):
+    """Shares a request-level deadline_ms budget in the options evenly between num_assets simulations."""
+    if options.get("deadline_ms") is None or num_assets == 0:
+        return options
+    return dict(options, deadline_ms=options["deadline_ms"] / num_assets)
 
 
-    return portfolio_values[-1, :].mean(), yearly_values  
+def simulated_drawdown(initial_value, mean_return, volatility, time_horizon, **options):
+    """
+    Expected and tail maximum drawdown of simulated paths (see monte_carlo_summary). Used
+    when the expected path comes from the analytic engine, as drawdown needs sampling.
+    """
+    return monte_carlo_summary(initial_value, mean_return, volatility, time_horizon,
+                               **dict(options, drawdown=True))["drawdown"]
@@ -3,6 +3,10 @@ import numpy as np
 import scipy.optimize as sco  
 from scipy.optimize import minimize
 import math # Added for isnan, isinf
+import logging
+from .cancellation import SimulationCancelled, raise_if_cancelled
+
+logger = logging.getLogger(f"portfolio_pilot.{__name__}")  # Handlers are configured by utils.log
 
 # Helper function to sanitize values for JSON compatibility
 def sanitize_value(value):
@@ -15,12 +19,15 @@ def sanitize_value(value):
         return {k: sanitize_value(v) for k, v in value.items()}
     return value
 
-def optimize_stock_allocation(stock_data, risk_tolerance, duration):
+def optimize_stock_allocation(stock_data, risk_tolerance, duration, progress=None, cancel_token=None):
     """
     Optimizes stock allocation within the 'Stocks' category using Modern Portfolio Theory (MPT),
     factoring in risk tolerance and investment duration.
+
+    progress, when given, is called with the fraction of optimizer restarts completed.
+    cancel_token is checked before every restart; once cancelled, SimulationCancelled is raised.
     """
-    print(f"Starting optimize_stock_allocation for {len(stock_data)} stocks.") # Using print
+    logger.debug("Starting optimize_stock_allocation", extra={"stocks": len(stock_data)})
     try:
        
         prices = pd.DataFrame({ticker: data['Close'] for ticker, data in stock_data.items()})
@@ -59,7 +66,9 @@ def optimize_stock_allocation(stock_data, risk_tolerance, duration):
 
         # Reduced iterations from 1000 to 100 for performance with more assets.
         # This may slightly reduce the chance of finding the absolute global optimum.
-        for _ in range(100):  
+        restarts = 100
+        for restart in range(restarts):
+            raise_if_cancelled(cancel_token)
             initial_weights = np.random.dirichlet(np.ones(num_stocks), size=1)[0]  
             result = sco.minimize(objective_function, initial_weights, method='SLSQP', bounds=bounds, constraints=constraints)
 
@@ -67,6 +76,8 @@ def optimize_stock_allocation(stock_data, risk_tolerance, duration):
                 best_result = result
                 best_weights = result.x
                 best_value = result.fun
+            if progress:
+                progress((restart + 1) / restarts)
 
         if best_result is None:
             return {"error": "Stock optimization failed."}
@@ -80,12 +91,13 @@ def optimize_stock_allocation(stock_data, risk_tolerance, duration):
             stock: round(weight * 100, 2) if weight is not None else None 
             for stock, weight in zip(stock_data.keys(), sanitized_weights)
         }
-        print(f"Optimization attempt completed for {num_stocks} stocks.") # Using print
+        logger.debug("Optimization attempt completed", extra={"stocks": num_stocks})
         return result_allocation
 
+    except SimulationCancelled:
+        raise
     except Exception as e:
-        print(f"Error optimizing stock allocation for {len(stock_data)} stocks: {e}")
-        print(f"Optimization attempt completed for {len(stock_data)} stocks with error.") # Using print
+        logger.error("Error optimizing stock allocation: %s", e, extra={"stocks": len(stock_data)})
         # Error dictionary is inherently JSON compliant with string values
         return {"error": "Stock allocation optimization failed."}
 
@@ -0,0 +1,38 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Worker processes used to shard Monte Carlo paths, 1 keeps simulations in-process
+MONTE_CARLO_WORKERS = int(os.getenv("MONTE_CARLO_WORKERS", "1"))
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(max_workers):
+    """
+    Returns the persistent process pool, (re)created with at least max_workers processes.
+
+    Workers are spawned rather than forked, as forking a process that runs server threads
+    can copy held locks into the children. They stay alive between requests, so the
+    interpreter start-up and imports are paid once.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < max_workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = max_workers
+        return _pool
+
+
+def shutdown_process_pool():
+    """Stops the worker processes; the next sharded simulation starts a new pool."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool, _pool_workers = None, 0
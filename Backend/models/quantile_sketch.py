@@ -0,0 +1,124 @@
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.002  # Quantiles are returned within 0.2% of the true value
+QUANTILE_GRID_SIZE = 1000  # Levels (k + 0.5) / 1000 used to describe a distribution
+MIN_TRACKED_VALUE = 1e-300  # Values at or below this are counted in the lowest bucket
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_VAR_LEVELS = (0.95, 0.99)
+
+
+def quantile_grid_levels(size=QUANTILE_GRID_SIZE):
+    """Midpoint probability levels at which distributions are summarized."""
+    return (np.arange(size) + 0.5) / size
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch for positive values, one row per checkpoint.
+
+    Values are counted in logarithmic buckets of width log(gamma), so every quantile is
+    reported within the configured relative accuracy while memory grows only with the
+    spread of the values (not their number). Sketches built from separate batches or
+    processes can be merged exactly.
+    """
+
+    def __init__(self, num_rows, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.num_rows = num_rows
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.offset = 0
+        self.counts = np.zeros((num_rows, 0), dtype=np.int64)
+        self.count = 0
+
+    def add(self, values):
+        """Adds observations shaped (num_rows, num_values)."""
+        if values.shape[1] == 0:
+            return
+        indices = np.ceil(np.log(np.maximum(values, MIN_TRACKED_VALUE, dtype=np.float64)) / self.log_gamma).astype(np.int64)
+        low, high = int(indices.min()), int(indices.max())
+        self._extend(low, high)
+        width = self.counts.shape[1]
+        flat = (indices - self.offset) + np.arange(self.num_rows)[:, None] * width
+        self.counts += np.bincount(flat.ravel(), minlength=self.num_rows * width).reshape(self.num_rows, width)
+        self.count += values.shape[1]
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        self._extend(other.offset, other.offset + other.counts.shape[1] - 1)
+        start = other.offset - self.offset
+        self.counts[:, start:start + other.counts.shape[1]] += other.counts
+        self.count += other.count
+
+    def quantiles(self, levels):
+        """
+        Returns quantile estimates shaped (num_rows, len(levels)) for probabilities in [0, 1].
+        """
+        levels = np.asarray(levels, dtype=float)
+        if self.count == 0:
+            return np.full((self.num_rows, len(levels)), np.nan)
+        ranks = levels * (self.count - 1)
+        cumulative = np.cumsum(self.counts, axis=1)
+        bucket_values = 2 * self.gamma ** (np.arange(self.counts.shape[1]) + self.offset) / (self.gamma + 1)
+        result = np.empty((self.num_rows, len(levels)))
+        for row in range(self.num_rows):
+            buckets = np.searchsorted(cumulative[row], ranks, side="right")
+            result[row] = bucket_values[np.minimum(buckets, self.counts.shape[1] - 1)]
+        return result
+
+    def _extend(self, low, high):
+        width = self.counts.shape[1]
+        if width == 0:
+            self.offset = low
+            self.counts = np.zeros((self.num_rows, high - low + 1), dtype=np.int64)
+            return
+        new_offset = min(self.offset, low)
+        new_high = max(self.offset + width - 1, high)
+        if new_offset == self.offset and new_high == self.offset + width - 1:
+            return
+        counts = np.zeros((self.num_rows, new_high - new_offset + 1), dtype=np.int64)
+        counts[:, self.offset - new_offset:self.offset - new_offset + width] = self.counts
+        self.offset, self.counts = new_offset, counts
+
+
+def distribution_from_quantiles(quantile_grid, initial_value, percentiles, var_levels):
+    """
+    Summarizes distributions given as quantile grids (see quantile_grid_levels).
+
+    Args:
+        quantile_grid (np.array): Values shaped (num_rows, grid_size), last row being the
+            final horizon and earlier rows the yearly checkpoints.
+        initial_value (float): Amount invested, the reference for losses.
+        percentiles (iterable): Percentile bands to report, e.g. (5, 25, 50, 75, 95).
+        var_levels (iterable): Confidence levels for VaR and CVaR, e.g. (0.95, 0.99).
+
+    Returns:
+        dict: yearly_percentiles {p: np.array}, final_percentiles {p: float}, var {level: float}
+        and cvar {level: float} as positive loss amounts, probability_of_loss (final value
+        below the amount invested) and yearly_probability_of_loss.
+    """
+    levels = quantile_grid_levels(quantile_grid.shape[1])
+    final_quantiles = quantile_grid[-1]
+
+    percentile_values = {
+        p: np.array([np.interp(p / 100, levels, row) for row in quantile_grid])
+        for p in percentiles
+    }
+    var = {}
+    cvar = {}
+    for level in var_levels:
+        tail = 1 - level
+        var[level] = float(initial_value - np.interp(tail, levels, final_quantiles))
+        in_tail = levels < tail
+        tail_mean = final_quantiles[in_tail].mean() if in_tail.any() else final_quantiles[0]
+        cvar[level] = float(initial_value - tail_mean)
+    loss_probability = (quantile_grid < initial_value).mean(axis=1)
+
+    return {
+        "yearly_percentiles": {p: values[:-1] for p, values in percentile_values.items()},
+        "final_percentiles": {p: float(values[-1]) for p, values in percentile_values.items()},
+        "var": var,
+        "cvar": cvar,
+        "probability_of_loss": float(loss_probability[-1]),
+        "yearly_probability_of_loss": loss_probability[:-1],
+    }
@@ -0,0 +1,119 @@
+import os
+import logging
+import tempfile
+import threading
+import numpy as np
+
+# Shock bank configuration, overridable per deployment
+logger = logging.getLogger(f"portfolio_pilot.{__name__}")  # Handlers are configured by utils.log
+SHOCK_BANK_ENABLED = os.getenv("SHOCK_BANK_ENABLED", "true").lower() in ("1", "true", "yes")
+SHOCK_BANK_DIR = os.getenv("SHOCK_BANK_DIR", os.path.join(tempfile.gettempdir(), "portfolio-pilot-shocks"))
+SHOCK_BANK_MAX_STEPS = int(os.getenv("SHOCK_BANK_MAX_YEARS", "30")) * 252  # Longer horizons draw live
+BANK_FILL_ROWS = 252  # Rows drawn at once while building a bank file
+
+
+def draw_standard_normal(seed, shape, dtype=np.float64, out=None):
+    """
+    Seeded standard normal draws, in the same order as the simulation engines draw them.
+
+    float64 uses the legacy RandomState stream (identical to np.random.seed), float32 a
+    PCG64 Generator. Filling the rows of `out` block by block gives the same values as one
+    large draw, so any prefix of rows is the stream of a shorter horizon.
+    """
+    dtype = np.dtype(dtype)
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    if dtype == np.float64:
+        random_state = np.random.RandomState(seed)
+        for start in range(0, shape[0], BANK_FILL_ROWS):
+            out[start:start + BANK_FILL_ROWS] = random_state.standard_normal((min(BANK_FILL_ROWS, shape[0] - start),) + tuple(shape[1:]))
+    else:
+        generator = np.random.default_rng(seed)
+        for start in range(0, shape[0], BANK_FILL_ROWS):
+            generator.standard_normal(out=out[start:start + BANK_FILL_ROWS], dtype=dtype)
+    return out
+
+
+class ShockBank:
+    """
+    Precomputed standard normal shocks shared by every worker through memory-mapped files.
+
+    With a fixed seed the simulations draw the same standard normal matrix on every call,
+    so it is generated once per (seed, number of paths, dtype), written to directory as a
+    .npy file and memory-mapped read-only. Workers on the same host then share one
+    page-cached copy, and simulations only apply the drift and volatility to its rows.
+    A bank is rebuilt (at least doubling) when a longer horizon is requested, up to
+    max_steps rows.
+    """
+
+    def __init__(self, directory=SHOCK_BANK_DIR, max_steps=SHOCK_BANK_MAX_STEPS, enabled=SHOCK_BANK_ENABLED):
+        self.directory = directory
+        self.max_steps = max_steps
+        self.enabled = enabled
+        self._banks = {}  # (seed, num_paths, dtype) -> read-only memmap
+        self._lock = threading.Lock()
+
+    def get(self, seed, num_paths, steps, dtype=np.float64):
+        """
+        Returns a read-only array with at least `steps` rows of shocks for num_paths paths,
+        or None when the bank is disabled, the horizon exceeds max_steps or the files
+        cannot be used (callers then draw the shocks themselves).
+        """
+        if not self.enabled or seed is None or steps > self.max_steps:
+            return None
+        dtype = np.dtype(dtype)
+        key = (int(seed), int(num_paths), dtype.name)
+        with self._lock:
+            bank = self._banks.get(key)
+            if bank is None or bank.shape[0] < steps:
+                try:
+                    bank = self._load(key, steps)
+                except (OSError, ValueError) as e:
+                    logger.warning("⚠️ Shock bank unavailable, drawing shocks directly: %s", e)
+                    return None
+                self._banks[key] = bank
+        return bank
+
+    def clear(self):
+        with self._lock:
+            self._banks.clear()
+
+    def _path(self, key):
+        seed, num_paths, dtype_name = key
+        return os.path.join(self.directory, f"shocks-{dtype_name}-seed{seed}-paths{num_paths}.npy")
+
+    def _load(self, key, steps):
+        path = self._path(key)
+        existing_steps = 0
+        try:
+            bank = np.load(path, mmap_mode="r")
+            if bank.shape[1:] == (key[1],) and bank.dtype == np.dtype(key[2]):
+                if bank.shape[0] >= steps:
+                    return bank  # Built by this or another worker
+                existing_steps = bank.shape[0]
+        except (OSError, ValueError):
+            pass
+        # Grow geometrically so a run of increasing horizons rebuilds only a few times
+        return self._build(key, min(self.max_steps, max(steps, 2 * existing_steps)))
+
+    def _build(self, key, steps):
+        seed, num_paths, dtype_name = key
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            bank = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype_name, shape=(steps, num_paths))
+            draw_standard_normal(seed, bank.shape, dtype_name, out=bank)
+            bank.flush()
+            del bank
+            os.replace(tmp_path, self._path(key))  # Atomic so other workers never map a partial file
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info("✅ Built shock bank %s (%d steps)", os.path.basename(self._path(key)), steps)
+        return np.load(self._path(key), mmap_mode="r")
+
+
+# Shared bank used by the Monte Carlo and GBM models
+shock_bank = ShockBank()
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from utils.health import readiness_prober
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is serving requests. No I/O."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness from the background prober's cached checks: 200 when ready, 503 otherwise."""
+    snapshot = readiness_prober.snapshot()
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
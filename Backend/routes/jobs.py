@@ -0,0 +1,80 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from routes.simulate import SimulationRequest, validate_simulation_request, run_simulation_request
+from routes.suggestions import PortfolioRequest, validate_portfolio_request, run_suggestions_request
+from utils.data_loader import get_data_version
+from utils.job_queue import job_manager, JobQueueFull
+from utils.result_cache import make_cache_key
+
+router = APIRouter()
+
+QUEUE_FULL_RETRY_AFTER_SECONDS = 5
+
+
+def _submit(kind, key, fn):
+    try:
+        job, created = job_manager.submit(kind, key, fn)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e),
+                            headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER_SECONDS)})
+    body = job.to_dict()
+    body["deduplicated"] = not created
+    return JSONResponse(status_code=202, content=body, headers={"Location": f"/jobs/{job.id}"})
+
+
+def _job_error(fn):
+    # HTTPExceptions raised by the shared request handlers keep their detail in the job error
+    def run(progress):
+        try:
+            return fn(progress)
+        except HTTPException as e:
+            raise RuntimeError(e.detail)
+    return run
+
+
+@router.post("/simulate", status_code=202)
+async def submit_simulation(request: SimulationRequest):
+    """
+    Queue an investment simulation (same body as POST /simulate/) and return its job id
+    immediately. Identical requests on the same data share one job.
+    """
+    validate_simulation_request(request)
+    key = make_cache_key("simulate", request.model_dump(), get_data_version())
+    return _submit("simulate", key, _job_error(lambda progress: run_simulation_request(request, progress, cache_key=key)))
+
+
+@router.post("/portfolio_suggestions", status_code=202)
+async def submit_suggestions(request: PortfolioRequest):
+    """
+    Queue a portfolio optimization (same body as POST /suggestions/portfolio_suggestions)
+    and return its job id immediately. Identical requests on the same data share one job.
+    """
+    user_allocation = validate_portfolio_request(request)
+    key = make_cache_key("suggestions", request.model_dump(), get_data_version())
+    return _submit("portfolio_suggestions", key,
+                   _job_error(lambda progress: run_suggestions_request(request, user_allocation, progress)))
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Status and progress (0 to 1) of a job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return job.to_dict()
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Result of a finished job: the same body the synchronous endpoint returns. Responds 409
+    while the job is still queued or running, and 500 with the error if it failed.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}.")
+    return job.result
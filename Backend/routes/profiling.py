@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import PlainTextResponse
+from utils.profiling import profile_store, collapsed_stacks, authorized
+
+router = APIRouter()
+
+
+def _require_token(token):
+    if not authorized(token):
+        raise HTTPException(status_code=403, detail="A valid X-Profile token is required.")
+
+
+async def admin_guard(x_profile: str | None = Header(default=None)):
+    """Dependency guarding admin endpoints outside this router with the X-Profile token."""
+    _require_token(x_profile)
+
+
+def _profile(profile_id):
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return profile
+
+
+@router.get("/profiles")
+async def list_profiles(x_profile: str | None = Header(default=None)):
+    """Summaries of the stored request profiles, oldest first."""
+    _require_token(x_profile)
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_profile: str | None = Header(default=None)):
+    """A stored profile: stacks and sample counts (cpu) or peak and top allocations (memory)."""
+    _require_token(x_profile)
+    return _profile(profile_id)
+
+
+@router.get("/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+async def get_collapsed_profile(profile_id: str, x_profile: str | None = Header(default=None)):
+    """A CPU profile as collapsed stacks, ready for flamegraph.pl or speedscope."""
+    _require_token(x_profile)
+    profile = _profile(profile_id)
+    if profile["mode"] != "cpu":
+        raise HTTPException(status_code=409, detail="Only CPU profiles have stacks.")
+    return PlainTextResponse(collapsed_stacks(profile))
@@ -1,6 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from services.risk_assessment import run_risk_assessment  # Import your function
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
+from services.risk_assessment import run_risk_assessment, iter_risk_assessment, run_batch_risk_assessment  # Import your function
+from models.cancellation import SimulationCancelled
+from utils.cancellation import request_token, run_cancellable, stream_cancellable
+from utils.event_stream import sse_stream
+from utils.data_loader import get_data_version
+from utils.result_cache import result_cache, make_cache_key
 
 # Create a FastAPI router for risk assessment
 router = APIRouter()
@@ -15,23 +22,126 @@ class RiskAssessmentInput(BaseModel):
     bonds: float
     real_estate: float
     commodities: float
+    engine: Literal["monte_carlo", "analytic"] = "monte_carlo"  # "analytic" uses closed-form expectations
+    variance_reduction: Literal["none", "antithetic", "control_variate", "sobol", "halton"] = Field(
+        "none", description="Quasi-random runs round the paths down to whole replicates, Sobol ones to powers of two per replicate; see 'Monte Carlo Paths'")
+    precision: Optional[float] = Field(None, gt=0, lt=1, description="Target standard error relative to the final value")
+    deadline_ms: Optional[int] = Field(None, gt=0, description="Wall-clock budget for the Monte Carlo simulations")
+    dtype: Literal["float64", "float32"] = Field("float64", description="Floating-point precision of the simulated paths")
+    include_distribution: bool = Field(False, description="Add percentile bands, VaR/CVaR and probability of loss")
+    var_levels: List[float] = Field([0.95, 0.99], min_length=1, description="Confidence levels for VaR and CVaR")
+    include_drawdown: bool = Field(False, description="Add the expected and P95 maximum drawdown of the simulated paths")
+
+    @field_validator("var_levels")
+    @classmethod
+    def check_var_levels(cls, levels):
+        if any(not 0 < level < 1 for level in levels):
+            raise ValueError("VaR levels must be between 0 and 1.")
+        return levels
+
+
+def _monte_carlo_options(data):
+    """Keyword arguments for monte_carlo_simulation taken from the request."""
+    return {"variance_reduction": data.variance_reduction, "precision": data.precision,
+            "deadline_ms": data.deadline_ms, "dtype": data.dtype}
+
 
 @router.post("/risk-assessment")
-async def risk_assessment(data: RiskAssessmentInput):
+async def risk_assessment(data: RiskAssessmentInput, response: Response, http_request: Request):
     try:
-        # Call the risk assessment function
-        result = run_risk_assessment(
-            investment_amount=data.investment_amount,
-            duration=data.duration,
-            risk_appetite=data.risk_appetite,
-            # market_condition=data.market_condition, # Removed
-            stocks=data.stocks,
-            bonds=data.bonds,
-            real_estate=data.real_estate,
-            commodities=data.commodities
-        )
+        # Results are deterministic for a given request and data version, so serve repeats from cache
+        cache_key = make_cache_key("risk-assessment", data.model_dump(), get_data_version())
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            response.headers["X-Cache"] = "HIT"
+            return cached
+
+        # Call the risk assessment function, stopping it if the client goes away or it runs too long
+        cancel_token = request_token()
+        result = await run_cancellable(
+            http_request, lambda: run_risk_assessment(**_risk_assessment_arguments(data), cancel_token=cancel_token),
+            cancel_token)
+        _store_result(data, cache_key, result)
+        response.headers["X-Cache"] = "MISS"
         return result  # Return the results to the frontend or API caller
 
+    except SimulationCancelled as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _risk_assessment_arguments(data):
+    """Keyword arguments for run_risk_assessment and iter_risk_assessment taken from the request."""
+    return {
+        "investment_amount": data.investment_amount,
+        "duration": data.duration,
+        "risk_appetite": data.risk_appetite,
+        # "market_condition": data.market_condition, # Removed
+        "stocks": data.stocks,
+        "bonds": data.bonds,
+        "real_estate": data.real_estate,
+        "commodities": data.commodities,
+        "engine": data.engine,
+        "mc_options": _monte_carlo_options(data),
+        "include_distribution": data.include_distribution,
+        "var_levels": data.var_levels,
+        "include_drawdown": data.include_drawdown,
+    }
+
+
+def _store_result(data, cache_key, result):
+    # Deadline-bound runs depend on timing, so only cache deterministic results
+    if "error" not in result and data.deadline_ms is None:
+        result_cache.set(cache_key, result)
+
+
+@router.post("/risk-assessment/stream")
+async def risk_assessment_stream(data: RiskAssessmentInput, http_request: Request):
+    """
+    Risk assessment streamed as server-sent events (same request body as
+    POST /risk-assessment): "estimate" events with running Monte Carlo estimates while an
+    asset class is simulated, an "asset" event with the progress after each asset class,
+    then a "result" event whose data is the usual response, or an "error" event. Closing
+    the connection stops the assessment after the time block in progress.
+    """
+    cache_key = make_cache_key("risk-assessment", data.model_dump(), get_data_version())
+    cached = result_cache.get(cache_key)
+    cancel_token = request_token()
+    if cached is not None:
+        events, on_result = iter([{"event": "result", "data": cached}]), None
+    else:
+        on_result = lambda result: _store_result(data, cache_key, result)
+        events = iter_risk_assessment(**_risk_assessment_arguments(data), cancel_token=cancel_token)
+
+    return StreamingResponse(
+        stream_cancellable(http_request, sse_stream(events, on_result), cancel_token),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Cache": "HIT" if cached is not None else "MISS"},
+    )
+
+
+# A batch of assessments sharing one market trend lookup and per-asset simulations
+class RiskAssessmentBatchInput(BaseModel):
+    requests: List[RiskAssessmentInput] = Field(..., min_length=1, description="Assessments to run, results are returned in the same order")
+
+@router.post("/risk-assessment/batch")
+async def risk_assessment_batch(data: RiskAssessmentBatchInput, http_request: Request):
+    try:
+        requests = [
+            dict(item.model_dump(exclude={"variance_reduction", "precision", "deadline_ms", "dtype"}), mc_options=_monte_carlo_options(item))
+            for item in data.requests
+        ]
+        # The whole batch runs in the thread pool and stops if the client goes away or it runs too long
+        cancel_token = request_token()
+        results = await run_cancellable(
+            http_request, lambda: run_batch_risk_assessment(requests, cancel_token=cancel_token), cancel_token)
+        return {"results": results}
+
+    except SimulationCancelled as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,6 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from services.simulation_ import run_simulation
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+from services.simulation_ import run_simulation, iter_simulation
+from models.cancellation import SimulationCancelled
+from utils.cancellation import request_token, run_cancellable, stream_cancellable
+from utils.event_stream import sse_stream
+from utils.data_loader import get_data_version
+from utils.result_cache import result_cache, make_cache_key
 
 router = APIRouter()
 class SimulationRequest(BaseModel):
@@ -12,9 +19,15 @@ class SimulationRequest(BaseModel):
     bonds: float
     real_estate: float
     commodities: float
+    engine: Literal["monte_carlo", "analytic"] = "monte_carlo"
+    variance_reduction: Literal["none", "antithetic", "control_variate", "sobol", "halton"] = "none"
+    precision: Optional[float] = Field(None, gt=0, lt=1)
+    deadline_ms: Optional[int] = Field(None, gt=0)
+    dtype: Literal["float64", "float32"] = "float64"
+    include_drawdown: bool = False
 
 @router.post("/")  
-async def simulate(request: SimulationRequest):
+async def simulate(request: SimulationRequest, response: Response, http_request: Request):
     """
     Run investment simulation.
 
@@ -27,38 +40,135 @@ async def simulate(request: SimulationRequest):
         - bonds (float): Percentage allocation to bonds.
         - real_estate (float): Percentage allocation to real estate.
         - commodities (float): Percentage allocation to commodities.
+        - engine (str, optional): 'monte_carlo' (default) or 'analytic' for the closed-form expectation.
+        - variance_reduction (str, optional): 'none' (default), 'antithetic', 'control_variate',
+          'sobol' or 'halton'. The response reports the resulting Monte Carlo standard error.
+          Quasi-random runs use 8 equal replicates, and Sobol replicates are rounded down
+          to a power of two points, so "Monte Carlo Paths" can be below the default 10,000.
+        - precision (float, optional): Target standard error relative to the final value; paths
+          are added in batches until it is reached.
+        - deadline_ms (int, optional): Wall-clock budget for the Monte Carlo simulations.
+          The response reports the number of paths actually used.
+        - dtype (str, optional): 'float64' (default) or 'float32', which simulates paths in
+          single precision for higher throughput.
+        - include_drawdown (bool, optional): Also report the expected and 95th percentile
+          maximum drawdown of the simulated paths.
 
     Returns:
-        dict: Aggregated simulation results.
+        dict: Aggregated simulation results. The X-Cache response header reports
+        whether the result was served from the result cache (HIT) or computed (MISS).
+
+    The simulation stops early when the client disconnects, and fails with 504 once it
+    exceeds REQUEST_TIMEOUT_SECONDS.
     """
     try:
-       
-
-        if request.investment_amount <= 0 or request.duration <= 0:
-
-            raise HTTPException(status_code=400, detail="Investment amount and duration must be greater than zero.")
+        validate_simulation_request(request)
 
-        total_allocation = request.stocks + request.bonds + request.real_estate + request.commodities
-        if total_allocation != 100:
+        # Simulations are seeded, so identical requests on the same data give identical results
+        cache_key = make_cache_key("simulate", request.model_dump(), get_data_version())
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            response.headers["X-Cache"] = "HIT"
+            return cached
 
-            raise HTTPException(status_code=400, detail=f"Total asset allocation must sum to 100%, currently {total_allocation}%.")
+        response.headers["X-Cache"] = "MISS"
+        cancel_token = request_token()
+        return await run_cancellable(
+            http_request, lambda: run_simulation_request(request, cache_key=cache_key, cancel_token=cancel_token),
+            cancel_token)
 
-       
-        result = run_simulation(
-            investment_amount=request.investment_amount,
-            duration=request.duration,
-            risk_appetite=request.risk_appetite,
-            market_condition=request.market_condition,
-            stocks=request.stocks,
-            bonds=request.bonds,
-            real_estate=request.real_estate,
-            commodities=request.commodities
-        )
-
-        return {"status": "success", "data": result}
+    except SimulationCancelled as e:
+        raise HTTPException(status_code=504, detail=str(e))
 
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error: " + str(e))
+
+
+def validate_simulation_request(request: SimulationRequest):
+    """Raises an HTTPException (400) for requests the simulation cannot run."""
+    if request.investment_amount <= 0 or request.duration <= 0:
+        raise HTTPException(status_code=400, detail="Investment amount and duration must be greater than zero.")
+
+    total_allocation = request.stocks + request.bonds + request.real_estate + request.commodities
+    if total_allocation != 100:
+        raise HTTPException(status_code=400, detail=f"Total asset allocation must sum to 100%, currently {total_allocation}%.")
+
+
+def run_simulation_request(request: SimulationRequest, progress=None, cache_key=None, cancel_token=None):
+    """
+    Runs a validated simulation request and returns the response payload, storing it in
+    the result cache. Shared by the synchronous route and the background job API.
+    """
+    if cache_key is None:
+        cache_key = make_cache_key("simulate", request.model_dump(), get_data_version())
+
+    result = run_simulation(**_simulation_arguments(request), progress=progress, cancel_token=cancel_token)
+    return _store_result(request, cache_key, result)
+
+
+def _simulation_arguments(request: SimulationRequest):
+    """Keyword arguments for run_simulation and iter_simulation taken from the request."""
+    return {
+        "investment_amount": request.investment_amount,
+        "duration": request.duration,
+        "risk_appetite": request.risk_appetite,
+        "market_condition": request.market_condition,
+        "stocks": request.stocks,
+        "bonds": request.bonds,
+        "real_estate": request.real_estate,
+        "commodities": request.commodities,
+        "engine": request.engine,
+        "mc_options": {
+            "variance_reduction": request.variance_reduction,
+            "precision": request.precision,
+            "deadline_ms": request.deadline_ms,
+            "dtype": request.dtype,
+        },
+        "include_drawdown": request.include_drawdown,
+    }
+
+
+def _store_result(request: SimulationRequest, cache_key, result):
+    payload = {"status": "success", "data": result}
+    # Deadline-bound runs depend on timing, so only cache deterministic results
+    if request.deadline_ms is None:
+        result_cache.set(cache_key, payload)
+    return payload
+
+
+@router.post("/stream")
+async def simulate_stream(request: SimulationRequest, http_request: Request):
+    """
+    Run investment simulation, streaming its progress as server-sent events (same request
+    body as POST /simulate/).
+
+    Events:
+        - estimate: running Monte Carlo estimate of an asset class (final_value,
+          standard_error, paths, yearly_values) each time a batch of paths completes;
+          sent for adaptive (precision / deadline_ms) and quasi-random runs.
+        - asset: an asset class is done; progress (0 to 1) and the yearly portfolio
+          values of the asset classes simulated so far.
+        - result: the final metrics in data, as in the POST /simulate/ response.
+        - error: the simulation failed; detail holds the reason.
+
+    Closing the connection stops the simulation after the time block in progress, and
+    runs longer than REQUEST_TIMEOUT_SECONDS end with an error event.
+    """
+    validate_simulation_request(request)
+    cache_key = make_cache_key("simulate", request.model_dump(), get_data_version())
+    cached = result_cache.get(cache_key)
+    cancel_token = request_token()
+    if cached is not None:
+        events, on_result = iter([{"event": "result", "data": cached["data"]}]), None
+    else:
+        on_result = lambda result: _store_result(request, cache_key, result)
+        events = iter_simulation(**_simulation_arguments(request), cancel_token=cancel_token)
+
+    return StreamingResponse(
+        stream_cancellable(http_request, sse_stream(events, on_result), cancel_token),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Cache": "HIT" if cached is not None else "MISS"},
+    )
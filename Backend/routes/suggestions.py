@@ -1,6 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 from services.suggestions_services import get_optimized_portfolio
+from models.cancellation import SimulationCancelled
+from utils.cancellation import request_token, run_cancellable
+from utils.log import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -15,7 +20,20 @@ class PortfolioRequest(BaseModel):
     commodities: float = Field(..., ge=0, le=100, description="Initial allocation to Commodities")
 
 @router.post("/portfolio_suggestions")
-async def get_suggestions(request: PortfolioRequest):
+async def get_suggestions(request: PortfolioRequest, http_request: Request):
+    user_allocation = validate_portfolio_request(request)
+    # The optimizer stops between restarts if the client goes away or the request runs too long
+    cancel_token = request_token()
+    try:
+        return await run_cancellable(
+            http_request, lambda: run_suggestions_request(request, user_allocation, cancel_token=cancel_token),
+            cancel_token)
+    except SimulationCancelled as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+def validate_portfolio_request(request: PortfolioRequest):
+    """Returns the allocation as fractions, raising an HTTPException (400) unless it sums to 100%."""
     user_allocation = [
         request.stocks / 100,  # Convert to fractions
         request.bonds / 100,
@@ -25,19 +43,26 @@ async def get_suggestions(request: PortfolioRequest):
 
     # Ensure allocations sum to 100%
     total_allocation = sum(user_allocation)
-    print("📩 Raw Request Data:", request.dict())  # Debugging
-    print("✅ Converted Allocation:", user_allocation)  # Debugging
+    logger.debug("📩 Portfolio request", extra={"request": request.model_dump(), "allocation": user_allocation})
     if not (0.99 <= total_allocation <= 1.01):
         raise HTTPException(status_code=400, detail="Allocations must sum to 100%.")
+    return user_allocation
+
 
+def run_suggestions_request(request: PortfolioRequest, user_allocation, progress=None, cancel_token=None):
+    """
+    Optimizes a validated portfolio request. Shared by the synchronous route and the
+    background job API.
+    """
     # Get optimized allocation
     optimized_results = get_optimized_portfolio(
-        request.investment, request.duration, user_allocation, request.risk_tolerance
+        request.investment, request.duration, user_allocation, request.risk_tolerance, progress=progress,
+        cancel_token=cancel_token
     )
-    print(optimized_results)
+    logger.debug("Optimized portfolio", extra={"result": optimized_results})
 
     # Check for errors from optimizer
     if "error" in optimized_results:
         raise HTTPException(status_code=500, detail=optimized_results["error"])
 
-    return optimized_results  # Return full results
\ No newline at end of file
+    return optimized_results  # Return full results
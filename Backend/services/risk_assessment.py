@@ -1,10 +1,18 @@
 import numpy as np 
 import pandas as pd
 import math # Added for isnan, isinf
-from models.monte_carlo import monte_carlo_simulation
+import time
+from models.monte_carlo import monte_carlo_simulation, iter_monte_carlo_simulation, simulated_drawdown, stream_expected_path, split_deadline, combine_asset_errors
 from models.gbm_model import geometric_brownian_motion
+from models.analytic import analytic_simulation
+from models.cancellation import raise_if_cancelled
+from models.quantile_sketch import distribution_from_quantiles, DEFAULT_PERCENTILES, DEFAULT_VAR_LEVELS
 from utils.data_loader import load_data
 from utils.market_trend import get_market_trend
+from utils.log import get_logger
+from utils.metrics import STAGE_SECONDS, timed_stage, timed_outcome
+
+logger = get_logger(__name__)
 
 # Define sanity cap thresholds at module level
 MAX_REASONABLE_PROFIT = 1e12  # 1 Trillion
@@ -29,100 +37,121 @@ def sanitize_value(value):
     #     return {k: sanitize_value(v) for k, v in value.items()}
     return value
 
-def run_risk_assessment(investment_amount, duration, risk_appetite, stocks, bonds, real_estate, commodities):
-    asset_classes = {
-        "stocks": stocks,
-        "bonds": bonds,
-        "real_estate": real_estate,
-        "commodities": commodities
+def _asset_statistics(asset, market_trend_actual, risk_appetite):
+    """
+    Loads historical data for an asset class and derives the drift, volatility and
+    drawdown inputs used by the simulations, adjusted for market trend and risk appetite.
+
+    Returns:
+        tuple: (annual_mean_return, annual_volatility, volatility, max_drawdown)
+    """
+    data = load_data(asset)
+    started = time.perf_counter()
+    returns = data['Close'].pct_change().dropna()
+    mean_return = returns.mean()
+    volatility = returns.std()
+    cumulative_max = data['Close'].cummax()  # Track all-time highest prices
+    drawdown = (data['Close'] / cumulative_max) - 1  # Drop from peak at each point
+    max_drawdown = drawdown.min()  # Worst drop from any peak
+
+    logger.debug("Asset statistics", extra={"asset": asset, "return_points": len(returns), "daily_mean_return": mean_return,
+                                            "daily_volatility": volatility, "max_drawdown": max_drawdown})
+
+    # Fallback to conservative defaults if insufficient data points
+    if len(returns) < MIN_RETURNS_DATA_POINTS:
+        logger.warning("⚠️ Asset %s has only %d return points (less than %d). Using conservative default statistics.",
+                       asset, len(returns), MIN_RETURNS_DATA_POINTS)
+        mean_return = DEFAULT_CONSERVATIVE_DAILY_MEAN
+        volatility = DEFAULT_CONSERVATIVE_DAILY_VOL
+        max_drawdown = DEFAULT_CONSERVATIVE_MAX_DRAWDOWN
+
+    # Adjust return based on automatically determined market trend
+    adjustment_factor = 1.0 # Default for neutral or if trend is unclear
+    if market_trend_actual == "bull":
+        adjustment_factor = 1.1 # 10% boost for bull
+    elif market_trend_actual == "bear":
+        adjustment_factor = 0.9 # 10% reduction for bear
+
+    mean_return *= adjustment_factor
+
+    # Adjust risk based on risk appetite
+    volatility *= (1 + risk_appetite / 100.0)
+
+    # Annualize mean_return and volatility
+    TRADING_DAYS_PER_YEAR = 1
+    annual_mean_return = mean_return * TRADING_DAYS_PER_YEAR
+    annual_volatility = volatility * math.sqrt(TRADING_DAYS_PER_YEAR)
+
+    STAGE_SECONDS.observe(time.perf_counter() - started, stage="statistics")
+    return annual_mean_return, annual_volatility, volatility, max_drawdown
+
+
+def _distribution_fields(investment_amount, quantile_grids, var_levels):
+    """
+    Builds the optional distribution fields of the response from per-asset quantile grids.
+
+    Every asset class is simulated from the same seeded shocks, so asset values at a
+    checkpoint are comonotone and the portfolio quantiles are the sum of asset quantiles.
+    """
+    distribution = distribution_from_quantiles(np.sum(quantile_grids, axis=0), investment_amount,
+                                               DEFAULT_PERCENTILES, var_levels)
+    bands = {
+        f"P{p}": [round(v, 2) if v is not None else None for v in sanitize_value(values.tolist())]
+        for p, values in distribution["yearly_percentiles"].items()
     }
-    
+    value_at_risk = {f"{level:.0%}": sanitize_value(round(v, 2)) for level, v in distribution["var"].items()}
+    conditional_value_at_risk = {f"{level:.0%}": sanitize_value(round(v, 2)) for level, v in distribution["cvar"].items()}
+
+    return {
+        "Yearly Percentile Bands": bands,
+        "Value at Risk": value_at_risk,
+        "Conditional Value at Risk": conditional_value_at_risk,
+        "Probability of Loss (%)": round(distribution["probability_of_loss"] * 100, 2),
+    }
+
+
+def _summarize_risk(investment_amount, asset_results, market_trend_actual, var_levels=DEFAULT_VAR_LEVELS):
+    """
+    Aggregates per-asset simulation outputs into the risk assessment response.
+
+    asset_results is a list of dicts with keys: asset_investment, final_monte_carlo,
+    monte_carlo_yearly, final_gbm, gbm_yearly, volatility, max_drawdown and the
+    optional Monte Carlo diagnostics monte_carlo_standard_error, monte_carlo_paths,
+    quantile_grid (present when the distribution was requested) and simulated_drawdown
+    (present when the drawdown was requested).
+    """
+    num_assets = len(asset_results)
+
     total_monte_carlo_value = 0
     total_gbm_value = 0
     total_monte_carlo_return = 0
     total_gbm_return = 0
     total_volatility = 0
-    
+
     avg_max_drawdown=0
-    
+
     yearly_monte_carlo_values = []
     yearly_gbm_values = []
-    
-    num_assets = sum(1 for allocation in asset_classes.values() if allocation > 0)
-    if num_assets == 0:
-        return {"error": "At least one asset must have an allocation greater than 0."}
-
-    market_trend_actual = get_market_trend()
-    print(f"ℹ️ Determined Market Trend: {market_trend_actual}")
-
-    for asset, allocation in asset_classes.items():
-        if allocation == 0:
-            continue
-
-        data = load_data(asset)
-        returns = data['Close'].pct_change().dropna()
-        mean_return = data['Close'].pct_change().dropna().mean()
-        volatility = data['Close'].pct_change().dropna().std()
-        cumulative_max = data['Close'].cummax()  # Track all-time highest prices
-        drawdown = (data['Close'] / cumulative_max) - 1  # Drop from peak at each point
-        max_drawdown = drawdown.min()  # Worst drop from any peak
-
-        print(f"--- DIAGNOSTIC --- Asset: {asset}, Allocation: {allocation}%")
-        print(f"--- DIAGNOSTIC --- Num Returns Points: {len(returns)}")
-        print(f"--- DIAGNOSTIC --- Calculated Daily Mean Return: {mean_return}")
-        print(f"--- DIAGNOSTIC --- Calculated Daily Volatility: {volatility}")
-        print(f"--- DIAGNOSTIC --- Calculated Max Drawdown (raw): {max_drawdown}")
-
-        # Fallback to conservative defaults if insufficient data points
-        if len(returns) < MIN_RETURNS_DATA_POINTS:
-            print(f"--- WARNING --- Asset: {asset} has only {len(returns)} return points (less than {MIN_RETURNS_DATA_POINTS}). Using conservative default statistics.")
-            mean_return = DEFAULT_CONSERVATIVE_DAILY_MEAN
-            volatility = DEFAULT_CONSERVATIVE_DAILY_VOL
-            max_drawdown = DEFAULT_CONSERVATIVE_MAX_DRAWDOWN
-            print(f"--- DIAGNOSTIC --- Using Defaults - Mean: {mean_return}, Vol: {volatility}, Max Drawdown: {max_drawdown}")
-
-
-        # Adjust return based on automatically determined market trend
-        adjustment_factor = 1.0 # Default for neutral or if trend is unclear
-        if market_trend_actual == "bull":
-            adjustment_factor = 1.1 # 10% boost for bull
-        elif market_trend_actual == "bear":
-            adjustment_factor = 0.9 # 10% reduction for bear
-        
-        mean_return *= adjustment_factor
-        
-        # Adjust risk based on risk appetite
-        volatility *= (1 + risk_appetite / 100.0)
-
-        # Annualize mean_return and volatility
-        TRADING_DAYS_PER_YEAR = 1
-        annual_mean_return = mean_return * TRADING_DAYS_PER_YEAR
-        annual_volatility = volatility * math.sqrt(TRADING_DAYS_PER_YEAR)
-
-        # Compute initial investment for this asset
-        asset_investment = investment_amount * (allocation / 100)
 
-        # Run simulations with annualized inputs
-        final_monte_carlo_value, monte_carlo_yearly_values = monte_carlo_simulation(asset_investment, annual_mean_return, annual_volatility, duration)
-        final_gbm_value, gbm_yearly_values = geometric_brownian_motion(asset_investment, annual_mean_return, annual_volatility, duration)
+    for asset_result in asset_results:
+        asset_investment = asset_result["asset_investment"]
+        final_monte_carlo_value = asset_result["final_monte_carlo"]
+        final_gbm_value = asset_result["final_gbm"]
 
         # Store yearly values
-        yearly_monte_carlo_values.append(monte_carlo_yearly_values)
-        yearly_gbm_values.append(gbm_yearly_values)
+        yearly_monte_carlo_values.append(asset_result["monte_carlo_yearly"])
+        yearly_gbm_values.append(asset_result["gbm_yearly"])
 
         # Aggregate final values
         total_monte_carlo_value += final_monte_carlo_value
         total_gbm_value += final_gbm_value
         total_monte_carlo_return += (final_monte_carlo_value / asset_investment) - 1
         total_gbm_return += (final_gbm_value / asset_investment) - 1
-        total_volatility += volatility
-        # total_max_drawdown += max_drawdown avg_max_drawdown += (returns.cummin() - returns).min() 
-        # cumulative_max = data['Close'].cummax()
-        # drawdown = (data['Close'] / cumulative_max) - 1  # Convert to percentage loss
-        # max_drawdown = drawdown.min()  # Largest drop from peak
-
-        avg_max_drawdown += max_drawdown  # Sum up, we'll average later
-
+        total_volatility += asset_result["volatility"]
+        avg_max_drawdown += asset_result["max_drawdown"]  # Sum up, we'll average later
+    monte_carlo_standard_error, monte_carlo_paths = combine_asset_errors(
+        (asset_result.get("monte_carlo_standard_error", 0), asset_result.get("monte_carlo_paths", 0))
+        for asset_result in asset_results)
 
     # Compute final values and returns
     avg_monte_carlo_return = total_monte_carlo_return / num_assets
@@ -132,18 +161,18 @@ def run_risk_assessment(investment_amount, duration, risk_appetite, stocks, bond
     
     # Apply sanity caps to final_total_value
     if final_total_value > MAX_REASONABLE_PROFIT:
-        print(f"⚠️ Capping final_total_value from {final_total_value} to {MAX_REASONABLE_PROFIT}")
+        logger.warning("⚠️ Capping final_total_value from %s to %s", final_total_value, MAX_REASONABLE_PROFIT)
         final_total_value = MAX_REASONABLE_PROFIT
     elif final_total_value < -MAX_REASONABLE_PROFIT: # Also cap extreme losses
-        print(f"⚠️ Capping final_total_value from {final_total_value} to {-MAX_REASONABLE_PROFIT}")
+        logger.warning("⚠️ Capping final_total_value from %s to %s", final_total_value, -MAX_REASONABLE_PROFIT)
         final_total_value = -MAX_REASONABLE_PROFIT
 
     # Apply sanity caps to final_avg_return (which is a factor here, not percentage)
     if final_avg_return > MAX_REASONABLE_ROI_FACTOR:
-        print(f"⚠️ Capping final_avg_return from {final_avg_return} to {MAX_REASONABLE_ROI_FACTOR}")
+        logger.warning("⚠️ Capping final_avg_return from %s to %s", final_avg_return, MAX_REASONABLE_ROI_FACTOR)
         final_avg_return = MAX_REASONABLE_ROI_FACTOR
     elif final_avg_return < -1.0: # ROI factor should not be less than -1 (-100% loss)
-        print(f"⚠️ Capping final_avg_return from {final_avg_return} to -1.0")
+        logger.warning("⚠️ Capping final_avg_return from %s to -1.0", final_avg_return)
         final_avg_return = -1.0
 
     avg_volatility = total_volatility / num_assets
@@ -175,6 +204,7 @@ def run_risk_assessment(investment_amount, duration, risk_appetite, stocks, bond
     avg_volatility_sanitized = sanitize_value(avg_volatility)
     sharpe_ratio_sanitized = sanitize_value(sharpe_ratio)
     risk_score_sanitized = sanitize_value(risk_score)
+    monte_carlo_standard_error_sanitized = sanitize_value(float(monte_carlo_standard_error))
 
     # Sanitize list values
     yearly_mc_values_processed = np.mean(yearly_monte_carlo_values, axis=0).tolist() if yearly_monte_carlo_values else []
@@ -183,12 +213,10 @@ def run_risk_assessment(investment_amount, duration, risk_appetite, stocks, bond
     yearly_mc_values_sanitized = sanitize_value(yearly_mc_values_processed)
     yearly_gbm_values_sanitized = sanitize_value(yearly_gbm_values_processed)
 
-    print("Total Profit",round(final_total_value_sanitized, 2) if final_total_value_sanitized is not None else None)
-    print("ROI (%)",round(final_avg_return_sanitized * 100, 2) if final_avg_return_sanitized is not None else None)
-    print("Max Drawdown (%)", round(avg_max_drawdown_sanitized * 100, 2) if avg_max_drawdown_sanitized is not None else None)
-    print("Volatility Score", round(avg_volatility_sanitized * 100, 2) if avg_volatility_sanitized is not None else None)
+    logger.debug("Risk assessment summary", extra={"total_profit": final_total_value_sanitized, "roi": final_avg_return_sanitized,
+                                                   "max_drawdown": avg_max_drawdown_sanitized, "volatility": avg_volatility_sanitized})
 
-    return {
+    result = {
         "Total Profit": round(final_total_value_sanitized, 2) if final_total_value_sanitized is not None else None,
         "ROI (%)": round(final_avg_return_sanitized * 100, 2) if final_avg_return_sanitized is not None else None,
         "Max Drawdown (%)": round(avg_max_drawdown_sanitized * 100, 2) if avg_max_drawdown_sanitized is not None else None,
@@ -196,5 +224,241 @@ def run_risk_assessment(investment_amount, duration, risk_appetite, stocks, bond
         "Reward to Risk Ratio (Sharpe Ratio)": round(sharpe_ratio_sanitized, 2) if sharpe_ratio_sanitized is not None else None,
         "Risk Score": round(risk_score_sanitized, 1) if risk_score_sanitized is not None else None,
         "Yearly Monte Carlo Values": yearly_mc_values_sanitized,
-        "Yearly GBM Values": yearly_gbm_values_sanitized
+        "Yearly GBM Values": yearly_gbm_values_sanitized,
+        "Monte Carlo Standard Error": round(monte_carlo_standard_error_sanitized, 2) if monte_carlo_standard_error_sanitized is not None else None,
+        "Monte Carlo Paths": monte_carlo_paths
+    }
+
+    drawdowns = [(asset_result["asset_investment"], asset_result["simulated_drawdown"])
+                 for asset_result in asset_results if "simulated_drawdown" in asset_result]
+    if drawdowns:
+        # Drawdowns are fractions of the peak, averaged across assets by the amount invested
+        total_invested = sum(weight for weight, _ in drawdowns)
+        expected = sum(weight * drawdown["expected"] for weight, drawdown in drawdowns) / total_invested
+        tail = sum(weight * drawdown["percentiles"][95] for weight, drawdown in drawdowns) / total_invested
+        result["Simulated Max Drawdown (%)"] = round(expected * 100, 2)
+        result["Simulated Max Drawdown P95 (%)"] = round(tail * 100, 2)
+
+    quantile_grids = [asset_result["quantile_grid"] for asset_result in asset_results if "quantile_grid" in asset_result]
+    if quantile_grids:
+        result.update(_distribution_fields(investment_amount, quantile_grids, var_levels))
+
+    return result
+
+
+
+def run_risk_assessment(investment_amount, duration, risk_appetite, stocks, bonds, real_estate, commodities, engine="monte_carlo", mc_options=None,
+                        include_distribution=False, var_levels=DEFAULT_VAR_LEVELS, include_drawdown=False, cancel_token=None):
+    """
+    Runs the risk assessment for one allocation. See iter_risk_assessment for the arguments.
+    """
+    events = iter_risk_assessment(investment_amount, duration, risk_appetite, stocks, bonds, real_estate, commodities,
+                                  engine, mc_options, include_distribution, var_levels, include_drawdown,
+                                  stream_estimates=False, cancel_token=cancel_token)
+    for event in events:
+        if event["event"] == "result":
+            return event["data"]
+
+
+def iter_risk_assessment(investment_amount, duration, risk_appetite, stocks, bonds, real_estate, commodities, engine="monte_carlo", mc_options=None,
+                         include_distribution=False, var_levels=DEFAULT_VAR_LEVELS, include_drawdown=False, stream_estimates=True,
+                         cancel_token=None):
+    """
+    Runs the risk assessment for one allocation incrementally, yielding event dicts:
+    running Monte Carlo "estimate" events while an asset class is being simulated (when
+    stream_estimates is set and the run uses more than one batch), an "asset" event with
+    the progress once an asset class is done, and finally {"event": "result", "data"}
+    holding the response of run_risk_assessment.
+
+    With include_distribution=True the response also carries yearly percentile bands,
+    VaR/CVaR at var_levels and the probability of loss, computed in the same simulation pass.
+    With include_drawdown=True it also reports the expected and 95th percentile maximum
+    drawdown of the simulated paths over the investment horizon.
+
+    engine selects how the expected path is computed: "monte_carlo" averages sampled
+    paths, "analytic" uses the closed-form lognormal expectation. mc_options are extra
+    keyword arguments for monte_carlo_simulation (e.g. variance_reduction, precision, dtype); a
+    deadline_ms budget is shared evenly between the simulated asset classes.
+
+    cancel_token (models.cancellation.CancellationToken) is checked between asset
+    classes and inside the Monte Carlo engine; once cancelled, SimulationCancelled is raised.
+    """
+    asset_classes = {
+        "stocks": stocks,
+        "bonds": bonds,
+        "real_estate": real_estate,
+        "commodities": commodities
     }
+
+    num_assets = sum(1 for allocation in asset_classes.values() if allocation > 0)
+    if num_assets == 0:
+        yield {"event": "result", "data": {"error": "At least one asset must have an allocation greater than 0."}}
+        return
+
+    market_trend_actual = get_market_trend()
+    logger.debug("ℹ️ Determined Market Trend: %s", market_trend_actual)
+    if engine == "analytic":
+        simulate_expected_path, engine_options = analytic_simulation, {}
+    else:
+        simulate_expected_path = iter_monte_carlo_simulation if stream_estimates else monte_carlo_simulation
+        engine_options = split_deadline(mc_options or {}, num_assets)
+    if include_distribution:
+        engine_options = dict(engine_options, distribution=True, var_levels=tuple(var_levels))
+    if include_drawdown and engine != "analytic":
+        engine_options = dict(engine_options, drawdown=True)
+    cancel_options = {"cancel_token": cancel_token} if cancel_token is not None else {}
+    if engine != "analytic":
+        engine_options = dict(engine_options, **cancel_options)
+    # The GBM path follows the requested simulation precision as well
+    gbm_options = {"dtype": mc_options["dtype"]} if "dtype" in (mc_options or {}) else {}
+
+    asset_results = []
+    for asset, allocation in asset_classes.items():
+        if allocation == 0:
+            continue
+        raise_if_cancelled(cancel_token)
+
+        annual_mean_return, annual_volatility, volatility, max_drawdown = _asset_statistics(asset, market_trend_actual, risk_appetite)
+
+        # Compute initial investment for this asset
+        asset_investment = investment_amount * (allocation / 100)
+
+        # Run simulations with annualized inputs
+        started = time.perf_counter()
+        monte_carlo_result = yield from stream_expected_path(timed_outcome(
+            engine, simulate_expected_path(asset_investment, annual_mean_return, annual_volatility, duration, **engine_options),
+            started), asset=asset)
+        final_monte_carlo_value, monte_carlo_yearly_values = monte_carlo_result
+        monte_carlo_details = getattr(monte_carlo_result, "details", {})
+        with timed_stage("gbm"):
+            final_gbm_value, gbm_yearly_values = geometric_brownian_motion(asset_investment, annual_mean_return, annual_volatility, duration, **gbm_options)
+
+        asset_results.append({
+            "asset_investment": asset_investment,
+            "final_monte_carlo": final_monte_carlo_value,
+            "monte_carlo_yearly": monte_carlo_yearly_values,
+            "final_gbm": final_gbm_value,
+            "gbm_yearly": gbm_yearly_values,
+            "volatility": volatility,
+            "max_drawdown": max_drawdown,
+            "monte_carlo_standard_error": monte_carlo_details.get("standard_error", 0),
+            "monte_carlo_paths": monte_carlo_details.get("paths", 0),
+        })
+        if "distribution" in monte_carlo_details:
+            asset_results[-1]["quantile_grid"] = monte_carlo_details["distribution"]["quantile_grid"]
+        if include_drawdown:
+            asset_results[-1]["simulated_drawdown"] = monte_carlo_details.get("drawdown") or simulated_drawdown(
+                asset_investment, annual_mean_return, annual_volatility, duration, **split_deadline(mc_options or {}, num_assets),
+                **cancel_options)
+        yield {"event": "asset", "asset": asset, "progress": len(asset_results) / num_assets}
+
+    yield {"event": "result", "data": _summarize_risk(investment_amount, asset_results, market_trend_actual, var_levels)}
+
+
+def run_batch_risk_assessment(requests, cancel_token=None):
+    """
+    Runs risk assessment for a batch of allocations, sharing work across the batch.
+
+    The market trend and per-asset statistics are computed once, and each simulation is
+    run once per (asset, risk appetite, duration, engine options) with a unit initial value. Simulated
+    values scale linearly with the initial investment, so every request reuses those
+    normalized paths by rescaling them with its own asset investment.
+
+    Args:
+        requests (list[dict]): Items with the same keys as run_risk_assessment's arguments.
+        cancel_token (models.cancellation.CancellationToken): Checked between requests,
+            between asset classes and inside the Monte Carlo engine; once cancelled,
+            SimulationCancelled is raised.
+
+    Returns:
+        list[dict]: One result per request, in input order.
+    """
+    market_trend_actual = None
+    asset_statistics = {}
+    normalized_simulations = {}
+    results = []
+    cancel_options = {"cancel_token": cancel_token} if cancel_token is not None else {}
+
+    for request in requests:
+        raise_if_cancelled(cancel_token)
+        asset_classes = {
+            "stocks": request["stocks"],
+            "bonds": request["bonds"],
+            "real_estate": request["real_estate"],
+            "commodities": request["commodities"]
+        }
+
+        if not any(allocation > 0 for allocation in asset_classes.values()):
+            results.append({"error": "At least one asset must have an allocation greater than 0."})
+            continue
+
+        if market_trend_actual is None:
+            market_trend_actual = get_market_trend()
+            logger.debug("ℹ️ Determined Market Trend: %s", market_trend_actual)
+
+        duration = request["duration"]
+        risk_appetite = request["risk_appetite"]
+        investment_amount = request["investment_amount"]
+        engine = request.get("engine", "monte_carlo")
+        mc_options = request.get("mc_options") or {}
+        num_assets = sum(1 for allocation in asset_classes.values() if allocation > 0)
+        if engine == "analytic":
+            simulate_expected_path, engine_options, engine_cancel_options = analytic_simulation, {}, {}
+        else:
+            simulate_expected_path, engine_options = monte_carlo_simulation, split_deadline(mc_options, num_assets)
+            engine_cancel_options = cancel_options
+        var_levels = tuple(request.get("var_levels") or DEFAULT_VAR_LEVELS)
+        if request.get("include_distribution"):
+            engine_options = dict(engine_options, distribution=True, var_levels=var_levels)
+        include_drawdown = request.get("include_drawdown", False)
+        if include_drawdown and engine != "analytic":
+            engine_options = dict(engine_options, drawdown=True)
+        gbm_options = {"dtype": mc_options["dtype"]} if "dtype" in mc_options else {}
+
+        asset_results = []
+        for asset, allocation in asset_classes.items():
+            if allocation == 0:
+                continue
+            raise_if_cancelled(cancel_token)
+
+            stats_key = (asset, risk_appetite)
+            if stats_key not in asset_statistics:
+                asset_statistics[stats_key] = _asset_statistics(asset, market_trend_actual, risk_appetite)
+            annual_mean_return, annual_volatility, volatility, max_drawdown = asset_statistics[stats_key]
+
+            simulation_key = (asset, risk_appetite, duration, engine, tuple(sorted(engine_options.items())),
+                              tuple(gbm_options.items()))
+            if simulation_key not in normalized_simulations:
+                normalized_simulations[simulation_key] = (
+                    simulate_expected_path(1.0, annual_mean_return, annual_volatility, duration, **engine_options,
+                                           **engine_cancel_options),
+                    geometric_brownian_motion(1.0, annual_mean_return, annual_volatility, duration, **gbm_options),
+                )
+            unit_monte_carlo_result, (unit_gbm, unit_gbm_yearly) = normalized_simulations[simulation_key]
+            unit_monte_carlo, unit_monte_carlo_yearly = unit_monte_carlo_result
+            unit_details = getattr(unit_monte_carlo_result, "details", {})
+            if include_drawdown and "drawdown" not in unit_details:
+                unit_details["drawdown"] = simulated_drawdown(1.0, annual_mean_return, annual_volatility, duration,
+                                                              **split_deadline(mc_options, num_assets), **cancel_options)
+
+            # Rescale the unit-investment paths to this request's asset investment
+            asset_investment = investment_amount * (allocation / 100)
+            asset_results.append({
+                "asset_investment": asset_investment,
+                "final_monte_carlo": unit_monte_carlo * asset_investment,
+                "monte_carlo_yearly": np.asarray(unit_monte_carlo_yearly) * asset_investment,
+                "final_gbm": unit_gbm * asset_investment,
+                "gbm_yearly": np.asarray(unit_gbm_yearly) * asset_investment,
+                "volatility": volatility,
+                "max_drawdown": max_drawdown,
+                "monte_carlo_standard_error": unit_details.get("standard_error", 0) * asset_investment,
+                "monte_carlo_paths": unit_details.get("paths", 0),
+            })
+            if "distribution" in unit_details:
+                asset_results[-1]["quantile_grid"] = unit_details["distribution"]["quantile_grid"] * asset_investment
+            if include_drawdown:
+                asset_results[-1]["simulated_drawdown"] = unit_details["drawdown"]  # Scale-free, no rescaling needed
+
+        results.append(_summarize_risk(investment_amount, asset_results, market_trend_actual, var_levels))
+
+    return results
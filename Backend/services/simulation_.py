@@ -1,15 +1,56 @@
 import numpy as np 
 import pandas as pd
-from models.monte_carlo import monte_carlo_simulation
+import time
+from models.monte_carlo import monte_carlo_simulation, iter_monte_carlo_simulation, simulated_drawdown, stream_expected_path, split_deadline, combine_asset_errors
 from models.gbm_model import geometric_brownian_motion
+from models.analytic import analytic_simulation
+from models.cancellation import raise_if_cancelled
 from utils.data_loader import load_data
+from utils.log import get_logger
+from utils.metrics import timed_stage, timed_outcome
 
+logger = get_logger(__name__)
 
 
-
-def run_simulation(investment_amount, duration, risk_appetite, market_condition, stocks, bonds, real_estate, commodities):
+def run_simulation(investment_amount, duration, risk_appetite, market_condition, stocks, bonds, real_estate, commodities, engine="monte_carlo", mc_options=None, include_drawdown=False, progress=None, cancel_token=None):
     """
     Runs investment simulation and returns key portfolio metrics including yearly values.
+    See iter_simulation for the arguments.
+
+    progress, when given, is called with the fraction of asset classes simulated so far.
+    """
+    events = iter_simulation(investment_amount, duration, risk_appetite, market_condition, stocks, bonds,
+                             real_estate, commodities, engine, mc_options, include_drawdown, stream_estimates=False,
+                             cancel_token=cancel_token)
+    for event in events:
+        if event["event"] == "asset" and progress:
+            progress(event["progress"])
+        elif event["event"] == "result":
+            return event["data"]
+
+
+def iter_simulation(investment_amount, duration, risk_appetite, market_condition, stocks, bonds, real_estate, commodities, engine="monte_carlo", mc_options=None, include_drawdown=False, stream_estimates=True, cancel_token=None):
+    """
+    Runs investment simulation incrementally, yielding event dicts as it progresses:
+
+      - {"event": "estimate", "asset", "paths", "final_value", "standard_error",
+        "yearly_values"}: running Monte Carlo estimate for an asset class, each time a
+        batch of paths completes (adaptive and quasi-random runs, stream_estimates=True).
+      - {"event": "asset", "asset", "progress", "yearly_values"}: an asset class is done;
+        yearly_values is the portfolio path of the asset classes simulated so far.
+      - {"event": "result", "data"}: the final metrics, as returned by run_simulation.
+
+    engine selects how the expected path is computed: "monte_carlo" averages sampled
+    paths, "analytic" uses the closed-form lognormal expectation. mc_options are extra
+    keyword arguments for monte_carlo_simulation (e.g. variance_reduction, precision, dtype); a
+    deadline_ms budget is shared evenly between the simulated asset classes.
+
+    With include_drawdown=True the response also reports the maximum drawdown of the
+    simulated paths over the investment horizon (expected and 95th percentile), averaged
+    across asset classes by allocation.
+
+    cancel_token (models.cancellation.CancellationToken) is checked between asset
+    classes and inside the Monte Carlo engine; once cancelled, SimulationCancelled is raised.
     """
     asset_classes = {
         "stocks": stocks,
@@ -29,15 +70,33 @@ def run_simulation(investment_amount, duration, risk_appetite, market_condition,
     avg_max_drawdown = 0
 
     num_assets = sum(1 for allocation in asset_classes.values() if allocation > 0)
+    if engine == "analytic":
+        simulate_expected_path, engine_options = analytic_simulation, {}
+    else:
+        simulate_expected_path = iter_monte_carlo_simulation if stream_estimates else monte_carlo_simulation
+        engine_options = split_deadline(mc_options or {}, num_assets)
+    if include_drawdown and engine != "analytic":
+        engine_options = dict(engine_options, drawdown=True)
+    cancel_options = {"cancel_token": cancel_token} if cancel_token is not None else {}
+    if engine != "analytic":
+        engine_options = dict(engine_options, **cancel_options)
+    # The GBM path follows the requested simulation precision as well
+    gbm_options = {"dtype": mc_options["dtype"]} if "dtype" in (mc_options or {}) else {}
+    monte_carlo_estimates = []
+    simulated_assets = 0
+    simulated_drawdown_expected = 0
+    simulated_drawdown_tail = 0
 
     for asset, allocation in asset_classes.items():
         if allocation == 0:
             continue
+        raise_if_cancelled(cancel_token)
 
         data = load_data(asset)
-        returns = data['Close'].pct_change().dropna()
-        mean_return = returns.mean()
-        volatility = returns.std()
+        with timed_stage("statistics"):
+            returns = data['Close'].pct_change().dropna()
+            mean_return = returns.mean()
+            volatility = returns.std()
 
         # Market condition adjustments
         if market_condition == "bull":
@@ -50,8 +109,19 @@ def run_simulation(investment_amount, duration, risk_appetite, market_condition,
         # annualized_return = (1 + mean_return) ** 252 - 1
 
         # Run Monte Carlo and GBM simulations
-        final_monte_carlo, yearly_monte_carlo = monte_carlo_simulation(asset_investment, mean_return, volatility, duration)
-        final_gbm, yearly_gbm = geometric_brownian_motion(asset_investment, mean_return, volatility, duration)
+        started = time.perf_counter()
+        monte_carlo_result = yield from stream_expected_path(timed_outcome(
+            engine, simulate_expected_path(asset_investment, mean_return, volatility, duration, **engine_options), started),
+            asset=asset)
+        final_monte_carlo, yearly_monte_carlo = monte_carlo_result
+        details = getattr(monte_carlo_result, "details", {})
+        monte_carlo_estimates.append((details.get("standard_error", 0), details.get("paths", 0)))
+        if include_drawdown:
+            drawdown = details.get("drawdown") or simulated_drawdown(asset_investment, mean_return, volatility, duration, **split_deadline(mc_options or {}, num_assets), **cancel_options)
+            simulated_drawdown_expected += drawdown["expected"] * allocation / 100
+            simulated_drawdown_tail += drawdown["percentiles"][95] * allocation / 100
+        with timed_stage("gbm"):
+            final_gbm, yearly_gbm = geometric_brownian_motion(asset_investment, mean_return, volatility, duration, **gbm_options)
     
         # Aggregate final values
         total_final_monte_carlo += np.mean(final_monte_carlo)
@@ -77,20 +147,27 @@ def run_simulation(investment_amount, duration, risk_appetite, market_condition,
         # avg_gbm_return += mean_return
         avg_volatility += volatility
         avg_max_drawdown += (returns.cummin() - returns).min()  # Max drawdown formula
+        simulated_assets += 1
+        yield {
+            "event": "asset",
+            "asset": asset,
+            "progress": simulated_assets / num_assets,
+            "yearly_values": [round(float(value), 2) for value in (yearly_monte_carlo_values + yearly_gbm_values) / 2],
+        }
 
     # Compute final values
     # final_total_value = (total_final_monte_carlo + total_final_gbm) / 2
     # print( final_total_value)
     monte_carlo_return = (total_final_monte_carlo / investment_amount) - 1
     gbm_return = (total_final_gbm / investment_amount) - 1
-    print(monte_carlo_return)
-    print(gbm_return)
+    logger.debug("Simulated returns", extra={"monte_carlo_return": monte_carlo_return, "gbm_return": gbm_return})
     # final_avg_return = (monte_carlo_return+gbm_return)/2
 
 
     
     avg_volatility /= num_assets
     avg_max_drawdown /= num_assets
+    monte_carlo_standard_error, monte_carlo_paths = combine_asset_errors(monte_carlo_estimates)
     avg_max_drawdown = avg_max_drawdown
 
     # Compute Sharpe Ratio (Risk-Adjusted Return)
@@ -106,11 +183,18 @@ def run_simulation(investment_amount, duration, risk_appetite, market_condition,
     sharpe_ratio = (cagr ) / avg_volatility if avg_volatility > 0 else 0
     # print(yearly_avg_values[-1])
 
-    return {
+    result = {
         "Final Total Portfolio Value": round(final_total_value, 2),
         "Final Expected Return (%)": round(cagr * 100, 2),
         "Yearly Portfolio Values": [round(value, 2) for value in yearly_avg_values.tolist()],  
         "Volatility (%)": round(avg_volatility * 100, 2),
         "Sharpe Ratio": round(sharpe_ratio, 2),
-        "Max Drawdown (%)": round(avg_max_drawdown , 2)
+        "Max Drawdown (%)": round(avg_max_drawdown , 2),
+        "Monte Carlo Standard Error": round(monte_carlo_standard_error, 2),
+        "Monte Carlo Paths": monte_carlo_paths
     }
+    if include_drawdown:
+        result["Simulated Max Drawdown (%)"] = round(simulated_drawdown_expected * 100, 2)
+        result["Simulated Max Drawdown P95 (%)"] = round(simulated_drawdown_tail * 100, 2)
+
+    yield {"event": "result", "data": result}
@@ -5,6 +5,11 @@ import math     # isnan, isinf
 
 from utils.data_loader import load_data, get_top_50_stock_tickers
 from models.portfolio_optimizer import optimize_stock_allocation, optimize_portfolio
+from models.cancellation import SimulationCancelled, raise_if_cancelled
+from utils.log import get_logger
+from utils.metrics import STAGE_SECONDS, timed_stage
+
+logger = get_logger(__name__)
 
 # Helper to replace inf/nan with None for JSON
 def sanitize_value(value):
@@ -17,7 +22,7 @@ def sanitize_value(value):
         return {k: sanitize_value(v) for k, v in value.items()}
     return value
 
-def get_optimized_portfolio(investment, duration, user_allocation, risk_tolerance):
+def get_optimized_portfolio(investment, duration, user_allocation, risk_tolerance, progress=None, cancel_token=None):
     """
     Returns a dict containing:
       - optimized_allocation: high-level weights for Stocks, Bonds, Real_Estate, Commodities
@@ -26,6 +31,10 @@ def get_optimized_portfolio(investment, duration, user_allocation, risk_toleranc
       - stock_allocation_investment: rupee allocation per individual stock
       - portfolio_metrics: Expected Return %, Volatility %, Sharpe Ratio
       - insights: list of recommendation dicts {title, content}
+
+    progress, when given, is called with the fraction of the work done (0 to 1); the
+    stock-level optimizer restarts make up most of it. cancel_token is checked between
+    stock data loads and optimizer restarts; once cancelled, SimulationCancelled is raised.
     """
     try:
         # 1) Load market data
@@ -45,6 +54,8 @@ def get_optimized_portfolio(investment, duration, user_allocation, risk_toleranc
         # 2) High-level allocation
         optimized_weights = optimize_portfolio(data, user_allocation, risk_tolerance)
         weights = np.array(optimized_weights)              # ← convert list→array
+        if progress:
+            progress(0.05)
         allocation = {
             asset: round(w, 4)
             for asset, w in zip(data.columns, weights)
@@ -59,11 +70,14 @@ def get_optimized_portfolio(investment, duration, user_allocation, risk_toleranc
         stock_data_dict = {}
         start = time.time()
         for t in tickers:
+            raise_if_cancelled(cancel_token)
             try:
                 stock_data_dict[t] = load_data(t)
             except Exception as e:
-                print(f"⚠️ Skipped {t}: {e}")
-        print(f"Loaded {len(stock_data_dict)}/{len(tickers)} in {time.time()-start:.1f}s")
+                logger.warning("⚠️ Skipped %s: %s", t, e)
+        logger.info("Loaded stock histories", extra={"loaded": len(stock_data_dict), "requested": len(tickers), "seconds": round(time.time() - start, 3)})
+        if progress:
+            progress(0.2)
 
         if not stock_data_dict:
             return {"error": "No individual stock data available."}
@@ -85,9 +99,20 @@ def get_optimized_portfolio(investment, duration, user_allocation, risk_toleranc
         sharpe = ((expected_return - rf_rate * 100) / volatility) if volatility > 0 else 0.0
 
         # 5) Stock-level optimization
-        opt_start = time.time()
-        stock_alloc = optimize_stock_allocation(stock_data_dict, risk_tolerance, duration)
-        print(f"Stock optimize took {time.time()-opt_start:.1f}s")
+        restart_started = time.perf_counter()
+
+        def on_restart(fraction):
+            # Called after every optimizer restart: records its duration and reports progress
+            nonlocal restart_started
+            now = time.perf_counter()
+            STAGE_SECONDS.observe(now - restart_started, stage="optimizer_restart")
+            restart_started = now
+            if progress:
+                progress(0.2 + 0.8 * fraction)
+
+        with timed_stage("optimizer"):
+            stock_alloc = optimize_stock_allocation(stock_data_dict, risk_tolerance, duration, progress=on_restart,
+                                                    cancel_token=cancel_token)
 
         if "error" in stock_alloc:
             return {"error": "Error in stock-level optimization."}
@@ -132,6 +157,8 @@ def get_optimized_portfolio(investment, duration, user_allocation, risk_toleranc
 
         return result
 
+    except SimulationCancelled:
+        raise
     except Exception as e:
-        print(f"Error during portfolio optimization: {e}")
+        logger.exception("Error during portfolio optimization: %s", e)
         return {"error": "Portfolio optimization failed."}
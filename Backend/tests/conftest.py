@@ -0,0 +1,20 @@
+import pytest
+
+
+class FakeClock:
+    """Stand-in for time.time / time.monotonic that only moves when a test sets or advances now."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock(request):
+    """A FakeClock, also set as self.clock on unittest-style test classes (via usefixtures)."""
+    clock = FakeClock()
+    if request.instance is not None:
+        request.instance.clock = clock
+    return clock
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.analytic import analytic_simulation, lognormal_distribution, yearly_checkpoint_steps
+from models.monte_carlo import monte_carlo_simulation
+
+
+class TestAnalyticEngine(unittest.TestCase):
+
+    def test_matches_monte_carlo_means(self):
+        # Daily drift/volatility as used by run_simulation
+        args = (10000, 0.0005, 0.01, 3)
+        mc_final, mc_yearly = monte_carlo_simulation(*args)
+        an_final, an_yearly = analytic_simulation(*args)
+
+        self.assertEqual(len(an_yearly), len(mc_yearly))
+        np.testing.assert_allclose(an_yearly, mc_yearly, rtol=5e-3)
+        self.assertAlmostEqual(an_final / mc_final, 1.0, delta=5e-3)
+
+    def test_zero_volatility_is_deterministic_growth(self):
+        final, yearly = analytic_simulation(100, 0.252, 0.0, 2)
+        np.testing.assert_allclose(yearly, 100 * np.exp(0.001 * np.array([1, 253])))
+        self.assertAlmostEqual(final, 100 * np.exp(0.504))
+
+    def test_distribution_moments_and_percentiles(self):
+        dist = lognormal_distribution(1.0, 0.05, 0.2, 252, percentiles=(5, 50, 95))
+        log_mean, log_var = 0.05, 0.04
+        self.assertAlmostEqual(float(dist["mean"]), np.exp(log_mean + log_var / 2))
+        self.assertAlmostEqual(float(dist["variance"]), (np.exp(log_var) - 1) * np.exp(2 * log_mean + log_var))
+        self.assertAlmostEqual(float(dist["percentiles"][50]), np.exp(log_mean))
+        self.assertLess(dist["percentiles"][5], dist["percentiles"][50])
+        self.assertLess(dist["percentiles"][50], dist["percentiles"][95])
+
+    def test_does_not_draw_random_numbers(self):
+        np.random.seed(7)
+        expected_next = np.random.random()
+        np.random.seed(7)
+        analytic_simulation(10000, 0.0005, 0.01, 30)
+        self.assertEqual(np.random.random(), expected_next)
+
+    def test_yearly_checkpoint_steps(self):
+        np.testing.assert_array_equal(yearly_checkpoint_steps(3), [1, 253, 505])
+
+
+if __name__ == '__main__':
+    unittest.main()
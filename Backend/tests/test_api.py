@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 # Assuming your main app or a specific router module needs to be imported
 # For this example, let's assume the risk_assessment router is in routes.risk_assessment
 from routes.risk_assessment import router as risk_assessment_router
+from utils.result_cache import result_cache
 # If you have routers for other functionalities like suggestions, import them too.
 # from routes.suggestions import router as suggestions_router # Example
 
@@ -25,6 +26,7 @@ class TestRiskAssessmentAPI(unittest.TestCase):
 
     def setUp(self):
         self.client = TestClient(app)
+        result_cache.clear()
 
     @patch('services.risk_assessment.run_risk_assessment') # Target the service function
     def test_risk_assessment_api_success(self, mock_run_risk_assessment):
@@ -102,6 +104,59 @@ class TestRiskAssessmentAPI(unittest.TestCase):
         self.assertTrue(found_investment_amount_error, "Error detail for missing 'investment_amount' not found.")
 
 
+    @patch('routes.risk_assessment.run_risk_assessment')
+    def test_risk_assessment_api_cache_hit(self, mock_run_risk_assessment):
+        print("Testing API: /risk-assessment serves repeated requests from cache")
+        mock_run_risk_assessment.return_value = {"Total Profit": 12000.0, "Risk Score": 6.5}
+        payload = {
+            "investment_amount": 10000.0,
+            "duration": 3,
+            "risk_appetite": 0.6,
+            "stocks": 60.0,
+            "bonds": 30.0,
+            "real_estate": 5.0,
+            "commodities": 5.0
+        }
+
+        first = self.client.post("/risk/risk-assessment", json=payload)
+        second = self.client.post("/risk/risk-assessment", json=dict(reversed(list(payload.items()))))
+
+        self.assertEqual(first.headers["X-Cache"], "MISS")
+        self.assertEqual(second.headers["X-Cache"], "HIT")
+        self.assertEqual(second.json(), first.json())
+        mock_run_risk_assessment.assert_called_once()
+
+    @patch('routes.risk_assessment.run_batch_risk_assessment')
+    def test_risk_assessment_batch_api_success(self, mock_run_batch):
+        print("Testing API: /risk-assessment/batch success")
+        mock_run_batch.return_value = [{"Total Profit": 1.0}, {"error": "At least one asset must have an allocation greater than 0."}]
+        item = {
+            "investment_amount": 10000.0,
+            "duration": 3,
+            "risk_appetite": 0.6,
+            "stocks": 60.0,
+            "bonds": 30.0,
+            "real_estate": 5.0,
+            "commodities": 5.0
+        }
+        empty_item = dict(item, stocks=0.0, bonds=0.0, real_estate=0.0, commodities=0.0)
+
+        response = self.client.post("/risk/risk-assessment/batch", json={"requests": [item, empty_item]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"results": mock_run_batch.return_value})
+        mc_options = {"variance_reduction": "none", "precision": None, "deadline_ms": None, "dtype": "float64"}
+        defaults = {"engine": "monte_carlo", "mc_options": mc_options,
+                    "include_distribution": False, "var_levels": [0.95, 0.99], "include_drawdown": False}
+        expected_items = [dict(item, **defaults), dict(empty_item, **defaults)]
+        mock_run_batch.assert_called_once()
+        self.assertEqual(mock_run_batch.call_args.args, (expected_items,))
+        self.assertIsNotNone(mock_run_batch.call_args.kwargs["cancel_token"])
+
+    def test_risk_assessment_batch_api_empty(self):
+        response = self.client.post("/risk/risk-assessment/batch", json={"requests": []})
+        self.assertEqual(response.status_code, 422)
+
     # You can add similar tests for other API endpoints (e.g., suggestions)
     # by patching their respective service functions.
 
@@ -0,0 +1,133 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import tempfile
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_market import SyntheticMarket
+from benchmarks.suite import compare
+from benchmarks.load_test import BundledMarket, LoadStats, parse_mix, run_load_test
+from services.simulation_ import run_simulation
+from services import suggestions_services
+
+
+class TestSyntheticMarket(unittest.TestCase):
+
+    def test_returns_have_the_requested_correlation_and_volatility(self):
+        market = SyntheticMarket(tickers=30, days=2520, correlation=0.4, volatility_range=(0.2, 0.2))
+        returns = np.log(market.closes[market.tickers]).diff().dropna()
+        correlations = returns.corr().values[np.triu_indices(30, 1)]
+        self.assertAlmostEqual(correlations.mean(), 0.4, delta=0.03)
+        np.testing.assert_allclose(returns.std() * np.sqrt(252), 0.2, rtol=0.05)
+
+    def test_frames_are_deterministic_and_yfinance_shaped(self):
+        first, second = SyntheticMarket(tickers=3, days=100), SyntheticMarket(tickers=3, days=100)
+        frame = first.load_data("SYN0001")
+        self.assertTrue({"Open", "High", "Low", "Close", "Volume", "Ticker"} <= set(frame.columns))
+        self.assertEqual(len(frame), 100)
+        self.assertTrue(frame["Close"].equals(second.load_data("SYN0001")["Close"]))
+        with self.assertRaises(ValueError):
+            first.load_data("UNKNOWN")
+
+    def test_patched_services_run_offline(self):
+        market = SyntheticMarket(tickers=5, days=300)
+        with market.patched(universe=2):
+            result = run_simulation(10000, 2, 0.5, "neutral", 40, 30, 20, 10)
+            self.assertEqual(suggestions_services.get_top_50_stock_tickers(), ["SYN0000", "SYN0001"])
+        self.assertGreater(result["Final Total Portfolio Value"], 0)
+        self.assertEqual(len(suggestions_services.get_top_50_stock_tickers()), 50)
+
+
+class TestBaselineComparison(unittest.TestCase):
+
+    def test_regressions_beyond_threshold_are_reported(self):
+        baseline = {"fast": {"median_seconds": 1.0, "peak_bytes": 100},
+                    "lean": {"median_seconds": 1.0, "peak_bytes": 100}}
+        results = {"fast": {"median_seconds": 1.05, "peak_bytes": 100},
+                   "lean": {"median_seconds": 1.0, "peak_bytes": 150},
+                   "new": {"median_seconds": 1.0, "peak_bytes": 100}}
+        rows, regressions = compare(results, baseline, threshold=0.10)
+        self.assertEqual(regressions, ["lean"])
+        self.assertEqual(rows[2], ("new", None, None))
+        self.assertAlmostEqual(rows[0][1], 0.05)
+
+
+class TestLoadTest(unittest.TestCase):
+
+    def test_bundled_market_serves_the_index_from_spy(self):
+        market = BundledMarket()
+        index = market.load_data("^GSPC")
+        self.assertTrue((index["Ticker"] == "SPY").all())
+        self.assertIsInstance(index.index, pd.DatetimeIndex)
+        self.assertTrue(index.equals(market.load_data("stocks")))
+        self.assertNotIn("SPY", market.tickers)
+        with self.assertRaises(ValueError):
+            market.load_data("UNKNOWN")
+
+    def test_bundled_asset_classes_are_date_aligned_with_stocks(self):
+        market = BundledMarket()
+        stocks = market.load_data("stocks")
+        for asset in ("bonds", "real_estate", "commodities"):
+            frame = market.load_data(asset)
+            self.assertTrue(frame.index.is_unique)
+            self.assertTrue(frame.index.equals(stocks.index), asset)
+            self.assertFalse(frame["Close"].isna().any())
+
+    def test_suggestions_succeed_through_the_app_on_the_bundled_market(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # The database is never opened: no users are registered and suggestions need none
+            with patch.dict(os.environ, {"DATABASE_URL": f"sqlite+aiosqlite:///{directory}/load_test.db"}):
+                from main import app
+        with BundledMarket().patched():
+            summary = asyncio.run(run_load_test(app, {"suggestions": 1}, concurrency=1, requests=1, users=0))
+        self.assertEqual(summary["endpoints"]["suggestions"]["statuses"], {"200": 1})
+
+    def test_mix_weights(self):
+        self.assertEqual(parse_mix("login=3, simulate,risk=0"), {"login": 3.0, "simulate": 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix("checkout=1")
+        with self.assertRaises(ValueError):
+            parse_mix("login=0")
+
+    def test_lag_is_charged_to_endpoints_in_flight(self):
+        stats = LoadStats(["login", "simulate"])
+        stats.in_flight["simulate"] += 1
+        stats.record_lag(0.2)
+        stats.in_flight["simulate"] -= 1
+        stats.record_lag(0.001)
+        summary = stats.summary(elapsed=1.0)
+        self.assertAlmostEqual(summary["endpoints"]["simulate"]["loop_lag_max_ms"], 200.0)
+        self.assertIsNone(summary["endpoints"]["login"]["loop_lag_max_ms"])
+        self.assertAlmostEqual(summary["loop_lag_max_ms"], 200.0)
+
+    def test_run_counts_requests_and_errors_per_endpoint(self):
+        app = FastAPI()
+
+        @app.post("/ok")
+        async def ok():
+            return {}
+
+        @app.post("/fail")
+        async def fail():
+            raise HTTPException(status_code=500)
+
+        endpoints = {"ok": ("/ok", lambda rng, users: {}), "fail": ("/fail", lambda rng, users: {})}
+        summary = asyncio.run(run_load_test(app, {"ok": 1, "fail": 1}, concurrency=3, requests=20, users=0,
+                                            endpoints=endpoints))
+        results = summary["endpoints"]
+        self.assertEqual(summary["requests"], 20)
+        self.assertEqual(results["ok"]["requests"] + results["fail"]["requests"], 20)
+        self.assertEqual(results["ok"]["errors"], 0)
+        self.assertEqual(results["fail"]["errors"], results["fail"]["requests"])
+        self.assertLessEqual(results["ok"]["p50_ms"], results["ok"]["p99_ms"])
+
+
+if __name__ == '__main__':
+    unittest.main()
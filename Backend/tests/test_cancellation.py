@@ -0,0 +1,251 @@
+import unittest
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import numpy as np
+import pandas as pd
+import asyncio
+import json
+import time
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.cancellation import CancellationToken, SimulationCancelled
+from models.monte_carlo import monte_carlo_summary, iter_monte_carlo_summary
+from models.portfolio_optimizer import optimize_stock_allocation
+from routes.simulate import router as simulate_router
+from routes.risk_assessment import router as risk_router
+from services.risk_assessment import run_batch_risk_assessment
+from utils.cancellation import run_cancellable, stream_cancellable
+from utils.result_cache import result_cache
+
+app = FastAPI()
+app.include_router(simulate_router, prefix="/simulate")
+app.include_router(risk_router, prefix="/risk")
+
+
+class CountingToken(CancellationToken):
+    """Cancels itself after a number of checks."""
+
+    def __init__(self, checks):
+        super().__init__()
+        self.remaining = checks
+
+    def raise_if_cancelled(self):
+        self.remaining -= 1
+        if self.remaining < 0:
+            self.cancel("test")
+        super().raise_if_cancelled()
+
+
+class TestCancellationToken(unittest.TestCase):
+
+    @pytest.mark.usefixtures("fake_clock")
+    def test_cancel_and_deadline(self):
+        token = CancellationToken()
+        self.assertFalse(token.cancelled)
+        token.cancel("client disconnected")
+        self.assertTrue(token.cancelled)
+        with self.assertRaisesRegex(SimulationCancelled, "client disconnected"):
+            token.raise_if_cancelled()
+
+        clock = self.clock
+        token = CancellationToken(timeout_seconds=5, clock=clock)
+        clock.now += 4.9
+        self.assertFalse(token.cancelled)
+        clock.now += 0.1
+        self.assertTrue(token.cancelled)
+        self.assertEqual(token.reason, "deadline exceeded")
+
+
+class TestEngineCancellation(unittest.TestCase):
+
+    ARGS = (10000, 0.08, 0.25, 10)
+
+    def test_cancelled_run_stops_between_time_blocks(self):
+        token = CountingToken(checks=3)
+        with self.assertRaises(SimulationCancelled):
+            monte_carlo_summary(*self.ARGS, iterations=1000, resolution="daily", cancel_token=token)
+        self.assertEqual(token.remaining, -1)  # Stopped at the fourth of ten yearly blocks
+
+    def test_adaptive_run_stops_between_batches(self):
+        token = CancellationToken()
+        summaries = iter_monte_carlo_summary(*self.ARGS, precision=1e-6, cancel_token=token)
+        first = next(summaries)
+        self.assertIsNone(first["stop_reason"])
+        token.cancel()
+        with self.assertRaises(SimulationCancelled):
+            next(summaries)
+
+    def test_uncancelled_token_leaves_results_unchanged(self):
+        reference = monte_carlo_summary(*self.ARGS, iterations=1000)
+        result = monte_carlo_summary(*self.ARGS, iterations=1000, cancel_token=CancellationToken())
+        self.assertEqual(result["final_value"], reference["final_value"])
+
+    def test_optimizer_stops_between_restarts(self):
+        rng = np.random.default_rng(0)
+        stock_data = {
+            ticker: pd.DataFrame({"Close": 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, 300))})
+            for ticker in ("AAA", "BBB", "CCC")
+        }
+        token = CountingToken(checks=2)
+        with self.assertRaises(SimulationCancelled):
+            optimize_stock_allocation(stock_data, 0.5, 5, cancel_token=token)
+
+
+class FakeRequest:
+    def __init__(self, disconnected):
+        self.disconnected = disconnected
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+class TestRunCancellable(unittest.TestCase):
+
+    def wait_for_cancel(self, token):
+        for _ in range(200):
+            token.raise_if_cancelled()
+            time.sleep(0.01)
+        return "finished"
+
+    def test_disconnect_cancels_work(self):
+        token = CancellationToken()
+        with self.assertRaises(SimulationCancelled):
+            asyncio.run(run_cancellable(FakeRequest(True), lambda: self.wait_for_cancel(token), token))
+        self.assertEqual(token.reason, "client disconnected")
+
+    def test_returns_result_while_connected(self):
+        token = CancellationToken()
+        self.assertEqual(asyncio.run(run_cancellable(FakeRequest(False), lambda: 42, token)), 42)
+        self.assertFalse(token.cancelled)
+
+
+class TestStreamCancellable(unittest.TestCase):
+
+    def collect(self, stream):
+        async def consume():
+            return [chunk async for chunk in stream]
+        return asyncio.run(consume())
+
+    def test_disconnect_mid_stream_cancels_token(self):
+        token = CancellationToken()
+
+        def events():
+            yield "first"
+            while not token.cancelled:
+                time.sleep(0.01)
+            yield "stopped"
+
+        self.assertEqual(self.collect(stream_cancellable(FakeRequest(True), events(), token)), ["first", "stopped"])
+        self.assertEqual(token.reason, "client disconnected")
+
+    def test_closing_mid_stream_cancels_token_and_closes_events(self):
+        token = CancellationToken()
+        closed = []
+
+        def events():
+            try:
+                while True:
+                    yield "chunk"
+            finally:
+                closed.append(True)
+
+        async def read_one_and_close():
+            stream = stream_cancellable(FakeRequest(False), events(), token)
+            chunk = await stream.__anext__()
+            await stream.aclose()
+            return chunk
+
+        self.assertEqual(asyncio.run(read_one_and_close()), "chunk")
+        self.assertTrue(token.cancelled)
+        self.assertEqual(closed, [True])
+
+    def test_streams_to_the_end_while_connected(self):
+        token = CancellationToken()
+        self.assertEqual(self.collect(stream_cancellable(FakeRequest(False), iter(["a", "b"]), token)), ["a", "b"])
+        self.assertFalse(token.cancelled)
+
+    @patch("routes.simulate.iter_simulation")
+    def test_client_disconnect_cancels_simulate_stream(self, mock_iter_simulation):
+        result_cache.clear()
+
+        def events(cancel_token, **kwargs):
+            yield {"event": "asset", "progress": 0.25}
+            while not cancel_token.cancelled:
+                time.sleep(0.01)
+            cancel_token.raise_if_cancelled()
+
+        mock_iter_simulation.side_effect = events
+        body = json.dumps({
+            "investment_amount": 10000, "duration": 5, "risk_appetite": 0.5,
+            "market_condition": "neutral", "stocks": 40, "bonds": 30,
+            "real_estate": 20, "commodities": 10,
+        }).encode()
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+                 "scheme": "http", "path": "/simulate/stream", "raw_path": b"/simulate/stream",
+                 "query_string": b"", "root_path": "", "headers": [(b"content-type", b"application/json")],
+                 "client": ("testclient", 50000), "server": ("testserver", 80)}
+
+        async def disconnect_after_first_event():
+            first_event = asyncio.Event()
+            requested = []
+
+            async def receive():
+                requested.append(True)
+                if len(requested) == 1:
+                    return {"type": "http.request", "body": body, "more_body": False}
+                await first_event.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message.get("body"):
+                    first_event.set()
+
+            await asyncio.wait_for(app(scope, receive, send), timeout=10)
+
+        asyncio.run(disconnect_after_first_event())
+        self.assertTrue(mock_iter_simulation.call_args.kwargs["cancel_token"].cancelled)
+
+
+class TestSimulateTimeout(unittest.TestCase):
+
+    @patch("routes.simulate.run_simulation")
+    def test_cancelled_simulation_returns_504(self, mock_run_simulation):
+        result_cache.clear()
+        mock_run_simulation.side_effect = SimulationCancelled("Simulation cancelled: deadline exceeded")
+        response = TestClient(app).post("/simulate/", json={
+            "investment_amount": 10000, "duration": 5, "risk_appetite": 0.5,
+            "market_condition": "neutral", "stocks": 40, "bonds": 30,
+            "real_estate": 20, "commodities": 10,
+        })
+        self.assertEqual(response.status_code, 504)
+        self.assertIsNotNone(mock_run_simulation.call_args.kwargs["cancel_token"])
+
+    @patch("routes.risk_assessment.run_batch_risk_assessment")
+    def test_cancelled_batch_returns_504(self, mock_run_batch):
+        mock_run_batch.side_effect = SimulationCancelled("Simulation cancelled: deadline exceeded")
+        response = TestClient(app).post("/risk/risk-assessment/batch", json={"requests": [{
+            "investment_amount": 10000, "duration": 5, "risk_appetite": 0.5,
+            "stocks": 40, "bonds": 30, "real_estate": 20, "commodities": 10,
+        }]})
+        self.assertEqual(response.status_code, 504)
+        self.assertIsNotNone(mock_run_batch.call_args.kwargs["cancel_token"])
+
+    def test_cancelled_batch_stops_before_simulating(self):
+        token = CancellationToken()
+        token.cancel("client disconnected")
+        with patch("services.risk_assessment.get_market_trend") as mock_trend:
+            with self.assertRaises(SimulationCancelled):
+                run_batch_risk_assessment([{"investment_amount": 10000, "duration": 5, "risk_appetite": 0.5,
+                                            "stocks": 40, "bonds": 30, "real_estate": 20, "commodities": 10}],
+                                          cancel_token=token)
+        mock_trend.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import asyncio
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from routes.health import router as health_router
+from utils import health
+from utils.data_loader import load_data
+from utils.health import ReadinessProber, check_data_store, check_statistics
+
+app = FastAPI()
+app.include_router(health_router)
+
+
+class TestReadinessProber(unittest.TestCase):
+
+    def test_ready_only_when_every_check_passes(self):
+        prober = ReadinessProber()
+        healthy = {"database": True}
+
+        async def database():
+            if not healthy["database"]:
+                raise ConnectionError("connection refused")
+
+        async def data_store():
+            return None
+
+        prober.register("database", database)
+        prober.register("data_store", data_store)
+        self.assertFalse(prober.snapshot()["ready"])  # Nothing checked yet
+
+        asyncio.run(prober.probe_once())
+        self.assertTrue(prober.snapshot()["ready"])
+
+        healthy["database"] = False
+        asyncio.run(prober.probe_once())
+        snapshot = prober.snapshot()
+        self.assertFalse(snapshot["ready"])
+        self.assertEqual(snapshot["checks"]["database"]["error"], "connection refused")
+        self.assertTrue(snapshot["checks"]["data_store"]["ok"])
+
+    def test_informational_checks_do_not_gate_readiness(self):
+        prober = ReadinessProber()
+
+        async def database():
+            return None
+
+        async def market_data():
+            raise ConnectionError("yfinance unreachable")
+
+        prober.register("database", database)
+        prober.register("market_data", market_data, gating=False)
+        asyncio.run(prober.probe_once())
+        snapshot = prober.snapshot()
+        self.assertTrue(snapshot["ready"])
+        self.assertNotIn("market_data", snapshot["checks"])
+        self.assertEqual(snapshot["info"]["market_data"]["error"], "yfinance unreachable")
+
+    def test_market_data_is_not_gating(self):
+        snapshot = health.readiness_prober.snapshot()
+        self.assertNotIn("market_data", snapshot["checks"])
+        self.assertIn("market_data", snapshot["info"])
+
+    def test_slow_check_times_out(self):
+        prober = ReadinessProber(timeout_seconds=0.05)
+
+        async def hangs():
+            await asyncio.sleep(5)
+
+        prober.register("database", hangs)
+        asyncio.run(prober.probe_once())
+        self.assertEqual(prober.snapshot()["checks"]["database"]["error"], "TimeoutError")
+
+    def test_bundled_data_store_is_present(self):
+        with patch("utils.health.load_data") as mock_load_data:
+            asyncio.run(check_data_store())
+        mock_load_data.assert_not_called()  # Checked with a stat, never parsed
+
+    def test_statistics_are_only_recomputed_when_a_file_changes(self):
+        health._verified_statistics.clear()
+        with patch("utils.health.load_data", side_effect=load_data) as mock_load_data:
+            asyncio.run(check_statistics())
+            self.assertEqual(mock_load_data.call_count, 3)
+            asyncio.run(check_statistics())
+            self.assertEqual(mock_load_data.call_count, 3)  # Warm: nothing parsed again
+
+            with patch("utils.health._file_signature", return_value=(0, 1)):
+                asyncio.run(check_statistics())
+            self.assertEqual(mock_load_data.call_count, 6)
+
+    def test_statistics_fail_on_too_little_history(self):
+        health._verified_statistics.clear()
+        short = load_data("bonds").head(10)
+        with patch("utils.health.load_data", return_value=short):
+            with self.assertRaises(ValueError):
+                asyncio.run(check_statistics())
+        self.assertEqual(health._verified_statistics, {})
+
+
+class TestHealthRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_healthz_does_no_io(self):
+        with patch("routes.health.readiness_prober") as prober:
+            self.assertEqual(self.client.get("/healthz").json(), {"status": "ok"})
+        prober.snapshot.assert_not_called()
+
+    def test_readyz_reports_cached_state(self):
+        prober = ReadinessProber()
+
+        async def failing():
+            raise ConnectionError("down")
+
+        prober.register("database", failing)
+        with patch("routes.health.readiness_prober", prober):
+            asyncio.run(prober.probe_once())
+            with patch.object(prober, "probe_once") as probe_once:
+                response = self.client.get("/readyz")
+                probe_once.assert_not_called()
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.json()["ready"])
+
+
+if __name__ == '__main__':
+    unittest.main()
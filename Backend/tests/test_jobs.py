@@ -0,0 +1,184 @@
+import unittest
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import threading
+import time
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from routes.jobs import router as jobs_router
+from utils.job_queue import JobManager, JobQueueFull
+from utils.result_cache import result_cache
+
+app = FastAPI()
+app.include_router(jobs_router, prefix="/jobs")
+
+
+def wait_for(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+class TestJobManager(unittest.TestCase):
+
+    def test_runs_job_and_reports_progress(self):
+        manager = JobManager(workers=1)
+
+        def work(progress):
+            progress(0.5)
+            progress(0.25)  # Ignored: progress never moves backwards
+            return {"value": 42}
+
+        job, created = manager.submit("test", "key", work)
+        self.assertTrue(created)
+        wait_for(job)
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(job.result, {"value": 42})
+        self.assertEqual(job.progress, 1.0)
+        self.assertIs(manager.get(job.id), job)
+
+    def test_identical_keys_share_a_job(self):
+        manager = JobManager(workers=1)
+        release = threading.Event()
+        job, _ = manager.submit("test", "key", lambda progress: release.wait(5))
+        duplicate, created = manager.submit("test", "key", lambda progress: None)
+        release.set()
+        self.assertFalse(created)
+        self.assertIs(duplicate, job)
+
+    def test_failed_job_records_error_and_can_be_retried(self):
+        manager = JobManager(workers=1)
+
+        def fail(progress):
+            raise ValueError("boom")
+
+        job, _ = manager.submit("test", "key", fail)
+        wait_for(job)
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error, "boom")
+
+        retry, created = manager.submit("test", "key", lambda progress: "ok")
+        self.assertTrue(created)
+        self.assertEqual(wait_for(retry).result, "ok")
+
+    def test_queue_is_bounded(self):
+        manager = JobManager(workers=1, max_queued=1)
+        started, release = threading.Event(), threading.Event()
+
+        def block(progress):
+            started.set()
+            release.wait(5)
+
+        manager.submit("test", "running", block)
+        started.wait(5)
+        manager.submit("test", "queued", lambda progress: None)
+        with self.assertRaises(JobQueueFull):
+            manager.submit("test", "rejected", lambda progress: None)
+        release.set()
+
+    @pytest.mark.usefixtures("fake_clock")
+    def test_finished_jobs_expire(self):
+        clock = self.clock
+        manager = JobManager(workers=1, ttl_seconds=60, clock=clock)
+        job, _ = manager.submit("test", "key", lambda progress: "done")
+        wait_for(job)
+        clock.now += 59
+        self.assertIs(manager.get(job.id), job)
+        clock.now += 1
+        self.assertIsNone(manager.get(job.id))
+        _, created = manager.submit("test", "key", lambda progress: "done")
+        self.assertTrue(created)
+
+
+class TestJobsAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+        self.manager = JobManager(workers=1)
+        patcher = patch("routes.jobs.job_manager", self.manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        result_cache.clear()
+        self.simulation_request = {
+            "investment_amount": 10000, "duration": 5, "risk_appetite": 0.5,
+            "market_condition": "neutral", "stocks": 40, "bonds": 30,
+            "real_estate": 20, "commodities": 10,
+        }
+
+    @patch("routes.simulate.run_simulation")
+    def test_simulation_job_lifecycle(self, mock_run_simulation):
+        mock_run_simulation.return_value = {"Final Portfolio Value": 12345.0}
+
+        response = self.client.post("/jobs/simulate", json=self.simulation_request)
+        self.assertEqual(response.status_code, 202)
+        body = response.json()
+        self.assertFalse(body["deduplicated"])
+        job_id = body["job_id"]
+        self.assertEqual(response.headers["Location"], f"/jobs/{job_id}")
+
+        wait_for(self.manager.get(job_id))
+        status = self.client.get(f"/jobs/{job_id}").json()
+        self.assertEqual(status["status"], "succeeded")
+        self.assertEqual(status["progress"], 1.0)
+
+        result = self.client.get(f"/jobs/{job_id}/result")
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.json(), {"status": "success", "data": {"Final Portfolio Value": 12345.0}})
+        self.assertIsNotNone(mock_run_simulation.call_args.kwargs["progress"])
+
+        # The finished job is reused for an identical request
+        again = self.client.post("/jobs/simulate", json=self.simulation_request)
+        self.assertEqual(again.json()["job_id"], job_id)
+        self.assertTrue(again.json()["deduplicated"])
+        mock_run_simulation.assert_called_once()
+
+    def test_invalid_request_is_rejected_before_queuing(self):
+        self.simulation_request["stocks"] = 90
+        response = self.client.post("/jobs/simulate", json=self.simulation_request)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.manager.queued(), 0)
+
+    @patch("routes.simulate.run_simulation")
+    def test_result_is_409_until_finished(self, mock_run_simulation):
+        release = threading.Event()
+        mock_run_simulation.side_effect = lambda **kwargs: release.wait(5) and {}
+
+        job_id = self.client.post("/jobs/simulate", json=self.simulation_request).json()["job_id"]
+        self.assertEqual(self.client.get(f"/jobs/{job_id}/result").status_code, 409)
+        release.set()
+        wait_for(self.manager.get(job_id))
+        self.assertEqual(self.client.get(f"/jobs/{job_id}/result").status_code, 200)
+
+    @patch("routes.suggestions.get_optimized_portfolio")
+    def test_failed_suggestions_job(self, mock_get_optimized_portfolio):
+        mock_get_optimized_portfolio.return_value = {"error": "Optimization failed"}
+        request = {"investment": 10000, "duration": 5, "risk_tolerance": 0.5,
+                   "stocks": 40, "bonds": 30, "real_estate": 20, "commodities": 10}
+
+        job_id = self.client.post("/jobs/portfolio_suggestions", json=request).json()["job_id"]
+        wait_for(self.manager.get(job_id))
+        self.assertEqual(self.client.get(f"/jobs/{job_id}").json()["error"], "Optimization failed")
+        result = self.client.get(f"/jobs/{job_id}/result")
+        self.assertEqual(result.status_code, 500)
+        self.assertEqual(result.json()["detail"], "Optimization failed")
+
+    def test_queue_full_returns_503(self):
+        with patch.object(self.manager, "submit", side_effect=JobQueueFull("full")):
+            response = self.client.post("/jobs/simulate", json=self.simulation_request)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response.headers)
+
+    def test_unknown_job_is_404(self):
+        self.assertEqual(self.client.get("/jobs/missing").status_code, 404)
+        self.assertEqual(self.client.get("/jobs/missing/result").status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
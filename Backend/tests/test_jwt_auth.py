@@ -0,0 +1,92 @@
+import unittest
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI, Depends, HTTPException
+from fastapi.testclient import TestClient
+import time
+import jwt
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import jwt_auth
+from utils.jwt_auth import (TokenCache, AuthenticatedUser, create_token, verify_token, get_current_user,
+                            auth_guard, token_cache, SECRET_KEY, ALGORITHM)
+
+app = FastAPI()
+
+
+@app.get("/me")
+async def me(current_user: AuthenticatedUser = Depends(get_current_user)):
+    return {"email": current_user.email}
+
+
+@app.get("/guarded", dependencies=[Depends(auth_guard)])
+async def guarded():
+    return {"ok": True}
+
+
+class TestTokenCache(unittest.TestCase):
+
+    @pytest.mark.usefixtures("fake_clock")
+    def test_entries_expire_with_token(self):
+        clock = self.clock
+        cache = TokenCache(clock=clock)
+        cache.set("token", {"sub": "a@b.c", "exp": 1060})
+        self.assertEqual(cache.get("token"), {"sub": "a@b.c", "exp": 1060})
+        clock.now = 1060
+        self.assertIsNone(cache.get("token"))
+
+    def test_size_is_bounded(self):
+        cache = TokenCache(max_entries=2)
+        for token in ("a", "b", "c"):
+            cache.set(token, {"sub": token})
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), {"sub": "c"})
+
+
+class TestVerifyToken(unittest.TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+
+    def test_valid_token_is_decoded_once(self):
+        token = create_token("user@example.com")
+        with patch("utils.jwt_auth.jwt.decode", wraps=jwt.decode) as decode:
+            self.assertEqual(verify_token(token)["sub"], "user@example.com")
+            self.assertEqual(verify_token(token)["sub"], "user@example.com")
+        decode.assert_called_once()
+
+    def test_invalid_and_expired_tokens_are_rejected(self):
+        expired = jwt.encode({"sub": "user@example.com", "exp": int(time.time()) - 10}, SECRET_KEY, algorithm=ALGORITHM)
+        forged = jwt.encode({"sub": "user@example.com"}, "another-secret", algorithm=ALGORITHM)
+        for token, detail in ((expired, "Token has expired"), (forged, "Invalid token"), ("garbage", "Invalid token")):
+            with self.assertRaises(HTTPException) as raised:
+                verify_token(token)
+            self.assertEqual((raised.exception.status_code, raised.exception.detail), (401, detail))
+
+
+class TestAuthDependencies(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+        token_cache.clear()
+
+    def test_current_user_dependency(self):
+        token = create_token("user@example.com")
+        response = self.client.get("/me", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.json(), {"email": "user@example.com"})
+        self.assertEqual(self.client.get("/me").status_code, 401)
+
+    def test_guard_enforces_tokens_only_when_required(self):
+        self.assertEqual(self.client.get("/guarded").status_code, 200)
+        with patch.object(jwt_auth, "REQUIRE_AUTH", True):
+            self.assertEqual(self.client.get("/guarded").status_code, 401)
+            token = create_token("user@example.com")
+            self.assertEqual(self.client.get("/guarded", headers={"Authorization": f"Bearer {token}"}).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+import io
+import json
+import logging
+import threading
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import log
+from utils.log import configure_logging, flush_logging, get_logger, sample_debug, JsonFormatter
+
+
+class TestStructuredLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        configure_logging(level="DEBUG", fmt="json", sample_rate=0.0, stream=self.stream)
+        self.logger = get_logger("tests.log")
+
+    def tearDown(self):
+        configure_logging()
+
+    def records(self):
+        flush_logging()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_json_lines_carry_extra_fields(self):
+        self.logger.info("Loaded %d histories", 3, extra={"seconds": 1.5})
+        record, = self.records()
+        self.assertEqual(record["level"], "INFO")
+        self.assertEqual(record["logger"], "portfolio_pilot.tests.log")
+        self.assertEqual(record["message"], "Loaded 3 histories")
+        self.assertEqual(record["seconds"], 1.5)
+
+    def test_debug_output_follows_the_request_sampling_decision(self):
+        reset = sample_debug(False)
+        self.logger.debug("dropped")
+        self.logger.warning("kept")
+        log._debug_sampled.reset(reset)
+        reset = sample_debug(True)
+        self.logger.debug("sampled")
+        log._debug_sampled.reset(reset)
+        self.assertEqual([r["message"] for r in self.records()], ["kept", "sampled"])
+
+    def test_records_are_formatted_off_the_calling_thread(self):
+        threads = []
+        original = JsonFormatter.format
+
+        def format(formatter, record):
+            threads.append(threading.current_thread())
+            return original(formatter, record)
+
+        with patch.object(JsonFormatter, "format", format):
+            self.logger.warning("off thread")
+            self.records()
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import threading
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from routes.metrics import router as metrics_router
+from utils.data_loader import load_data
+from utils.metrics import (MetricsRegistry, STAGE_SECONDS, DATA_LOAD_SECONDS, HTTP_REQUEST_SECONDS, MetricsMiddleware,
+                           TimedJSONResponse, timed_outcome)
+
+app = FastAPI(default_response_class=TimedJSONResponse)
+app.include_router(metrics_router)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/items/{item_id}")
+async def item(item_id: int):
+    return {"id": item_id}
+
+
+class TestMetricTypes(unittest.TestCase):
+
+    def test_histogram_exposition(self):
+        histogram = MetricsRegistry().histogram("test_seconds", "Test latency.", ("stage",), buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value, stage="load")
+        lines = histogram.render().splitlines()
+        self.assertEqual(lines[:2], ["# HELP test_seconds Test latency.", "# TYPE test_seconds histogram"])
+        self.assertIn('test_seconds_bucket{stage="load",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{stage="load",le="1"} 2', lines)
+        self.assertIn('test_seconds_bucket{stage="load",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_sum{stage="load"} 5.55', lines)
+        self.assertIn('test_seconds_count{stage="load"} 3', lines)
+
+    def test_counter_sums_thread_shards(self):
+        counter = MetricsRegistry().counter("test_total", "Test counter.", ("result",))
+
+        def work():
+            for _ in range(1000):
+                counter.inc(result="hit")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.value(result="hit"), 4000)
+        self.assertIn('test_total{result="hit"} 4000', counter.render())
+
+    def test_duplicate_names_are_rejected(self):
+        registry = MetricsRegistry()
+        registry.counter("test_total", "Test counter.")
+        with self.assertRaises(ValueError):
+            registry.histogram("test_total", "Again.")
+
+
+class TestStageTiming(unittest.TestCase):
+
+    def test_streamed_outcome_is_recorded_when_done(self):
+        def engine():
+            yield 1
+            yield 2
+
+        before = STAGE_SECONDS.count(stage="test_engine")
+        stream = timed_outcome("test_engine", engine(), 0.0)
+        self.assertEqual(next(stream), 1)
+        self.assertEqual(STAGE_SECONDS.count(stage="test_engine"), before)
+        stream.close()  # Consumers stop at the final result
+        self.assertEqual(STAGE_SECONDS.count(stage="test_engine"), before + 1)
+
+    def test_csv_loads_are_recorded(self):
+        before = DATA_LOAD_SECONDS.count(source="csv")
+        load_data("bonds")
+        self.assertEqual(DATA_LOAD_SECONDS.count(source="csv"), before + 1)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def test_requests_are_recorded_by_route_template(self):
+        client = TestClient(app)
+        before = HTTP_REQUEST_SECONDS.count(method="GET", route="/items/{item_id}", status="200")
+        serialized = STAGE_SECONDS.count(stage="serialization")
+        self.assertEqual(client.get("/items/7").json(), {"id": 7})
+        self.assertEqual(HTTP_REQUEST_SECONDS.count(method="GET", route="/items/{item_id}", status="200"), before + 1)
+        self.assertEqual(STAGE_SECONDS.count(stage="serialization"), serialized + 1)
+
+        response = client.get("/metrics")
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('portfolio_pilot_http_request_seconds_count{method="GET",route="/items/{item_id}",status="200"}',
+                      response.text)
+
+
+if __name__ == '__main__':
+    unittest.main()
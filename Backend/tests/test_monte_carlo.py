@@ -0,0 +1,364 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pickle
+import importlib.util
+from unittest.mock import patch
+from models.monte_carlo import (monte_carlo_simulation, monte_carlo_summary, simulated_drawdown, PathStatistics,
+                                iter_monte_carlo_summary, iter_monte_carlo_simulation, stream_expected_path, split_deadline,
+                                combine_asset_errors,
+                                _simulate_log_checkpoints, _checkpoint_rows, _simulate_shard, _shard_layout)
+from models.process_pool import shutdown_process_pool
+from models import jit_kernels
+from models.analytic import analytic_simulation
+from models.gbm_model import geometric_brownian_motion
+from models.buffer_pool import get_buffer_pool
+
+
+def reference_monte_carlo(initial_value, mean_return, volatility, time_horizon, iterations=10000):
+    # Original full-matrix implementation, kept to check the blocked engine draws identical paths
+    np.random.seed(42)
+    daily_returns = np.random.normal(mean_return / 252, volatility / np.sqrt(252), (time_horizon * 252, iterations))
+    portfolio_values = initial_value * np.exp(daily_returns.cumsum(axis=0))
+    return portfolio_values[-1, :].mean(), portfolio_values[::252, :].mean(axis=1)[:time_horizon]
+
+
+class TestMonteCarloEngine(unittest.TestCase):
+
+    ARGS = (10000, 0.08, 0.25, 3)
+
+    def test_default_matches_reference_paths(self):
+        final_value, yearly_values = monte_carlo_simulation(*self.ARGS, iterations=2000, resolution="daily")
+        expected_final, expected_yearly = reference_monte_carlo(*self.ARGS, iterations=2000)
+        self.assertEqual(final_value, expected_final)
+        np.testing.assert_array_equal(yearly_values, expected_yearly)
+
+    def test_reports_standard_error_and_paths(self):
+        result = monte_carlo_simulation(*self.ARGS, iterations=2000)
+        self.assertEqual(result.details["paths"], 2000)
+        self.assertGreater(result.details["standard_error"], 0)
+        self.assertEqual(len(result.details["yearly_standard_error"]), 3)
+
+    def test_variance_reduction_methods_are_unbiased_and_more_precise(self):
+        exact_final, _ = analytic_simulation(*self.ARGS)
+        plain = monte_carlo_summary(*self.ARGS, iterations=4000)
+        for method in ("antithetic", "control_variate", "sobol", "halton"):
+            with self.subTest(method=method):
+                summary = monte_carlo_summary(*self.ARGS, iterations=4000, variance_reduction=method)
+                self.assertEqual(summary["variance_reduction"], method)
+                self.assertLess(abs(summary["final_value"] - exact_final), 4 * summary["standard_error"] + 1e-6 * exact_final)
+                if method != "halton":  # Scrambled Halton is only marginally better in this many dimensions
+                    self.assertLess(summary["standard_error"], plain["standard_error"])
+
+    def test_sobol_uses_power_of_two_points_per_replicate(self):
+        summary = monte_carlo_summary(*self.ARGS, iterations=3000, variance_reduction="sobol")
+        self.assertEqual(summary["paths"], 8 * 256)  # Rounded down, never above the requested paths
+        self.assertEqual(monte_carlo_summary(*self.ARGS, iterations=4096, variance_reduction="sobol")["paths"], 4096)
+
+    def test_unknown_method_raises(self):
+        with self.assertRaises(ValueError):
+            monte_carlo_summary(*self.ARGS, variance_reduction="magic")
+
+    def test_adaptive_precision_stops_at_target(self):
+        summary = monte_carlo_summary(*self.ARGS, precision=0.01)
+        self.assertEqual(summary["stop_reason"], "precision")
+        self.assertLessEqual(summary["standard_error"], 0.01 * summary["final_value"])
+        self.assertEqual(summary["paths"] % 2000, 0)
+
+        tighter = monte_carlo_summary(*self.ARGS, precision=0.003)
+        self.assertGreater(tighter["paths"], summary["paths"])
+
+    def test_adaptive_low_volatility_needs_few_paths(self):
+        low_vol = monte_carlo_summary(10000, 0.03, 0.02, 1, precision=0.001)
+        self.assertEqual(low_vol["paths"], 2000)
+
+    def test_adaptive_deadline_and_path_cap(self):
+        deadline = monte_carlo_summary(*self.ARGS, deadline_ms=1, resolution="daily")  # A daily batch outlasts 1 ms
+        self.assertEqual(deadline["stop_reason"], "deadline")
+        self.assertEqual(deadline["paths"], 2000)  # Always completes at least one batch
+
+        capped = monte_carlo_summary(*self.ARGS, precision=1e-9, max_iterations=6000)
+        self.assertEqual(capped["stop_reason"], "max_iterations")
+        self.assertEqual(capped["paths"], 6000)
+
+    def test_deadline_is_split_between_assets(self):
+        self.assertEqual(split_deadline({"deadline_ms": 400, "dtype": "float32"}, 4), {"deadline_ms": 100, "dtype": "float32"})
+        options = {"deadline_ms": None}
+        self.assertIs(split_deadline(options, 4), options)
+
+    def test_asset_errors_add_up(self):
+        self.assertEqual(combine_asset_errors([(3.0, 1000), (4.0, 2000)]), (7.0, 3000))
+        self.assertEqual(combine_asset_errors([]), (0, 0))
+
+    def test_adaptive_quasi_random_uses_replicates(self):
+        summary = monte_carlo_summary(*self.ARGS, variance_reduction="sobol", precision=0.01)
+        self.assertEqual(summary["stop_reason"], "precision")
+        self.assertGreaterEqual(summary["paths"], 2 * 1024)
+
+    def test_distribution_matches_closed_form(self):
+        summary = monte_carlo_summary(*self.ARGS, distribution=True, var_levels=(0.95,))
+        exact = analytic_simulation(*self.ARGS, distribution=True, var_levels=(0.95,)).details["distribution"]
+        distribution = summary["distribution"]
+
+        for p in (5, 25, 50, 75, 95):
+            np.testing.assert_allclose(distribution["yearly_percentiles"][p], exact["yearly_percentiles"][p], rtol=0.03)
+            self.assertAlmostEqual(distribution["final_percentiles"][p] / exact["final_percentiles"][p], 1, delta=0.03)
+        self.assertAlmostEqual(distribution["var"][0.95], exact["var"][0.95], delta=0.01 * self.ARGS[0])
+        self.assertAlmostEqual(distribution["cvar"][0.95], exact["cvar"][0.95], delta=0.01 * self.ARGS[0])
+        self.assertAlmostEqual(distribution["probability_of_loss"], exact["probability_of_loss"], delta=0.02)
+        self.assertEqual(distribution["quantile_grid"].shape, (4, 1000))
+
+    def test_distribution_is_optional(self):
+        self.assertNotIn("distribution", monte_carlo_summary(*self.ARGS, iterations=500))
+
+    def test_drawdown_matches_full_paths(self):
+        initial_value, mean_return, volatility, time_horizon = self.ARGS
+        np.random.seed(42)
+        daily_returns = np.random.normal(mean_return / 252, volatility / np.sqrt(252), (time_horizon * 252, 2000))
+        paths = np.exp(daily_returns.cumsum(axis=0))
+        expected = 1 - (paths / np.maximum(np.maximum.accumulate(paths, axis=0), 1)).min(axis=0)
+
+        drawdown = monte_carlo_summary(*self.ARGS, iterations=2000, drawdown=True)["drawdown"]
+        self.assertAlmostEqual(drawdown["expected"], expected.mean(), places=10)
+        self.assertAlmostEqual(drawdown["standard_error"], expected.std(ddof=1) / np.sqrt(2000), places=10)
+        for p in (50, 95, 99):
+            self.assertAlmostEqual(drawdown["percentiles"][p] / np.percentile(expected, p), 1, delta=0.005)
+        self.assertEqual(simulated_drawdown(*self.ARGS, iterations=2000), drawdown)
+        self.assertNotIn("drawdown", monte_carlo_summary(*self.ARGS, iterations=500))
+
+
+class TestResolution(unittest.TestCase):
+
+    ARGS = (10000, 0.08, 0.25, 5)
+
+    def test_yearly_steps_match_daily_distribution(self):
+        exact = analytic_simulation(*self.ARGS)
+        for method in ("none", "antithetic", "control_variate", "sobol", "halton"):
+            yearly = monte_carlo_summary(*self.ARGS, iterations=20000, variance_reduction=method)
+            self.assertEqual(yearly["resolution"], "yearly")
+            self.assertLess(abs(yearly["final_value"] - exact[0]), 4 * yearly["standard_error"], method)
+            np.testing.assert_allclose(yearly["yearly_values"], exact[1], atol=4 * yearly["standard_error"])
+
+        daily = monte_carlo_summary(*self.ARGS, iterations=20000, resolution="daily")
+        yearly = monte_carlo_summary(*self.ARGS, iterations=20000)
+        self.assertAlmostEqual(yearly["standard_error"] / daily["standard_error"], 1, delta=0.1)
+
+    def test_drawdown_selects_daily_steps(self):
+        self.assertEqual(monte_carlo_summary(*self.ARGS, iterations=500, drawdown=True)["resolution"], "daily")
+        with self.assertRaises(ValueError):
+            monte_carlo_summary(*self.ARGS, iterations=500, drawdown=True, resolution="yearly")
+        with self.assertRaises(ValueError):
+            monte_carlo_summary(*self.ARGS, iterations=500, resolution="monthly")
+
+    def test_gbm_daily_matches_reference_loop(self):
+        initial_value, mean_return, volatility, time_horizon = self.ARGS
+        np.random.seed(42)
+        shocks = np.random.normal(0, np.sqrt(1 / 252), size=time_horizon * 252)
+        path = initial_value * np.exp(np.cumsum((mean_return - 0.5 * volatility ** 2) / 252 + volatility * shocks))
+        final_value, yearly_values = geometric_brownian_motion(*self.ARGS, resolution="daily")
+        self.assertAlmostEqual(final_value / path[-1], 1, delta=1e-12)
+        np.testing.assert_allclose(yearly_values[1:], path[251:-1:252], rtol=1e-12)
+
+        final_value, yearly_values = geometric_brownian_motion(*self.ARGS)
+        self.assertEqual(len(yearly_values), time_horizon)
+        self.assertEqual(yearly_values[0], initial_value)
+
+
+class TestIncrementalSummary(unittest.TestCase):
+
+    ARGS = (10000, 0.08, 0.25, 5)
+
+    def test_adaptive_run_streams_running_estimates(self):
+        summaries = list(iter_monte_carlo_summary(*self.ARGS, precision=0.002))
+        estimates, final = summaries[:-1], summaries[-1]
+        self.assertGreater(len(estimates), 1)
+        self.assertTrue(all(estimate["stop_reason"] is None for estimate in estimates))
+        self.assertEqual([estimate["paths"] for estimate in estimates],
+                         sorted(estimate["paths"] for estimate in estimates))
+        self.assertEqual(final["stop_reason"], "precision")
+        self.assertGreater(final["paths"], estimates[-1]["paths"])
+        summary = monte_carlo_summary(*self.ARGS, precision=0.002)
+        self.assertEqual((final["final_value"], final["paths"]), (summary["final_value"], summary["paths"]))
+
+    def test_single_batch_run_yields_summary_only(self):
+        summaries = list(iter_monte_carlo_summary(*self.ARGS, iterations=1000))
+        self.assertEqual(len(summaries), 1)
+        self.assertEqual(summaries[0]["stop_reason"], "fixed")
+
+    def test_stream_expected_path_relays_estimates_and_returns_result(self):
+        def relay(outcome):
+            result = yield from stream_expected_path(outcome, asset="stocks")
+            yield result
+
+        events = list(relay(iter_monte_carlo_simulation(*self.ARGS, variance_reduction="sobol", iterations=4096)))
+        self.assertEqual(len(events), 6 + 1)  # After replicates 2 to 7, then the result
+        self.assertTrue(all(event["event"] == "estimate" and event["asset"] == "stocks" for event in events[:-1]))
+        final_value, yearly_values = events[-1]
+        expected = monte_carlo_simulation(*self.ARGS, variance_reduction="sobol", iterations=4096)
+        self.assertEqual(final_value, expected[0])
+        np.testing.assert_array_equal(yearly_values, expected[1])
+
+        # Engines returning their result directly stream nothing
+        self.assertEqual(list(relay(analytic_simulation(*self.ARGS)))[0][0], analytic_simulation(*self.ARGS)[0])
+
+
+class TestFloat32Mode(unittest.TestCase):
+
+    ARGS = (10000, 0.08, 0.25, 3)
+
+    def test_float32_kernel_matches_float64_on_same_shocks(self):
+        shocks = np.random.default_rng(7).standard_normal((3 * 252, 500))
+        rows = _checkpoint_rows(3)
+        results = {}
+        for dtype in (np.float64, np.float32):
+            blocks = (shocks[start:start + 252].astype(dtype) for start in range(0, 3 * 252, 252))
+            results[dtype] = _simulate_log_checkpoints(blocks, 0.08 / 252, 0.25 / np.sqrt(252), rows, 500,
+                                                       track_drawdown=True, dtype=dtype)
+        log_growth32, drawdowns32 = results[np.float32]
+        log_growth64, drawdowns64 = results[np.float64]
+        self.assertEqual(log_growth32.dtype, np.float32)
+        np.testing.assert_allclose(np.exp(log_growth32), np.exp(log_growth64), rtol=1e-5)
+        np.testing.assert_allclose(drawdowns32, drawdowns64, atol=1e-5)
+
+    def test_float32_mode_agrees_within_sampling_error(self):
+        for method in ("none", "antithetic", "control_variate", "sobol"):
+            single = monte_carlo_summary(*self.ARGS, iterations=4000, variance_reduction=method, dtype="float32")
+            double = monte_carlo_summary(*self.ARGS, iterations=4000, variance_reduction=method)
+            combined_error = np.hypot(single["standard_error"], double["standard_error"])
+            self.assertLess(abs(single["final_value"] - double["final_value"]), 4 * combined_error, method)
+            self.assertAlmostEqual(single["standard_error"] / double["standard_error"], 1, delta=0.2)
+            self.assertIsInstance(single["final_value"], float)
+
+    def test_gbm_float32_follows_the_same_path(self):
+        final64, yearly64 = geometric_brownian_motion(*self.ARGS)
+        final32, yearly32 = geometric_brownian_motion(*self.ARGS, dtype="float32")
+        self.assertAlmostEqual(final32 / final64, 1, delta=1e-5)
+        np.testing.assert_allclose(yearly32, yearly64, rtol=1e-5)
+        self.assertEqual(yearly32.dtype, np.float64)
+
+    def test_repeated_runs_reuse_buffers(self):
+        monte_carlo_simulation(*self.ARGS, iterations=2000, dtype="float32", drawdown=True)
+        pooled_bytes = get_buffer_pool().nbytes()
+        first = monte_carlo_simulation(*self.ARGS, iterations=2000, dtype="float32", drawdown=True)
+        second = monte_carlo_simulation(*self.ARGS, iterations=2000, dtype="float32", drawdown=True)
+        self.assertEqual(get_buffer_pool().nbytes(), pooled_bytes)
+        self.assertEqual(first[0], second[0])
+        np.testing.assert_array_equal(first[1], second[1])
+
+    def test_unsupported_dtype_raises(self):
+        with self.assertRaises(ValueError):
+            monte_carlo_simulation(*self.ARGS, iterations=100, dtype="float16")
+
+
+class TestSharding(unittest.TestCase):
+
+    ARGS = (10000, 0.08, 0.25, 3)
+    OPTIONS = {"iterations": 4000, "resolution": "daily"}  # Large enough to be sharded
+
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_process_pool()
+
+    def test_sharded_runs_agree_with_serial_runs(self):
+        for method in ("none", "antithetic", "sobol"):
+            serial = monte_carlo_summary(*self.ARGS, variance_reduction=method, **self.OPTIONS)
+            sharded = monte_carlo_summary(*self.ARGS, variance_reduction=method, workers=2, distribution=True,
+                                          drawdown=True, **self.OPTIONS)
+            self.assertEqual(sharded["workers"], 2)
+            self.assertEqual(sharded["paths"], serial["paths"])
+            combined_error = np.hypot(sharded["standard_error"], serial["standard_error"])
+            self.assertLess(abs(sharded["final_value"] - serial["final_value"]), 4 * combined_error, method)
+            self.assertIn("distribution", sharded)
+            self.assertIn("drawdown", sharded)
+
+            if method != "sobol":
+                # Fixed pseudo-random shards split the shock bank, so they reproduce the serial run
+                self.assertAlmostEqual(sharded["final_value"], serial["final_value"], places=6)
+
+        repeated = monte_carlo_summary(*self.ARGS, variance_reduction="sobol", workers=2, distribution=True,
+                                       drawdown=True, **self.OPTIONS)
+        self.assertEqual(repeated["final_value"], sharded["final_value"])  # Reproducible per seed and workers
+        self.assertEqual(repeated["drawdown"], sharded["drawdown"])
+
+    def test_adaptive_sharding_adds_rounds(self):
+        summary = monte_carlo_summary(*self.ARGS, precision=0.004, workers=2, resolution="daily")
+        self.assertEqual(summary["stop_reason"], "precision")
+        self.assertEqual(summary["paths"] % 4000, 0)  # Whole rounds of one 2000-path batch per worker
+
+    def test_small_runs_stay_in_process(self):
+        self.assertEqual(monte_carlo_summary(*self.ARGS, workers=4)["workers"], 1)  # Yearly steps are cheap
+
+    def test_shards_return_only_partial_sums(self):
+        summary = monte_carlo_summary(*self.ARGS, iterations=1000, resolution="daily")
+        kernel = {"initial_value": 10000, "daily_mean": 0.08 / 252, "daily_volatility": 0.25 / np.sqrt(252),
+                  "time_steps": 3 * 252, "checkpoint_rows": _checkpoint_rows(3), "step_sizes": None,
+                  "variance_reduction": "none", "dtype": np.dtype(np.float64), "distribution": False, "drawdown": False}
+        partial = _simulate_shard(kernel, np.random.SeedSequence(1), 20000, 1)
+        self.assertEqual(partial.paths, 20000)
+        self.assertLess(len(pickle.dumps(partial)), 2000)  # The 20000 x 4 path values would be 640 kB
+        self.assertAlmostEqual(partial.stats.mean_y[-1] / summary["final_value"], 1, delta=0.05)
+
+    def test_shard_layout_keeps_pairs_and_replicates_whole(self):
+        self.assertEqual(_shard_layout(10, 1, 3, "none"), [(4, 1), (3, 1), (3, 1)])
+        self.assertEqual(_shard_layout(10, 1, 3, "antithetic"), [(4, 1), (4, 1), (2, 1)])
+        self.assertEqual(_shard_layout(512, 8, 3, "sobol"), [(512, 3), (512, 3), (512, 2)])
+        self.assertEqual(_shard_layout(512, 8, 16, "sobol"), [(512, 1)] * 8)
+
+
+class TestCompiledKernel(unittest.TestCase):
+
+    ARGS = (10000, 0.08, 0.25, 3)
+
+    def run_without_jit(self, **options):
+        with patch('models.monte_carlo.get_advance_paths_kernel', return_value=None):
+            return monte_carlo_summary(*self.ARGS, **options)
+
+    @unittest.skipUnless(importlib.util.find_spec("numba"), "Numba is not installed")
+    def test_compiled_kernel_matches_numpy(self):
+        self.assertIsNotNone(jit_kernels.get_advance_paths_kernel())
+        for options in ({"resolution": "daily", "drawdown": True}, {"variance_reduction": "halton", "drawdown": True},
+                        {"variance_reduction": "control_variate"}):
+            compiled = monte_carlo_summary(*self.ARGS, iterations=2000, **options)
+            numpy_only = self.run_without_jit(iterations=2000, **options)
+            self.assertEqual(compiled["final_value"], numpy_only["final_value"])
+            np.testing.assert_array_equal(compiled["yearly_values"], numpy_only["yearly_values"])
+            self.assertEqual(compiled.get("drawdown"), numpy_only.get("drawdown"))
+
+        compiled = monte_carlo_summary(*self.ARGS, iterations=2000, drawdown=True, dtype="float32")
+        numpy_only = self.run_without_jit(iterations=2000, drawdown=True, dtype="float32")
+        self.assertAlmostEqual(compiled["final_value"] / numpy_only["final_value"], 1, delta=1e-5)
+        self.assertAlmostEqual(compiled["drawdown"]["expected"], numpy_only["drawdown"]["expected"], delta=1e-5)
+
+    def test_disabled_jit_falls_back_to_numpy(self):
+        with patch('models.jit_kernels.SIMULATION_JIT_ENABLED', False):
+            self.assertIsNone(jit_kernels.get_advance_paths_kernel())
+        reference = reference_monte_carlo(*self.ARGS, iterations=1000)
+        self.assertEqual(self.run_without_jit(iterations=1000, resolution="daily")["final_value"], reference[0])
+
+
+class TestPathStatistics(unittest.TestCase):
+
+    def test_merged_batches_match_single_pass(self):
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(size=(3, 1000))
+        controls = np.log(values)
+
+        single = PathStatistics(3)
+        single.add(values, controls)
+        merged = PathStatistics(3)
+        for batch in np.array_split(np.arange(1000), 7):
+            merged.add(values[:, batch], controls[:, batch])
+
+        self.assertEqual(merged.count, 1000)
+        for expectation in (None, np.zeros(3)):
+            np.testing.assert_allclose(merged.estimate(expectation), single.estimate(expectation), rtol=1e-10)
+        np.testing.assert_allclose(single.estimate()[1], values.std(axis=1, ddof=1) / np.sqrt(1000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import threading
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def test_hash_and_verify(self):
+        hasher = PasswordHasher(rounds=4, workers=2)
+
+        async def run():
+            hashed = await hasher.hash("s3cret")
+            return hashed, await hasher.verify("s3cret", hashed), await hasher.verify("wrong", hashed)
+
+        hashed, valid, invalid = asyncio.run(run())
+        self.assertTrue(hashed.startswith("$2b$04$"))
+        self.assertTrue(valid)
+        self.assertFalse(invalid)
+        self.assertEqual(hasher.pending(), 0)
+
+    def test_needs_rehash_when_work_factor_changes(self):
+        hashed = asyncio.run(PasswordHasher(rounds=4).hash("s3cret"))
+        self.assertFalse(PasswordHasher(rounds=4).needs_rehash(hashed))
+        self.assertTrue(PasswordHasher(rounds=5).needs_rehash(hashed))
+        self.assertTrue(PasswordHasher(rounds=4).needs_rehash("not-a-bcrypt-hash"))
+
+    def test_saturated_pool_sheds_load(self):
+        hasher = PasswordHasher(rounds=4, workers=1, max_queued=1, timeout_seconds=0.2)
+        release = threading.Event()
+
+        def slow_checkpw(password, hashed):
+            release.wait(5)
+            return True
+
+        async def run():
+            # Two operations fill the worker and the queue, the third is rejected at once
+            first = asyncio.ensure_future(hasher.verify("a", "b"))
+            second = asyncio.ensure_future(hasher.verify("a", "b"))
+            await asyncio.sleep(0)
+            with self.assertRaises(PasswordHasherBusy) as rejected:
+                await hasher.verify("a", "b")
+            # The admitted ones give up after the timeout
+            results = await asyncio.gather(first, second, return_exceptions=True)
+            return rejected.exception, results
+
+        with patch("utils.password_hasher.bcrypt.checkpw", side_effect=slow_checkpw):
+            rejected, results = asyncio.run(run())
+            release.set()
+        self.assertEqual(rejected.status_code, 429)
+        self.assertTrue(all(isinstance(r, PasswordHasherBusy) and r.status_code == 503 for r in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
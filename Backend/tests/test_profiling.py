@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import patch
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from starlette.concurrency import run_in_threadpool
+import time
+import threading
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from routes.profiling import router as profiling_router, admin_guard
+from utils import profiling
+from utils.profiling import ProfilingMiddleware, ProfileStore, SamplingProfiler, profile_store
+
+TOKEN = "profile-secret"
+
+
+def busy_work():
+    deadline = time.perf_counter() + 0.1
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def make_app(sample_rate=0.0):
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return {"total": await run_in_threadpool(busy_work)}
+
+    @app.get("/allocate")
+    async def allocate():
+        return {"size": len(bytearray(4 * 1024 * 1024))}
+
+    @app.get("/admin/stats", dependencies=[Depends(admin_guard)])
+    async def stats():
+        return {"ok": True}
+
+    app.include_router(profiling_router, prefix="/admin")
+    app.add_middleware(ProfilingMiddleware, sample_rate=sample_rate)
+    return app
+
+
+class TestProfilingMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(profiling, "PROFILING_TOKEN", TOKEN)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        profile_store.clear()
+        self.client = TestClient(make_app())
+
+    def test_unauthorized_requests_are_not_profiled(self):
+        response = self.client.get("/work", headers={"X-Profile": "wrong"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("x-profile-id", response.headers)
+        self.assertEqual(profile_store.list(), [])
+        self.assertEqual(self.client.get("/admin/profiles").status_code, 403)
+
+    def test_admin_guard_requires_the_profiling_token(self):
+        self.assertEqual(self.client.get("/admin/stats").status_code, 403)
+        self.assertEqual(self.client.get("/admin/stats", headers={"X-Profile": "wrong"}).status_code, 403)
+        self.assertEqual(self.client.get("/admin/stats", headers={"X-Profile": TOKEN}).json(), {"ok": True})
+
+    def test_cpu_profile_includes_offloaded_work(self):
+        response = self.client.get("/work", headers={"X-Profile": TOKEN})
+        profile_id = response.headers["x-profile-id"]
+
+        summary, = self.client.get("/admin/profiles", headers={"X-Profile": TOKEN}).json()
+        self.assertEqual((summary["id"], summary["mode"], summary["path"], summary["status"]), (profile_id, "cpu", "/work", 200))
+        self.assertGreater(summary["samples"], 0)
+
+        collapsed = self.client.get(f"/admin/profiles/{profile_id}/collapsed", headers={"X-Profile": TOKEN}).text
+        self.assertIn("busy_work (test_profiling.py:", collapsed)
+        stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+
+    def test_memory_profile_reports_peak_allocation(self):
+        response = self.client.get("/allocate", headers={"X-Profile": TOKEN, "X-Profile-Mode": "memory"})
+        profile = self.client.get(f"/admin/profiles/{response.headers['x-profile-id']}", headers={"X-Profile": TOKEN}).json()
+        self.assertEqual(profile["mode"], "memory")
+        self.assertGreaterEqual(profile["peak_bytes"], 4 * 1024 * 1024)
+        self.assertTrue(profile["top_allocations"])
+
+    def test_sampled_traffic_is_profiled_without_a_header(self):
+        client = TestClient(make_app(sample_rate=1.0))
+        self.assertIn("x-profile-id", client.get("/work").headers)
+
+    def test_profiler_is_stopped_off_the_event_loop(self):
+        threads = {}
+        app = make_app()
+
+        @app.get("/loop")
+        async def loop():
+            threads["loop"] = threading.get_ident()
+            return {}
+
+        original_stop = SamplingProfiler.stop
+
+        def stop(profiler):
+            threads["stop"] = threading.get_ident()
+            original_stop(profiler)
+
+        with patch.object(SamplingProfiler, "stop", stop):
+            response = TestClient(app).get("/loop", headers={"X-Profile": TOKEN})
+        self.assertIsNotNone(profile_store.get(response.headers["x-profile-id"]))
+        self.assertNotEqual(threads["stop"], threads["loop"])
+
+    def test_store_is_bounded(self):
+        store = ProfileStore(max_profiles=2)
+        for profile_id in ("a", "b", "c"):
+            store.add({"id": profile_id, "mode": "cpu", "stacks": {}})
+        self.assertEqual([profile["id"] for profile in store.list()], ["b", "c"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.quantile_sketch import QuantileSketch, distribution_from_quantiles, quantile_grid_levels
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.values = np.vstack([
+            rng.lognormal(0, 0.1, 20000),
+            rng.lognormal(2, 1.0, 20000),
+        ])
+
+    def test_quantiles_within_relative_accuracy(self):
+        sketch = QuantileSketch(2, relative_accuracy=0.002)
+        sketch.add(self.values)
+        levels = [0.01, 0.05, 0.5, 0.95, 0.99]
+        estimates = sketch.quantiles(levels)
+        exact = np.quantile(self.values, levels, axis=1, method="lower").T
+        np.testing.assert_allclose(estimates, exact, rtol=0.0021)
+
+    def test_merge_equals_single_pass(self):
+        single = QuantileSketch(2)
+        single.add(self.values)
+        merged = QuantileSketch(2)
+        for part in np.array_split(self.values, 5, axis=1):
+            partial = QuantileSketch(2)
+            partial.add(part)
+            merged.merge(partial)
+
+        self.assertEqual(merged.count, single.count)
+        levels = quantile_grid_levels(50)
+        np.testing.assert_array_equal(merged.quantiles(levels), single.quantiles(levels))
+
+
+class TestDistributionFromQuantiles(unittest.TestCase):
+
+    def test_var_cvar_and_probability_of_loss(self):
+        levels = quantile_grid_levels()
+        final_row = 100 * (0.5 + levels)  # Uniform final value between 50 and 150
+        grid = np.vstack([np.full_like(levels, 100.0), final_row])
+
+        distribution = distribution_from_quantiles(grid, 100, (5, 50, 95), (0.9,))
+
+        self.assertAlmostEqual(distribution["final_percentiles"][50], 100.0, places=6)
+        self.assertAlmostEqual(distribution["var"][0.9], 40.0, places=6)
+        self.assertAlmostEqual(distribution["cvar"][0.9], 45.0, places=6)
+        self.assertAlmostEqual(distribution["probability_of_loss"], 0.5)
+        self.assertEqual(len(distribution["yearly_percentiles"][5]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
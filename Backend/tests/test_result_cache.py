@@ -0,0 +1,81 @@
+import unittest
+import pytest
+import tempfile
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.result_cache import ResultCache, make_cache_key
+
+
+class TestMakeCacheKey(unittest.TestCase):
+
+    def test_key_ignores_field_order(self):
+        key_a = make_cache_key("simulate", {"duration": 3, "stocks": 50.0}, "v1")
+        key_b = make_cache_key("simulate", {"stocks": 50.0, "duration": 3}, "v1")
+        self.assertEqual(key_a, key_b)
+
+    def test_key_depends_on_namespace_payload_and_data_version(self):
+        base = make_cache_key("simulate", {"duration": 3}, "v1")
+        self.assertNotEqual(base, make_cache_key("risk-assessment", {"duration": 3}, "v1"))
+        self.assertNotEqual(base, make_cache_key("simulate", {"duration": 4}, "v1"))
+        self.assertNotEqual(base, make_cache_key("simulate", {"duration": 3}, "v2"))
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_set_and_get(self):
+        cache = ResultCache(cache_dir=None)
+        cache.set("a", {"value": 1})
+        self.assertEqual(cache.get("a"), {"value": 1})
+        self.assertIsNone(cache.get("missing"))
+
+    def test_lru_eviction_by_entry_count(self):
+        cache = ResultCache(max_entries=2, cache_dir=None)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_eviction_by_size(self):
+        cache = ResultCache(max_entries=100, max_bytes=20, cache_dir=None)
+        cache.set("a", "x" * 10)
+        cache.set("b", "y" * 10)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "y" * 10)
+        cache.set("huge", "z" * 100)  # Larger than the whole cache, never stored
+        self.assertIsNone(cache.get("huge"))
+        self.assertEqual(cache.get("b"), "y" * 10)
+
+    @pytest.mark.usefixtures("fake_clock")
+    def test_ttl_expiry(self):
+        clock = self.clock
+        cache = ResultCache(ttl_seconds=10, cache_dir=None, clock=clock)
+        cache.set("a", 1)
+        clock.now += 9
+        self.assertEqual(cache.get("a"), 1)
+        clock.now += 2
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    @pytest.mark.usefixtures("fake_clock")
+    def test_disk_backing_is_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            clock = self.clock
+            writer = ResultCache(ttl_seconds=10, cache_dir=cache_dir, clock=clock)
+            reader = ResultCache(ttl_seconds=10, cache_dir=cache_dir, clock=clock)
+            writer.set("shared", {"data": [1.0, 2.0]})
+            self.assertEqual(reader.get("shared"), {"data": [1.0, 2.0]})
+
+            clock.now += 11
+            other_reader = ResultCache(ttl_seconds=10, cache_dir=cache_dir, clock=clock)
+            self.assertIsNone(other_reader.get("shared"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,7 @@ import math # Added for math.nan
 # Ensure the Backend directory is in the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from services.risk_assessment import run_risk_assessment
+from services.risk_assessment import run_risk_assessment, run_batch_risk_assessment
 # Assuming models.monte_carlo and models.gbm_model have their own tests or are trusted.
 # We will mock their behavior for these service-level tests.
 
@@ -349,5 +349,134 @@ class TestRiskAssessmentService(unittest.TestCase):
         self.assertEqual(result_negative_roi_cap["ROI (%)"], -100.0)
 
 
+
+class TestBatchRiskAssessmentService(unittest.TestCase):
+
+    def setUp(self):
+        self.price_data = {
+            "stocks": pd.DataFrame({'Close': np.linspace(100, 130, 120)}),
+            "bonds": pd.DataFrame({'Close': np.linspace(50, 52, 120)}),
+            "real_estate": pd.DataFrame({'Close': np.linspace(80, 90, 120)}),
+            "commodities": pd.DataFrame({'Close': np.linspace(20, 21, 120)}),
+        }
+        self.requests = [
+            {"investment_amount": 10000, "duration": 2, "risk_appetite": 0.5,
+             "stocks": 60, "bonds": 40, "real_estate": 0, "commodities": 0},
+            {"investment_amount": 2500, "duration": 2, "risk_appetite": 0.5,
+             "stocks": 10, "bonds": 20, "real_estate": 30, "commodities": 40},
+            {"investment_amount": 5000, "duration": 1, "risk_appetite": 0.5,
+             "stocks": 0, "bonds": 0, "real_estate": 0, "commodities": 0},
+        ]
+
+    @patch('services.risk_assessment.load_data')
+    @patch('services.risk_assessment.get_market_trend')
+    def test_batch_matches_individual_assessments(self, mock_get_market_trend, mock_load_data):
+        print("Testing Batch Risk Assessment: matches single assessments in input order")
+        mock_get_market_trend.return_value = "bull"
+        mock_load_data.side_effect = lambda asset: self.price_data[asset].copy()
+
+        batch_results = run_batch_risk_assessment(self.requests)
+        self.assertEqual(len(batch_results), len(self.requests))
+        self.assertEqual(mock_get_market_trend.call_count, 1)
+        self.assertEqual(mock_load_data.call_count, 4)  # Once per asset class across the batch
+
+        for request, batch_result in zip(self.requests, batch_results):
+            single_result = run_risk_assessment(**request)
+            self.assertEqual(batch_result.keys(), single_result.keys())
+            if "error" in single_result:
+                self.assertEqual(batch_result, single_result)
+                continue
+            for key, value in single_result.items():
+                if isinstance(value, list):
+                    np.testing.assert_allclose(batch_result[key], value, rtol=1e-9)
+                else:
+                    self.assertAlmostEqual(batch_result[key], value, places=2)
+
+    @patch('services.risk_assessment.load_data')
+    @patch('services.risk_assessment.get_market_trend')
+    @patch('services.risk_assessment.monte_carlo_simulation')
+    @patch('services.risk_assessment.geometric_brownian_motion')
+    def test_batch_simulates_once_per_asset_and_duration(self, mock_gbm, mock_mc,
+                                                         mock_get_market_trend, mock_load_data):
+        print("Testing Batch Risk Assessment: simulations shared across the batch")
+        mock_get_market_trend.return_value = "neutral"
+        mock_load_data.side_effect = lambda asset: self.price_data[asset].copy()
+        mock_mc.return_value = (1.1, [1.0, 1.05])
+        mock_gbm.return_value = (1.2, [1.0, 1.1])
+
+        results = run_batch_risk_assessment(self.requests[:2] * 3)
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(mock_mc.call_count, 4)  # stocks, bonds, real_estate, commodities at duration 2
+        self.assertEqual(mock_gbm.call_count, 4)
+        for call in mock_mc.call_args_list:
+            self.assertEqual(call.args[0], 1.0)  # Simulated with a unit investment
+        # 60% of 10000 in stocks and 40% in bonds, both rescaled from the unit paths
+        self.assertEqual(results[0]["Total Profit"], round((1.1 + 1.2) / 2 * 10000, 2))
+
+
+    @patch('services.risk_assessment.load_data')
+    @patch('services.risk_assessment.get_market_trend')
+    def test_distribution_fields_are_optional_and_consistent(self, mock_get_market_trend, mock_load_data):
+        print("Testing Risk Assessment: percentile bands, VaR/CVaR and probability of loss")
+        mock_get_market_trend.return_value = "neutral"
+        mock_load_data.side_effect = lambda asset: self.price_data[asset].copy()
+        request = dict(self.requests[1], duration=3)
+
+        plain = run_risk_assessment(**request)
+        self.assertNotIn("Value at Risk", plain)
+
+        result = run_risk_assessment(**request, include_distribution=True, var_levels=[0.9, 0.99])
+        bands = result["Yearly Percentile Bands"]
+        self.assertEqual(list(bands), ["P5", "P25", "P50", "P75", "P95"])
+        for year in range(3):
+            yearly = [bands[key][year] for key in bands]
+            self.assertEqual(yearly, sorted(yearly))
+        self.assertEqual(list(result["Value at Risk"]), ["90%", "99%"])
+        self.assertGreaterEqual(result["Value at Risk"]["99%"], result["Value at Risk"]["90%"])
+        self.assertGreaterEqual(result["Conditional Value at Risk"]["90%"], result["Value at Risk"]["90%"])
+        self.assertTrue(0 <= result["Probability of Loss (%)"] <= 100)
+
+        batch_result = run_batch_risk_assessment([dict(request, include_distribution=True, var_levels=[0.9, 0.99])])[0]
+        self.assertEqual(batch_result["Value at Risk"].keys(), result["Value at Risk"].keys())
+        for key, value in result["Value at Risk"].items():
+            # Quantiles are sketched to 0.2% relative accuracy on unit vs. scaled values
+            self.assertAlmostEqual(batch_result["Value at Risk"][key], value, delta=0.005 * request["investment_amount"])
+
+    @patch('services.risk_assessment.load_data')
+    @patch('services.risk_assessment.get_market_trend')
+    def test_simulated_drawdown_is_optional_and_engine_independent(self, mock_get_market_trend, mock_load_data):
+        print("Testing Risk Assessment: simulated maximum drawdown")
+        mock_get_market_trend.return_value = "neutral"
+        mock_load_data.side_effect = lambda asset: self.price_data[asset].copy()
+        request = self.requests[1]
+
+        self.assertNotIn("Simulated Max Drawdown (%)", run_risk_assessment(**request))
+
+        result = run_risk_assessment(**request, include_drawdown=True)
+        self.assertTrue(0 <= result["Simulated Max Drawdown (%)"] <= result["Simulated Max Drawdown P95 (%)"] <= 100)
+        # The analytic engine falls back to sampling for the drawdown, using the same paths
+        analytic = run_risk_assessment(**request, engine="analytic", include_drawdown=True)
+        self.assertEqual(analytic["Simulated Max Drawdown (%)"], result["Simulated Max Drawdown (%)"])
+
+        batch_result = run_batch_risk_assessment([dict(request, include_drawdown=True)])[0]
+        self.assertEqual(batch_result["Simulated Max Drawdown (%)"], result["Simulated Max Drawdown (%)"])
+        self.assertEqual(batch_result["Simulated Max Drawdown P95 (%)"], result["Simulated Max Drawdown P95 (%)"])
+
+    @patch('services.risk_assessment.simulated_drawdown')
+    @patch('services.risk_assessment.load_data')
+    @patch('services.risk_assessment.get_market_trend')
+    def test_analytic_drawdown_shares_the_deadline(self, mock_get_market_trend, mock_load_data, mock_drawdown):
+        mock_get_market_trend.return_value = "neutral"
+        mock_load_data.side_effect = lambda asset: self.price_data[asset].copy()
+        mock_drawdown.return_value = {"expected": 0.1, "percentiles": {95: 0.2}}
+        request = dict(self.requests[1], engine="analytic", include_drawdown=True, mc_options={"deadline_ms": 400})
+
+        run_risk_assessment(**request)
+        run_batch_risk_assessment([request])
+        deadlines = [call.kwargs["deadline_ms"] for call in mock_drawdown.call_args_list]
+        self.assertEqual(deadlines, [100] * 8)  # Four asset classes, for both the single and batch runs
+
+
 if __name__ == '__main__':
     unittest.main()
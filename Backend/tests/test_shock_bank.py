@@ -0,0 +1,69 @@
+import unittest
+import tempfile
+import shutil
+import numpy as np
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.shock_bank import ShockBank, draw_standard_normal
+from models import monte_carlo
+from models.monte_carlo import monte_carlo_summary
+
+
+class TestShockBank(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.bank = ShockBank(directory=self.directory, max_steps=5 * 252)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_bank_holds_the_seeded_stream(self):
+        shocks = self.bank.get(42, 50, 504)
+        np.testing.assert_array_equal(shocks[:504], np.random.RandomState(42).standard_normal((504, 50)))
+        float32_shocks = self.bank.get(42, 50, 504, np.float32)
+        self.assertEqual(float32_shocks.dtype, np.float32)
+        np.testing.assert_array_equal(float32_shocks[:504], np.random.default_rng(42).standard_normal((504, 50), dtype=np.float32))
+        self.assertFalse(shocks.flags.writeable)
+
+    def test_bank_is_shared_through_files(self):
+        first = self.bank.get(7, 20, 252)
+        other_worker = ShockBank(directory=self.directory, max_steps=5 * 252)
+        np.testing.assert_array_equal(other_worker.get(7, 20, 252), first)
+        self.assertEqual(len([name for name in os.listdir(self.directory) if name.endswith(".npy")]), 1)
+
+    def test_longer_horizons_extend_the_bank(self):
+        self.bank.get(1, 10, 252)
+        longer = self.bank.get(1, 10, 3 * 252)
+        self.assertGreaterEqual(longer.shape[0], 3 * 252)
+        np.testing.assert_array_equal(longer, draw_standard_normal(1, longer.shape))
+        self.assertEqual(self.bank.get(1, 10, 504).shape, longer.shape)  # Shorter horizons reuse it
+
+    def test_unavailable_bank_returns_none(self):
+        self.assertIsNone(self.bank.get(42, 10, 6 * 252))  # Beyond max_steps
+        self.assertIsNone(self.bank.get(None, 10, 252))
+        self.assertIsNone(ShockBank(directory=self.directory, enabled=False).get(42, 10, 252))
+
+    def test_simulations_match_live_draws(self):
+        original_bank = monte_carlo.shock_bank
+        try:
+            monte_carlo.shock_bank = ShockBank(directory=self.directory, enabled=False)
+            live = [monte_carlo_summary(10000, 0.08, 0.25, 2, iterations=1000, variance_reduction=method)
+                    for method in ("none", "antithetic", "control_variate")]
+            monte_carlo.shock_bank = self.bank
+            banked = [monte_carlo_summary(10000, 0.08, 0.25, 2, iterations=1000, variance_reduction=method)
+                      for method in ("none", "antithetic", "control_variate")]
+        finally:
+            monte_carlo.shock_bank = original_bank
+        for live_summary, banked_summary in zip(live, banked):
+            self.assertEqual(banked_summary["final_value"], live_summary["final_value"])
+            np.testing.assert_array_equal(banked_summary["yearly_values"], live_summary["yearly_values"])
+        self.assertEqual(len(os.listdir(self.directory)), 2)  # 1000 paths, and 500 for antithetic pairs
+
+
+if __name__ == '__main__':
+    unittest.main()
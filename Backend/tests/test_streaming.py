@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import numpy as np
+import json
+import sys
+import os
+
+# Ensure the Backend directory is in the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from routes.simulate import router as simulate_router
+from utils.event_stream import format_event, sse_stream
+from utils.result_cache import result_cache
+
+app = FastAPI()
+app.include_router(simulate_router, prefix="/simulate")
+
+
+def parse_events(body):
+    """Splits a server-sent event stream into (event name, data dict) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestEventStream(unittest.TestCase):
+
+    def test_format_event_encodes_numpy_values(self):
+        encoded = format_event({"event": "estimate", "final_value": np.float32(1.5), "yearly_values": np.arange(2)})
+        self.assertEqual(encoded, 'event: estimate\ndata: {"final_value": 1.5, "yearly_values": [0, 1]}\n\n')
+
+    def test_failure_ends_stream_with_error_event(self):
+        def events():
+            yield {"event": "asset", "progress": 0.5}
+            raise ValueError("boom")
+
+        self.assertEqual(parse_events("".join(sse_stream(events()))),
+                         [("asset", {"progress": 0.5}), ("error", {"detail": "boom"})])
+
+    def test_closing_the_stream_closes_the_events(self):
+        closed = []
+
+        def events():
+            try:
+                while True:
+                    yield {"event": "estimate"}
+            finally:
+                closed.append(True)
+
+        stream = sse_stream(events())
+        next(stream)
+        stream.close()
+        self.assertEqual(closed, [True])
+
+
+class TestSimulateStreamAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+        result_cache.clear()
+        self.request = {
+            "investment_amount": 10000, "duration": 5, "risk_appetite": 0.5,
+            "market_condition": "neutral", "stocks": 40, "bonds": 30,
+            "real_estate": 20, "commodities": 10,
+        }
+
+    @patch("routes.simulate.iter_simulation")
+    def test_streams_events_and_caches_result(self, mock_iter_simulation):
+        mock_iter_simulation.return_value = iter([
+            {"event": "estimate", "asset": "stocks", "paths": 2000, "final_value": 4100.0, "standard_error": 12.0},
+            {"event": "asset", "asset": "stocks", "progress": 0.25, "yearly_values": [4000.0, 4100.0]},
+            {"event": "result", "data": {"Final Total Portfolio Value": 12345.0}},
+        ])
+
+        response = self.client.post("/simulate/stream", json=self.request)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        events = parse_events(response.text)
+        self.assertEqual([name for name, _ in events], ["estimate", "asset", "result"])
+        self.assertEqual(events[-1][1], {"data": {"Final Total Portfolio Value": 12345.0}})
+
+        # The streamed result is cached for both the streaming and the plain endpoint
+        repeat = self.client.post("/simulate/stream", json=self.request)
+        self.assertEqual(repeat.headers["X-Cache"], "HIT")
+        self.assertEqual(parse_events(repeat.text), [("result", {"data": {"Final Total Portfolio Value": 12345.0}})])
+        self.assertEqual(self.client.post("/simulate/", json=self.request).headers["X-Cache"], "HIT")
+        mock_iter_simulation.assert_called_once()
+
+    def test_invalid_request_is_rejected_before_streaming(self):
+        self.request["bonds"] = 90
+        response = self.client.post("/simulate/stream", json=self.request)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import asyncio
+from starlette.concurrency import run_in_threadpool
+from models.cancellation import CancellationToken
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Hard limit on a simulation or optimization request, 0 disables it
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "120"))
+DISCONNECT_POLL_SECONDS = 0.1  # How often a running request checks whether its client is still there
+
+
+def request_token(timeout_seconds=REQUEST_TIMEOUT_SECONDS):
+    """Cancellation token for one request, expiring after the request timeout."""
+    return CancellationToken(timeout_seconds or None)
+
+
+async def run_cancellable(http_request, work, cancel_token):
+    """
+    Runs work (a blocking callable using cancel_token) in the thread pool, so the event
+    loop stays free, and cancels the token when the client disconnects or the request
+    task is cancelled. The engines then stop at their next check and work raises
+    SimulationCancelled.
+    """
+    return await _wait_cancellable(http_request, asyncio.ensure_future(run_in_threadpool(work)), cancel_token)
+
+
+async def stream_cancellable(http_request, stream, cancel_token):
+    """
+    Async version of a blocking stream (e.g. utils.event_stream.sse_stream), pulling each
+    chunk in the thread pool like run_cancellable. A client that disconnects while a chunk
+    is being computed, or a response closed mid-stream, cancels the token, so the engines
+    behind the stream stop instead of running to completion for nobody.
+    """
+    end = object()
+    try:
+        while True:
+            chunk = await _wait_cancellable(
+                http_request, asyncio.ensure_future(run_in_threadpool(next, stream, end)), cancel_token)
+            if chunk is end:
+                return
+            yield chunk
+    except GeneratorExit:
+        cancel_token.cancel("client disconnected")
+        stream.close()  # No chunk is being computed while suspended at yield
+        raise
+
+
+async def _wait_cancellable(http_request, task, cancel_token):
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if not cancel_token.cancelled and await http_request.is_disconnected():
+                logger.info("ℹ️ Client disconnected, cancelling its simulation")
+                cancel_token.cancel("client disconnected")
+    except asyncio.CancelledError:
+        cancel_token.cancel("request cancelled")
+        raise
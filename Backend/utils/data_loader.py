@@ -1,12 +1,25 @@
 import os
+import time
+import hashlib
 import pandas as pd
 import yfinance as yf
 from datetime import datetime, timedelta
+from utils.log import get_logger
+from utils.metrics import DATA_LOAD_SECONDS, CACHE_REQUESTS, YFINANCE_FETCHES
+
+logger = get_logger(__name__)
 
 # Get the absolute path of the Backend directory
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")  # Ensure this points to the correct folder
 
+# Bundled histories of the non-stock asset classes
+BUNDLED_ASSET_FILES = {
+    "bonds": os.path.join(DATA_DIR, "bond_data_5y - Copy.csv"),
+    "real_estate": os.path.join(DATA_DIR, "real_estate_data_5y - Copy.csv"),
+    "commodities": os.path.join(DATA_DIR, "commodity_data_5y - Copy.csv")
+}
+
 # In-memory cache for stock data
 stock_data_cache = {}
 
@@ -17,34 +30,34 @@ def load_data(asset_type):
     For individual stock tickers (e.g., "AAPL"), data is fetched using yfinance
     and cached in memory for the current day.
     """
+    started = time.perf_counter()
     
-    # Define paths for non-stock asset types
-    other_asset_file_paths = {
-        "bonds": os.path.join(DATA_DIR, "bond_data_5y - Copy.csv"),
-        "real_estate": os.path.join(DATA_DIR, "real_estate_data_5y - Copy.csv"),
-        "commodities": os.path.join(DATA_DIR, "commodity_data_5y - Copy.csv")
-    }
-
-    if asset_type in other_asset_file_paths:
-        file_path = other_asset_file_paths[asset_type]
+    if asset_type in BUNDLED_ASSET_FILES:
+        file_path = BUNDLED_ASSET_FILES[asset_type]
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"❌ Data file not found: {file_path}")
-        print(f"📂 Loading data from: {file_path}")
-        return pd.read_csv(file_path)
+        logger.debug("📂 Loading data from: %s", file_path)
+        data = pd.read_csv(file_path)
+        DATA_LOAD_SECONDS.observe(time.perf_counter() - started, source="csv")
+        return data
 
     # Handle "stocks" asset type specifically for ^GSPC data
     elif asset_type == "stocks":
         ticker_symbol = "^GSPC" # Use ^GSPC as the general stock market representation
-        print(f"ℹ️ Asset type 'stocks' requested, fetching data for {ticker_symbol}")
+        logger.debug("ℹ️ Asset type 'stocks' requested, fetching data for %s", ticker_symbol)
         # Check cache first for ^GSPC
         if ticker_symbol in stock_data_cache:
             cached_data, fetch_date = stock_data_cache[ticker_symbol]
             if fetch_date == datetime.today().date():
-                print(f"✅ Using cached data for {ticker_symbol} (representing 'stocks')")
-                return cached_data.copy()
+                logger.debug("✅ Using cached data for %s (representing 'stocks')", ticker_symbol)
+                CACHE_REQUESTS.inc(cache="market_data", result="hit")
+                data = cached_data.copy()
+                DATA_LOAD_SECONDS.observe(time.perf_counter() - started, source="cache")
+                return data
         
         # If not in cache or stale, fetch ^GSPC from yfinance
-        print(f"⬇️ Fetching data for {ticker_symbol} (representing 'stocks') from yfinance...")
+        logger.info("⬇️ Fetching data for %s (representing 'stocks') from yfinance...", ticker_symbol)
+        CACHE_REQUESTS.inc(cache="market_data", result="miss")
         try:
             ticker_obj = yf.Ticker(ticker_symbol)
             data = ticker_obj.history(period="5y")
@@ -54,8 +67,11 @@ def load_data(asset_type):
                 raise ValueError(f"❌ 'Close' price not available for {ticker_symbol} (representing 'stocks')")
             data['Ticker'] = ticker_symbol # Add Ticker column for consistency, though it's ^GSPC
             stock_data_cache[ticker_symbol] = (data.copy(), datetime.today().date())
+            YFINANCE_FETCHES.inc(outcome="success")
+            DATA_LOAD_SECONDS.observe(time.perf_counter() - started, source="yfinance")
             return data
         except Exception as e:
+            YFINANCE_FETCHES.inc(outcome="error")
             raise ValueError(f"❌ Error fetching data for {ticker_symbol} (representing 'stocks') from yfinance: {e}")
 
     # Handle individual stock tickers using yfinance and caching
@@ -65,12 +81,16 @@ def load_data(asset_type):
             cached_data, fetch_date = stock_data_cache[asset_type]
             # Check if cache is from today
             if fetch_date == datetime.today().date():
-                print(f"✅ Using cached data for {asset_type}")
+                logger.debug("✅ Using cached data for %s", asset_type)
                 # Return a copy to prevent modification of cached DataFrame
-                return cached_data.copy()
+                CACHE_REQUESTS.inc(cache="market_data", result="hit")
+                data = cached_data.copy()
+                DATA_LOAD_SECONDS.observe(time.perf_counter() - started, source="cache")
+                return data
 
         # If not in cache or stale, fetch from yfinance
-        print(f"⬇️ Fetching data for {asset_type} from yfinance...")
+        logger.info("⬇️ Fetching data for %s from yfinance...", asset_type)
+        CACHE_REQUESTS.inc(cache="market_data", result="miss")
         try:
             ticker_obj = yf.Ticker(asset_type)
             # Fetch 5 years of historical data
@@ -88,13 +108,32 @@ def load_data(asset_type):
             
             # Cache the fetched data with the current date
             stock_data_cache[asset_type] = (data.copy(), datetime.today().date()) # Store a copy
+            YFINANCE_FETCHES.inc(outcome="success")
+            DATA_LOAD_SECONDS.observe(time.perf_counter() - started, source="yfinance")
             
             return data # Return the original fetched data, not the copy from cache at this point
         except Exception as e:
             # Broad exception for yfinance issues (e.g., network, invalid ticker)
+            YFINANCE_FETCHES.inc(outcome="error")
             raise ValueError(f"❌ Error fetching data for {asset_type} from yfinance: {e}")
 
 
+def get_data_version() -> str:
+    """
+    Returns a short identifier for the market data currently served by load_data.
+
+    It changes whenever a bundled CSV file is modified or the day rolls over (the
+    yfinance cache is refreshed daily), so results computed from older data are
+    never mistaken for current ones.
+    """
+    parts = [datetime.today().date().isoformat()]
+    for file_name in sorted(os.listdir(DATA_DIR)) if os.path.isdir(DATA_DIR) else []:
+        if file_name.endswith(".csv"):
+            stat = os.stat(os.path.join(DATA_DIR, file_name))
+            parts.append(f"{file_name}:{stat.st_mtime_ns}:{stat.st_size}")
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
 def get_top_50_stock_tickers() -> list[str]:
     """
     Returns a fixed list of 50 well-known stock tickers.
@@ -0,0 +1,46 @@
+import json
+import numpy as np
+from utils.log import get_logger
+from utils.metrics import timed
+
+logger = get_logger(__name__)
+
+
+def _json_default(value):
+    # Simulation outputs may still hold NumPy scalars or arrays
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@timed("serialization")
+def format_event(event):
+    """
+    Encodes an event dict as a server-sent event: its "event" key becomes the SSE event
+    name and the remaining fields the JSON data line.
+    """
+    fields = {key: value for key, value in event.items() if key != "event"}
+    return f"event: {event['event']}\ndata: {json.dumps(fields, default=_json_default)}\n\n"
+
+
+def sse_stream(events, on_result=None):
+    """
+    Relays an iterator of simulation events (see services.simulation_.iter_simulation) as
+    server-sent events. on_result is called with the data of the "result" event before it
+    is sent, e.g. to cache it. An exception raised while iterating ends the stream with
+    an "error" event, as the response status has already been sent.
+    """
+    try:
+        for event in events:
+            if event["event"] == "result" and on_result:
+                on_result(event["data"])
+            yield format_event(event)
+    except Exception as e:
+        logger.exception("❌ Event stream failed: %s", e)
+        yield format_event({"event": "error", "detail": str(e)})
+    finally:
+        close = getattr(events, "close", None)
+        if close:
+            close()  # Stops the simulation if the client went away mid-stream
@@ -0,0 +1,141 @@
+import os
+import time
+import asyncio
+from datetime import datetime
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from utils.data_loader import load_data, stock_data_cache, BUNDLED_ASSET_FILES
+from utils.log import get_logger
+from services.risk_assessment import MIN_RETURNS_DATA_POINTS
+
+logger = get_logger(__name__)
+
+# Background readiness probing, overridable per deployment
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "5"))
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "3"))  # Per check
+
+MARKET_TICKER = "^GSPC"
+
+# Signature (mtime, size) of each bundled file when its return statistics were last verified
+_verified_statistics = {}
+
+
+class ReadinessProber:
+    """
+    Runs named readiness checks in a background task and caches their outcome.
+
+    A check is an async callable that returns when the dependency is usable and raises
+    otherwise. Readiness probes read the cached outcome through snapshot(), so however
+    often the load balancer polls, each dependency is checked once per interval. Checks
+    registered with gating=False are reported under "info" without affecting readiness,
+    for dependencies the app degrades gracefully without.
+    """
+
+    def __init__(self, interval_seconds=HEALTH_PROBE_INTERVAL_SECONDS, timeout_seconds=HEALTH_PROBE_TIMEOUT_SECONDS,
+                 clock=time.time):
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.clock = clock
+        self._checks = {}
+        self._results = {}
+        self._informational = set()
+        self._task = None
+
+    def register(self, name, check, gating=True):
+        self._checks[name] = check
+        self._results[name] = {"ok": False, "checked_at": None, "error": "not checked yet"}
+        if not gating:
+            self._informational.add(name)
+
+    async def probe_once(self):
+        """Runs every check once, concurrently, and records the outcomes."""
+        async def run(name, check):
+            try:
+                await asyncio.wait_for(check(), self.timeout_seconds)
+                self._results[name] = {"ok": True, "checked_at": self.clock(), "error": None}
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                if self._results[name]["ok"]:
+                    logger.warning("⚠️ Readiness check '%s' failing: %s", name, error)
+                self._results[name] = {"ok": False, "checked_at": self.clock(), "error": error}
+
+        await asyncio.gather(*(run(name, check) for name, check in self._checks.items()))
+
+    def snapshot(self):
+        """Cached readiness: ready only when every gating check last passed."""
+        checks = {name: dict(result) for name, result in self._results.items() if name not in self._informational}
+        info = {name: dict(result) for name, result in self._results.items() if name in self._informational}
+        return {"ready": all(result["ok"] for result in checks.values()), "checks": checks, "info": info}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval_seconds)
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+async def check_data_store():
+    """The bundled asset CSV files are present and not empty; a stat per file, nothing is parsed."""
+    for asset, path in BUNDLED_ASSET_FILES.items():
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"❌ Data file not found: {path}")
+        if os.path.getsize(path) == 0:
+            raise ValueError(f"❌ No rows in {asset} data")
+
+
+async def check_statistics():
+    """
+    The return statistics the services derive from every bundled asset class are usable
+    for the current files. A file is parsed again only when its modification time or
+    size changes, so once warm a probe costs a stat per file.
+    """
+    stale = {}
+    for asset, path in BUNDLED_ASSET_FILES.items():
+        signature = _file_signature(path)
+        if _verified_statistics.get(asset) != signature:
+            stale[asset] = signature
+    if stale:
+        await run_in_threadpool(_verify_statistics, stale)
+
+
+def _verify_statistics(signatures):
+    for asset, signature in signatures.items():
+        returns = load_data(asset)["Close"].pct_change().dropna()
+        if len(returns) < MIN_RETURNS_DATA_POINTS or not np.isfinite([returns.mean(), returns.std()]).all():
+            raise ValueError(f"❌ Not enough usable {asset} history for return statistics")
+        _verified_statistics[asset] = signature
+
+
+async def check_market_data():
+    """
+    Today's market index history is cached, fetching it on the prober's thread when it is
+    not. Informational only: without it the services fall back to a neutral market trend.
+    """
+    cached = stock_data_cache.get(MARKET_TICKER)
+    if cached is not None and cached[1] == datetime.today().date():
+        return
+    await run_in_threadpool(load_data, "stocks")
+
+
+# Shared prober behind /readyz
+readiness_prober = ReadinessProber()
+readiness_prober.register("data_store", check_data_store)
+readiness_prober.register("statistics", check_statistics)
+readiness_prober.register("market_data", check_market_data, gating=False)  # yfinance outages must not drain traffic
@@ -0,0 +1,166 @@
+import os
+import time
+import uuid
+import queue
+import threading
+from collections import OrderedDict
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Job queue configuration, overridable per deployment
+DEFAULT_JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+DEFAULT_JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "64"))  # Jobs waiting for a worker
+DEFAULT_JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "3600"))  # How long finished jobs are kept
+DEFAULT_MAX_JOBS = int(os.getenv("JOB_MAX_STORED", "1000"))
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """A unit of background work and its outcome."""
+
+    def __init__(self, job_id, kind, key, fn, created_at):
+        self.id = job_id
+        self.kind = kind
+        self.key = key
+        self.fn = fn
+        self.status = "queued"
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.created_at = created_at
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self):
+        """Status fields exposed by the API (the result is served separately)."""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Runs submitted jobs on a pool of worker threads fed by a bounded queue.
+
+    A job is a callable taking a progress callback (fraction done, 0 to 1) and returning a
+    JSON-serializable result. Jobs are deduplicated by key: submitting work whose key
+    matches a queued, running or successfully finished job returns that job instead of
+    queuing a new one. Finished jobs are kept for ttl_seconds (and at most max_jobs of
+    them), after which their status and result are no longer available.
+    """
+
+    def __init__(self, workers=DEFAULT_JOB_WORKERS, max_queued=DEFAULT_JOB_QUEUE_SIZE,
+                 ttl_seconds=DEFAULT_JOB_TTL_SECONDS, max_jobs=DEFAULT_MAX_JOBS, clock=time.time):
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self.clock = clock
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = OrderedDict()  # job id -> Job, in submission order
+        self._by_key = {}  # dedup key -> job id
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, kind, key, fn):
+        """
+        Queues fn unless an equivalent job exists.
+
+        Returns:
+            tuple: (Job, created) where created is False when an existing job was reused.
+
+        Raises:
+            JobQueueFull: The queue already holds max_queued jobs.
+        """
+        with self._lock:
+            self._purge()
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing is not None and existing.status != "failed":
+                return existing, False
+
+            job = Job(uuid.uuid4().hex, kind, key, fn, self.clock())
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} jobs waiting).")
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            self._start_workers()
+            return job, True
+
+    def get(self, job_id):
+        """Returns the job, or None if it is unknown or has expired."""
+        with self._lock:
+            self._purge()
+            return self._jobs.get(job_id)
+
+    def queued(self):
+        return self._queue.qsize()
+
+    def _start_workers(self):
+        # Threads are started on first use so importing the module has no side effects
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"job-worker-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                job.status = "running"
+                job.started_at = self.clock()
+            try:
+                result = job.fn(lambda fraction: self._set_progress(job, fraction))
+            except Exception as e:
+                logger.exception("❌ Job %s (%s) failed: %s", job.id, job.kind, e)
+                with self._lock:
+                    job.status, job.error = "failed", str(e)
+                    job.finished_at = self.clock()
+            else:
+                with self._lock:
+                    job.status, job.result, job.progress = "succeeded", result, 1.0
+                    job.finished_at = self.clock()
+            finally:
+                job.fn = None  # Release the request captured by the closure
+                self._queue.task_done()
+
+    def _set_progress(self, job, fraction):
+        with self._lock:
+            job.progress = min(max(float(fraction), job.progress), 1.0)  # Never moves backwards
+
+    def _purge(self):
+        now = self.clock()
+        finished = [job for job in self._jobs.values() if job.finished]
+        expired = {job.id for job in finished if job.finished_at + self.ttl_seconds <= now}
+        overflow = len(self._jobs) - len(expired) - self.max_jobs
+        for job in finished:
+            if overflow <= 0:
+                break
+            if job.id not in expired:
+                expired.add(job.id)  # Oldest finished jobs first
+                overflow -= 1
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+
+
+# Shared manager used by the job routes
+job_manager = JobManager()
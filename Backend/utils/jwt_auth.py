@@ -0,0 +1,125 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import jwt
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+# Load .env variables
+load_dotenv()
+SECRET_KEY = os.getenv("JWT_SECRET", "your_secret_key")
+ALGORITHM = "HS256"
+
+# Verification settings, overridable per deployment
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_MAX_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_MAX_TTL_SECONDS", "3600"))  # For tokens without exp
+REQUIRE_AUTH = os.getenv("REQUIRE_AUTH", "false").lower() in ("1", "true", "yes")  # Guard the simulation routes
+
+
+class AuthenticatedUser:
+    """Identity of the caller, taken from the verified token's claims."""
+
+    def __init__(self, claims):
+        self.email = claims.get("sub")
+        self.claims = claims
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of decoded token claims, keyed by the SHA-256 of the token so raw
+    tokens are not kept in memory. Entries expire with the token's exp claim.
+    """
+
+    def __init__(self, max_entries=TOKEN_CACHE_SIZE, max_ttl_seconds=TOKEN_CACHE_MAX_TTL_SECONDS, clock=time.time):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self.clock = clock
+        self._entries = OrderedDict()  # token hash -> (expires_at, claims)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token):
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, claims = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def set(self, token, claims):
+        expires_at = self.clock() + self.max_ttl_seconds
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared cache used by the auth dependencies
+token_cache = TokenCache()
+
+
+def create_token(email, expires_in_seconds=3600):
+    """Issues an HS256 token for email, valid for expires_in_seconds."""
+    return jwt.encode({"sub": email, "exp": int(time.time() + expires_in_seconds)}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def verify_token(token):
+    """
+    Returns the claims of a valid token, from the cache when it was verified before.
+    Verification is purely cryptographic (signature and exp), no database lookup.
+
+    Raises:
+        HTTPException: 401 when the token is invalid or expired.
+    """
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired", headers={"WWW-Authenticate": "Bearer"})
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token", headers={"WWW-Authenticate": "Bearer"})
+    if not claims.get("sub"):
+        raise HTTPException(status_code=401, detail="Invalid token", headers={"WWW-Authenticate": "Bearer"})
+    token_cache.set(token, claims)
+    return claims
+
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
+    """FastAPI dependency: the authenticated caller, or 401 without a valid bearer token."""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return AuthenticatedUser(verify_token(credentials.credentials))
+
+
+async def auth_guard(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
+    """
+    Router-level dependency for the simulation routes: enforces a valid bearer token when
+    REQUIRE_AUTH is set, and lets every request through otherwise.
+    """
+    if REQUIRE_AUTH:
+        return await get_current_user(credentials)
+    return None
@@ -0,0 +1,149 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import contextvars
+from logging.handlers import QueueHandler, QueueListener
+
+# Logging configuration, overridable per deployment
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" for log shippers, "text" for a terminal
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))  # Share of requests whose debug output is kept
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # Records waiting for the writer thread
+
+ROOT_LOGGER = "portfolio_pilot"
+
+# Attributes every LogRecord has; anything else was passed through extra= and is a structured field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+# Whether debug output is kept for the current request, None outside a request
+_debug_sampled = contextvars.ContextVar("debug_sampled", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the record's extra fields."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with the extra fields appended as key=value pairs."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = " ".join(f"{key}={value}" for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        return f"{line} {fields}" if fields else line
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keeps debug records for a sampled share of requests (all of a request's debug
+    output or none of it) and passes every record at INFO and above.
+    """
+
+    def __init__(self, rate=LOG_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        sampled = _debug_sampled.get()
+        return random.random() < self.rate if sampled is None else sampled
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueues records as they are, without formatting them: the listener thread does the
+    message interpolation, serialization and the write, so the request thread only pays
+    for a queue put. When the queue is full the record is dropped rather than blocking.
+    """
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+_listener = None
+
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, sample_rate=LOG_DEBUG_SAMPLE_RATE, stream=None):
+    """
+    Routes the application's loggers through a bounded queue to a single writer thread.
+    Calling it again replaces the previous configuration.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    handler = DeferredQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    handler.addFilter(DebugSampler(sample_rate))
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.handlers[:] = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+    _listener = QueueListener(handler.queue, output)
+    _listener.start()
+    return _listener
+
+
+def flush_logging():
+    """Writes out every queued record (the writer thread is restarted afterwards)."""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def get_logger(name):
+    """Logger for a module, under the application's logger."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def sample_debug(sampled=None):
+    """Decides (or sets) whether the current request keeps its debug output."""
+    if sampled is None:
+        sampled = random.random() < LOG_DEBUG_SAMPLE_RATE
+    return _debug_sampled.set(sampled)
+
+
+class DebugSamplingMiddleware:
+    """ASGI middleware making the debug sampling decision once per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        reset = sample_debug()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _debug_sampled.reset(reset)
+
+
+configure_logging()
+atexit.register(lambda: _listener.stop())
@@ -1,6 +1,11 @@
 import pandas as pd
 from .data_loader import load_data
+from .log import get_logger
+from .metrics import timed
 
+logger = get_logger(__name__)
+
+@timed("market_trend")
 def get_market_trend(ticker: str = '^GSPC', short_window: int = 50, long_window: int = 200) -> str:
     """
     Determines the market trend based on short-term and long-term moving averages.
@@ -17,11 +22,11 @@ def get_market_trend(ticker: str = '^GSPC', short_window: int = 50, long_window:
         data = load_data(ticker)
 
         if 'Close' not in data.columns:
-            print(f"⚠️ Warning: 'Close' column not found for ticker {ticker}. Returning 'neutral' trend.")
+            logger.warning("⚠️ 'Close' column not found for ticker %s. Returning 'neutral' trend.", ticker)
             return "neutral"
 
         if len(data) < long_window:
-            print(f"⚠️ Warning: Insufficient data for {ticker} to calculate {long_window}-day MA (got {len(data)} days). Returning 'neutral' trend.")
+            logger.warning("⚠️ Insufficient data for %s to calculate %d-day MA (got %d days). Returning 'neutral' trend.", ticker, long_window, len(data))
             return "neutral"
 
         # Calculate short-term moving average (SMA)
@@ -35,7 +40,7 @@ def get_market_trend(ticker: str = '^GSPC', short_window: int = 50, long_window:
         latest_lma = data['LMA'].iloc[-1]
 
         if pd.isna(latest_sma) or pd.isna(latest_lma):
-            print(f"⚠️ Warning: Could not calculate moving averages for {ticker} (possibly due to insufficient recent data after rolling mean). Returning 'neutral' trend.")
+            logger.warning("⚠️ Could not calculate moving averages for %s (possibly due to insufficient recent data after rolling mean). Returning 'neutral' trend.", ticker)
             return "neutral"
 
         if latest_sma > latest_lma:
@@ -44,13 +49,13 @@ def get_market_trend(ticker: str = '^GSPC', short_window: int = 50, long_window:
             return "bear"
             
     except FileNotFoundError:
-        print(f"⚠️ Warning: Data file not found for ticker {ticker} in load_data. Returning 'neutral' trend.")
+        logger.warning("⚠️ Data file not found for ticker %s in load_data. Returning 'neutral' trend.", ticker)
         return "neutral"
     except ValueError as ve: # Catching specific errors from load_data or data checks
-        print(f"⚠️ Warning: ValueError encountered for ticker {ticker}: {ve}. Returning 'neutral' trend.")
+        logger.warning("⚠️ ValueError encountered for ticker %s: %s. Returning 'neutral' trend.", ticker, ve)
         return "neutral"
     except Exception as e:
-        print(f"❌ Error determining market trend for {ticker}: {e}. Returning 'neutral' trend.")
+        logger.exception("❌ Error determining market trend for %s: %s. Returning 'neutral' trend.", ticker, e)
         return "neutral"
 
 if __name__ == '__main__':
@@ -0,0 +1,245 @@
+import time
+import types
+import bisect
+import threading
+import functools
+from contextlib import contextmanager
+from fastapi.responses import JSONResponse
+
+# Latency buckets in seconds, from cache lookups up to long optimizations
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class _Metric:
+    """
+    Base for metrics aggregated per thread: each thread updates its own shard without
+    taking a lock, and a scrape sums the shards. Shards outlive their threads, so
+    totals never go down.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()  # Only taken when a thread records its first value
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.label_names, key)) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def _merged(self, merge, initial):
+        with self._shards_lock:
+            shards = list(self._shards)
+        totals = {}
+        for shard in shards:
+            for key, value in list(shard.items()):
+                totals[key] = merge(totals.get(key, initial()), value)
+        return totals
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._merged(lambda total, value: total + value, int).get(self._key(labels), 0)
+
+    def _samples(self):
+        for key, value in sorted(self._merged(lambda total, value: total + value, int).items()):
+            yield f"{self.name}{self._label_text(key)} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        cell = shard.get(key)
+        if cell is None:
+            # Per-bucket counts (the last one is +Inf), then the sum of observations
+            cell = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        cell = self._merged(self._merge_cells, self._empty_cell).get(self._key(labels))
+        return sum(cell[:-1]) if cell else 0
+
+    def _empty_cell(self):
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    @staticmethod
+    def _merge_cells(total, cell):
+        return [a + b for a, b in zip(total, cell)]
+
+    def _samples(self):
+        for key, cell in sorted(self._merged(self._merge_cells, self._empty_cell).items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), cell[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket{self._label_text(key, [('le', str(bound))])} {cumulative}"
+            yield f"{self.name}_sum{self._label_text(key)} {cell[-1]}"
+            yield f"{self.name}_count{self._label_text(key)} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def counter(self, name, documentation, label_names=()):
+        return self._register(Counter(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"❌ Metric '{metric.name}' is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+# Shared registry exposed at /metrics
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "portfolio_pilot_stage_seconds", "Time spent in each stage of request handling.", ("stage",))
+DATA_LOAD_SECONDS = registry.histogram(
+    "portfolio_pilot_data_load_seconds", "Time to load market data, by where it came from.", ("source",))
+CACHE_REQUESTS = registry.counter(
+    "portfolio_pilot_cache_requests_total", "Cache lookups by cache and outcome.", ("cache", "result"))
+YFINANCE_FETCHES = registry.counter(
+    "portfolio_pilot_yfinance_fetches_total", "Market data downloads from yfinance by outcome.", ("outcome",))
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "portfolio_pilot_http_request_seconds", "End-to-end request latency.", ("method", "route", "status"))
+
+
+def timed_stage(stage):
+    """Context manager recording the duration of a stage."""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def timed(stage):
+    """Decorator recording the duration of every call as a stage."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed_stage(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def timed_outcome(stage, outcome, started):
+    """
+    Records the duration of a simulation started at `started` (time.perf_counter()):
+    at once when outcome is a finished result, or, when it is a generator of running
+    estimates, once it is done, counting only the time spent producing values so that
+    a slow consumer (e.g. a streaming client) is not billed to the stage.
+    """
+    if not isinstance(outcome, types.GeneratorType):
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+        return outcome
+    return _timed_generator(stage, outcome, started)
+
+
+def _timed_generator(stage, outcome, started):
+    # Consumers may stop at the final result without exhausting the engine, so the time is
+    # recorded when this wrapper is closed, unless the engine failed (e.g. was cancelled)
+    elapsed = time.perf_counter() - started
+    failed = False
+    try:
+        while True:
+            resumed = time.perf_counter()
+            try:
+                value = next(outcome)
+            except StopIteration as stop:
+                return stop.value
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                elapsed += time.perf_counter() - resumed
+            yield value
+    finally:
+        outcome.close()
+        if not failed:
+            STAGE_SECONDS.observe(elapsed, stage=stage)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse recording the time spent encoding the body as the serialization stage."""
+
+    def render(self, content):
+        with timed_stage("serialization"):
+            return super().render(content)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency by method, route template and status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The route template keeps the label set bounded (no ids or query strings)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=scope["method"], route=route,
+                                         status=str(status["code"]))
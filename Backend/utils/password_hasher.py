@@ -0,0 +1,85 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+# Password hashing configuration, overridable per deployment
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Work factor (log2 of the key-stretching iterations)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))  # Operations waiting for a worker
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+RETRY_AFTER_SECONDS = 1
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when a password operation is rejected or times out because the pool is saturated."""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification on a bounded pool of worker threads.
+
+    bcrypt releases the GIL while stretching the key, so threads hash in parallel and the
+    event loop stays responsive. At most workers + max_queued operations are admitted at
+    once; beyond that PasswordHasherBusy (429) is raised immediately, and an admitted
+    operation that has not finished within timeout_seconds raises PasswordHasherBusy
+    (503), so a login storm sheds load instead of queueing without bound.
+    """
+
+    def __init__(self, rounds=BCRYPT_ROUNDS, workers=PASSWORD_HASH_WORKERS, max_queued=PASSWORD_HASH_QUEUE_SIZE,
+                 timeout_seconds=PASSWORD_HASH_TIMEOUT_SECONDS):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queued = max_queued
+        self.timeout_seconds = timeout_seconds
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def hash(self, password):
+        """Returns the bcrypt hash of password at the configured work factor."""
+        hashed = await self._run(bcrypt.hashpw, password.encode(), bcrypt.gensalt(rounds=self.rounds))
+        return hashed.decode()
+
+    async def verify(self, password, hashed):
+        return await self._run(bcrypt.checkpw, password.encode(), hashed.encode())
+
+    def needs_rehash(self, hashed):
+        """True when hashed was made with a different work factor than the configured one."""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queued:
+                raise PasswordHasherBusy("Too many password operations in progress, retry shortly.", 429)
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        future = self._executor.submit(fn, *args)
+        # The slot is released when the work ends, even if the caller stopped waiting for it
+        future.add_done_callback(lambda _: self._release())
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy("Password hashing is overloaded, retry shortly.", 503)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+
+# Shared hasher used by the auth routes
+password_hasher = PasswordHasher()
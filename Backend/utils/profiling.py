@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+import uuid
+import random
+import secrets
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from starlette.concurrency import run_in_threadpool
+
+# Request profiling, off unless enabled per deployment
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")  # Required in X-Profile to profile a request or use the /admin endpoints
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))  # Share of other requests profiled
+PROFILING_MODE = os.getenv("PROFILING_MODE", "cpu")  # Mode for sampled requests: "cpu" or "memory"
+PROFILING_INTERVAL_SECONDS = float(os.getenv("PROFILING_INTERVAL_SECONDS", "0.005"))  # Stack sampling period
+PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "50"))  # Oldest profiles are dropped beyond this
+
+PROFILE_MODES = ("cpu", "memory")
+MAX_STACK_DEPTH = 128
+TOP_ALLOCATIONS = 25
+
+
+def authorized(token):
+    """True when token matches the configured profiling token."""
+    return bool(PROFILING_TOKEN) and token is not None and secrets.compare_digest(token, PROFILING_TOKEN)
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler: a background thread records the stack of every other thread
+    every interval_seconds. Sampling every thread covers work the handler offloads to the
+    thread pool, the job workers and the hashing pool; Monte Carlo shards running in worker
+    processes show up as the parent waiting on them.
+
+    stacks() returns collapsed stacks ("thread;outer;...;inner" -> samples), the input
+    format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval_seconds=PROFILING_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self.samples = 0
+        self._stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def stacks(self):
+        return dict(self._stacks)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+
+class MemoryProfiler:
+    """Peak traced allocation over the profiled window, with the largest allocation sites at its end."""
+
+    def __init__(self):
+        self._started_tracing = False
+        self.peak_bytes = 0
+        self.top_allocations = []
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self._baseline, _ = tracemalloc.get_traced_memory()
+
+    def stop(self):
+        _, peak = tracemalloc.get_traced_memory()
+        self.peak_bytes = max(0, peak - self._baseline)
+        statistics = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+        self.top_allocations = [{"location": str(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+                                for stat in statistics]
+        if self._started_tracing:
+            tracemalloc.stop()
+
+
+class ProfileStore:
+    """Bounded, in-memory store of finished profiles, newest last."""
+
+    def __init__(self, max_profiles=PROFILING_MAX_PROFILES):
+        self.max_profiles = max_profiles
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles[profile["id"]] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self):
+        """Summaries of the stored profiles, without their stacks or allocations."""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [{key: value for key, value in profile.items() if key not in ("stacks", "top_allocations")}
+                for profile in profiles]
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+def collapsed_stacks(profile):
+    """A CPU profile's stacks as flamegraph-ready text, one "stack count" line per stack."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(profile.get("stacks", {}).items()))
+
+
+# Shared store read by the admin routes
+profile_store = ProfileStore()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests that carry an authorized X-Profile header (mode
+    from X-Profile-Mode, "cpu" by default) or fall in the sampled share of traffic. The
+    profile covers the whole request, streamed body included; its id is returned in the
+    X-Profile-Id response header. Profiling is process-wide, so one request is profiled
+    at a time and others arriving meanwhile run unprofiled.
+
+    Only added to the app when PROFILING_ENABLED is set, so disabled deployments pay nothing.
+    """
+
+    def __init__(self, app, sample_rate=PROFILING_SAMPLE_RATE, sampled_mode=PROFILING_MODE, store=profile_store):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.sampled_mode = sampled_mode
+        self.store = store
+        self._busy = threading.Lock()
+
+    def _requested_mode(self, scope):
+        headers = dict(scope.get("headers") or [])
+        token = headers.get(b"x-profile")
+        if token is not None and authorized(token.decode("latin-1")):
+            mode = headers.get(b"x-profile-mode", b"cpu").decode("latin-1")
+            return mode if mode in PROFILE_MODES else "cpu"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.sampled_mode
+        return None
+
+    async def __call__(self, scope, receive, send):
+        mode = self._requested_mode(scope) if scope["type"] == "http" else None
+        if mode is None or not self._busy.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex
+        profiler = SamplingProfiler() if mode == "cpu" else MemoryProfiler()
+        status = {"code": 500}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())])
+            await send(message)
+
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile = {
+                "id": profile_id,
+                "mode": mode,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status["code"],
+                "created_at": time.time(),
+                "duration_seconds": round(time.perf_counter() - started, 6),
+            }
+            try:
+                # Joining the sampler thread or snapshotting tracemalloc would stall the event loop
+                self.store.add(await run_in_threadpool(self._finish, profiler, profile))
+            finally:
+                self._busy.release()
+
+    @staticmethod
+    def _finish(profiler, profile):
+        """Stops the profiler and adds its results to the profile."""
+        profiler.stop()
+        if profile["mode"] == "cpu":
+            profile.update(samples=profiler.samples, stacks=profiler.stacks())
+        else:
+            profile.update(peak_bytes=profiler.peak_bytes, top_allocations=profiler.top_allocations)
+        return profile
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from utils.log import get_logger
+from utils.metrics import CACHE_REQUESTS
+
+logger = get_logger(__name__)
+
+# Cache configuration, overridable per deployment
+DEFAULT_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "512"))
+DEFAULT_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64 MB
+DEFAULT_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600"))
+DEFAULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR")  # Shared directory across workers, disabled when unset
+
+
+def make_cache_key(namespace, payload, data_version):
+    """
+    Builds a canonical cache key for a request body.
+
+    The payload is serialized with sorted keys and fixed separators so that logically
+    identical requests hash to the same key regardless of field order.
+
+    Args:
+        namespace (str): Endpoint the result belongs to (e.g. "simulate").
+        payload (dict): Request body.
+        data_version (str): Version of the market data the result was computed from.
+
+    Returns:
+        str: Hex digest identifying the result.
+    """
+    canonical = json.dumps(
+        {"namespace": namespace, "payload": payload, "data_version": data_version},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU cache for JSON-serializable responses with TTL and size limits.
+
+    Entries live in memory and, when cache_dir is set, are also written to that directory
+    so other worker processes can serve them. Disk entries are written atomically and
+    expire with the same TTL.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl_seconds=DEFAULT_TTL_SECONDS, cache_dir=DEFAULT_CACHE_DIR, clock=time.time):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss or expired entry."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, _, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    CACHE_REQUESTS.inc(cache="result", result="hit")
+                    return value
+                self._remove(key)
+
+        value = self._read_disk(key, now)
+        if value is not None:
+            self._store(key, value, now)  # Promote into this worker's memory
+        CACHE_REQUESTS.inc(cache="result", result="miss" if value is None else "hit")
+        return value
+
+    def set(self, key, value):
+        """Caches a JSON-serializable value under key."""
+        now = self.clock()
+        size = self._store(key, value, now)
+        if size is not None and self.cache_dir:
+            self._write_disk(key, value, now + self.ttl_seconds)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key, value, now):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return None  # Never let a single oversized result evict the whole cache
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (now + self.ttl_seconds, size, value)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+        return size
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key, now):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) <= now:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry.get("value")
+
+    def _write_disk(self, key, value, expires_at):
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"expires_at": expires_at, "value": value}, f, default=str)
+            os.replace(tmp_path, self._disk_path(key))  # Atomic so readers never see partial files
+        except OSError as e:
+            logger.warning("⚠️ Could not write result cache entry %s: %s", key, e)
+
+
+# Shared cache used by the simulation and risk routes
+result_cache = ResultCache()